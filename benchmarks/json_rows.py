@@ -0,0 +1,74 @@
+"""
+Benchmark of the rows payload representation, rendering and parsing.
+
+Compares DRF defaults (`ModelSerializer` + stdlib `json`) with plain dicts + `orjson` used by table builder.
+Run from the project root: `python benchmarks/json_rows.py [rows]`
+"""
+import io
+import sys
+import timeit
+
+import django
+from django.conf import settings
+
+
+sys.path.insert(0, '.')
+settings.configure(INSTALLED_APPS=[
+    'django.contrib.contenttypes', 'django.contrib.auth', 'rest_framework', 'django_extensions', 'table_builder',
+])
+django.setup()
+
+from django.db import models  # noqa: E402, I202
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from table_builder.parsers import ORJSONParser  # noqa: E402
+from table_builder.renderers import ORJSONRenderer  # noqa: E402
+from table_builder.serializers import serializer_factory  # noqa: E402
+
+
+class BenchmarkRow(models.Model):
+    char_field = models.CharField(max_length=255)
+    integer_field = models.IntegerField()
+    boolean_field = models.BooleanField()
+
+    class Meta:
+        app_label = 'benchmarks'
+
+
+def measure(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def main(count):
+    names = ['id', 'char_field', 'integer_field', 'boolean_field']
+    tuples = [(i, f'value {i}', i, bool(i % 2)) for i in range(count)]
+    serializer_class = serializer_factory(BenchmarkRow)
+
+    def serializer_representation():
+        instances = [BenchmarkRow(*row) for row in tuples]
+        return serializer_class(instances, many=True).data
+
+    def values_representation():
+        return [dict(zip(names, row)) for row in tuples]
+
+    data = values_representation()
+    payload = JSONRenderer().render(data)
+    results = [
+        ('representation', measure(serializer_representation), measure(values_representation)),
+        ('render', measure(lambda: JSONRenderer().render(data)), measure(lambda: ORJSONRenderer().render(data))),
+        (
+            'parse',
+            measure(lambda: JSONParser().parse(io.BytesIO(payload))),
+            measure(lambda: ORJSONParser().parse(io.BytesIO(payload))),
+        ),
+    ]
+    print(f'{count} rows, {len(payload)} bytes')  # noqa: T201
+    print(f'{"step":<16}{"default, ms":>14}{"fast, ms":>12}{"speedup":>10}')  # noqa: T201
+    for step, default, fast in results:
+        print(f'{step:<16}{default * 1000:>14.1f}{fast * 1000:>12.1f}{default / fast:>9.1f}x')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,68 @@
+"""
+Benchmark of the rows payload validation on the batch write paths.
+
+Compares the `serializer_factory` serializer with `many=True` and the compiled `RowsValidator` used by table builder.
+Run from the project root: `python benchmarks/row_validation.py [rows]`
+"""
+import sys
+import timeit
+
+import django
+from django.conf import settings
+
+
+sys.path.insert(0, '.')
+settings.configure(INSTALLED_APPS=[
+    'django.contrib.contenttypes', 'django.contrib.auth', 'rest_framework', 'django_extensions', 'table_builder',
+])
+django.setup()
+
+from django.db import models  # noqa: E402, I202
+
+from table_builder.serializers import RowsValidator, serializer_factory  # noqa: E402
+
+
+class BenchmarkRow(models.Model):
+    char_field = models.CharField(max_length=255)
+    integer_field = models.IntegerField()
+    boolean_field = models.BooleanField()
+
+    class Meta:
+        app_label = 'benchmarks'
+
+
+def measure(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def main(count):
+    serializer_class = serializer_factory(BenchmarkRow, validate_unique=False)
+    validator = RowsValidator(BenchmarkRow)
+    payloads = [
+        ('native', [
+            {'char_field': f'value {i}', 'integer_field': i, 'boolean_field': bool(i % 2)} for i in range(count)
+        ]),
+        # Form-like values are coerced: digits to integers, `true` and `false` to booleans
+        ('strings', [
+            {'char_field': f' value {i} ', 'integer_field': str(i), 'boolean_field': 'true' if i % 2 else 'false'}
+            for i in range(count)
+        ]),
+    ]
+    results = []
+    for name, rows in payloads:
+
+        def serializer_validation():
+            serializer = serializer_class(data=rows, many=True)
+            serializer.is_valid()
+            return serializer.validated_data
+
+        assert [dict(row) for row in serializer_validation()] == validator.validate(rows)[0]
+        results.append((name, measure(serializer_validation), measure(lambda: validator.validate(rows))))
+    print(f'{count} rows')  # noqa: T201
+    print(f'{"payload":<16}{"serializer, ms":>16}{"compiled, ms":>14}{"speedup":>10}')  # noqa: T201
+    for name, default, fast in results:
+        print(f'{name:<16}{default * 1000:>16.1f}{fast * 1000:>14.1f}{default / fast:>9.1f}x')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
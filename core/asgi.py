@@ -2,6 +2,7 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve with an ASGI server (e.g. ``uvicorn core.asgi:application``) to stream row events.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -11,6 +12,13 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from table_builder.apps import warm_up
+from table_builder.conf import get_setting
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+# Dynamic models are preloaded by server processes only, management commands never load this module
+if get_setting('WARMUP'):
+    warm_up()
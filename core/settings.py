@@ -162,6 +162,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    # orjson based renderer and parser, they fall back to the stdlib json when orjson is not installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'table_builder.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'table_builder.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # DRF Spectacular
@@ -172,6 +182,13 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
+# Table builder
+# Shared directory for metric snapshots of all workers, metrics are per-process when it is not set
+TABLE_BUILDER_METRICS_DIR = env('TABLE_BUILDER_METRICS_DIR', default=None)
+# Preload dynamic models of all tables on startup, tables left after the budget (seconds) are loaded lazily
+TABLE_BUILDER_WARMUP = env.bool('TABLE_BUILDER_WARMUP', default=False)
+TABLE_BUILDER_WARMUP_BUDGET = env.float('TABLE_BUILDER_WARMUP_BUDGET', default=5.0)
+
 # etc...
 SITE_ID = 1
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
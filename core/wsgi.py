@@ -11,6 +11,13 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from table_builder.apps import warm_up
+from table_builder.conf import get_setting
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Dynamic models are preloaded by server processes only, management commands never load this module
+if get_setting('WARMUP'):
+    warm_up()
@@ -1,6 +1,36 @@
+import logging
+
 from django.apps import AppConfig
+from django.db import DatabaseError, connections
+
+from table_builder.conf import get_setting
+
+
+logger = logging.getLogger(__name__)
 
 
 class TableBuilderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'table_builder'
+
+    def ready(self):
+        # Connect signal receivers
+        from table_builder import notifications  # noqa: F401
+
+
+def warm_up():
+    """
+    Preload dynamic models of all tables within `TABLE_BUILDER_WARMUP_BUDGET` seconds.
+    Called by WSGI and ASGI modules of the project with `TABLE_BUILDER_WARMUP` enabled, not in `ready()`,
+    so management commands like `migrate` don't query tables. Can be called from a worker post-fork hook instead.
+    """
+    from table_builder.models import DynamicTable
+
+    try:
+        DynamicTable.warm_up_dynamic_models(budget=get_setting('WARMUP_BUDGET'))
+    except DatabaseError:
+        # Database is not reachable or not migrated yet, models will be loaded lazily
+        logger.exception("Dynamic models warm-up failed")
+    finally:
+        # Don't leak the connection to forked workers
+        connections.close_all()
@@ -0,0 +1,53 @@
+from django.conf import settings
+
+
+DEFAULTS = {
+    # Directory shared by all workers for metric snapshots, None keeps metrics per-process.
+    'METRICS_DIR': None,
+    # Minimal interval in seconds between two snapshot writes of the same worker.
+    'METRICS_FLUSH_INTERVAL': 1.0,
+    # Maximal number of distinct table label values exposed per metric.
+    'METRICS_MAX_TABLE_LABELS': 100,
+    # Dotted paths of DRF permission classes of the metrics endpoint, metrics are public by default.
+    'METRICS_PERMISSION_CLASSES': ('rest_framework.permissions.AllowAny',),
+    # Preload dynamic models of all tables on startup of server processes, see `apps.warm_up`.
+    'WARMUP': False,
+    # Time budget in seconds for the startup warm-up, the rest of tables is loaded lazily.
+    'WARMUP_BUDGET': 5.0,
+    # Changes younger than this number of seconds are left for the next change feed request,
+    # so rows of transactions committed out of order are not skipped. Changes of transactions
+    # committed later than this after writing their rows are missed by the feed.
+    'CHANGES_SAFETY_LAG': 1.0,
+    # Send NOTIFY about written rows, consumed by the rows events stream.
+    'ROW_NOTIFICATIONS': True,
+    # Seconds to wait for further notifications of a write burst before emitting a single event.
+    'NOTIFY_COALESCE_INTERVAL': 0.25,
+    # Interval in seconds of keep-alive comments in idle events streams.
+    'SSE_KEEPALIVE_INTERVAL': 15.0,
+    # Maximal duration in seconds of an events stream, clients reconnect after it is closed.
+    'SSE_MAX_DURATION': 300.0,
+    # Number of range partitions created in advance after the current one.
+    'PARTITIONS_AHEAD': 3,
+    # Text search configuration of search vectors and queries, changing it requires re-creating search vectors.
+    'SEARCH_CONFIG': 'simple',
+    # Number of schemas new tables are spread across by a hash of their names, 0 creates them in the default schema.
+    'SCHEMA_SHARDS': 0,
+    # Prefix of names of the shard schemas, followed by the shard number.
+    'SCHEMA_PREFIX': 'tables_',
+    # Queries of dynamic tables slower than this number of seconds have their plans captured, None disables capture.
+    'SLOW_QUERY_THRESHOLD': None,
+    # Fraction of requests which queries are timed for the capture.
+    'SLOW_QUERY_SAMPLE_RATE': 0.1,
+    # Re-run captured queries with `EXPLAIN (ANALYZE, BUFFERS)`, otherwise only the estimated plan is captured.
+    'SLOW_QUERY_ANALYZE': True,
+    # Maximal number of kept plans, the oldest ones are deleted.
+    'SLOW_QUERY_PLANS': 1000,
+}
+
+
+def get_setting(name):
+    """
+    Get table builder setting from django settings, falling back to the default value.
+    Settings are prefixed with `TABLE_BUILDER_` in django settings.
+    """
+    return getattr(settings, f'TABLE_BUILDER_{name}', DEFAULTS[name])
@@ -0,0 +1,181 @@
+import re
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+
+from table_builder.types import COLUMN_TYPES, NUMERIC, TEXT
+
+
+TOKEN_RE = re.compile(
+    r"\s*(?:(?P<number>[0-9]+(?:\.[0-9]+)?)|(?P<string>'(?:[^']|'')*')|(?P<name>[a-z_][a-z0-9_]*)"
+    r"|(?P<operator>\|\||[-+*/(),]))"
+)
+# Nesting of parentheses, function calls and unary minus, deeper expressions would exhaust the recursion limit
+MAX_DEPTH = 32
+# Functions by name: argument types, result type and SQL template.
+# All of them are immutable, as required by generated columns.
+FUNCTIONS = {
+    'lower': ((TEXT,), TEXT, 'lower({0})'),
+    'upper': ((TEXT,), TEXT, 'upper({0})'),
+    'trim': ((TEXT,), TEXT, 'btrim({0})'),
+    'length': ((TEXT,), NUMERIC, 'char_length({0})'),
+    'abs': ((NUMERIC,), NUMERIC, 'abs({0})'),
+    'floor': ((NUMERIC,), NUMERIC, 'floor({0})'),
+    'ceil': ((NUMERIC,), NUMERIC, 'ceil({0})'),
+    'round': ((NUMERIC, NUMERIC), NUMERIC, 'round(({0})::numeric, ({1})::integer)'),
+}
+
+
+def compile_expression(expression, columns):
+    """
+    Compile expression of a generated column to SQL.
+    Expressions consist of column names, numbers, 'strings', arithmetic operators `+ - * /` over numbers,
+    concatenation `||`, parentheses and functions `lower`, `upper`, `trim`, `length`, `abs`, `floor`, `ceil`,
+    `round(value, places)` and `coalesce(value, ...)`.
+    :param columns: - field types of the columns which can be referenced, by column name.
+    Returns tuple `(sql, result_type)`, raises ValidationError for invalid expressions.
+    """
+    return _Compiler(expression, columns).to_sql()
+
+
+def _quote_string(value):
+    # Unicode escapes keep quotes, backslashes and percent signs out of the SQL text
+    escaped = ''.join(
+        char if char.isalnum() or char == ' ' else f'\\{ord(char):04x}' if ord(char) <= 0xffff
+        else f'\\+{ord(char):06x}'
+        for char in value
+    )
+    return f"U&'{escaped}'"
+
+
+class _Compiler:
+    """
+    Recursive descent compiler of generated column expressions, see `compile_expression`.
+    """
+
+    def __init__(self, expression, columns):
+        self.columns = columns
+        self.tokens = self._tokenize(expression)
+        self.position = 0
+        self.depth = 0
+
+    @staticmethod
+    def _tokenize(expression):
+        tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = TOKEN_RE.match(expression, position)
+            if match is None:
+                raise ValidationError(f'Unexpected character {expression[position:].lstrip()[:1]!r} in expression.')
+            tokens.append((match.lastgroup, match[match.lastgroup]))
+            position = match.end()
+        return tokens
+
+    def to_sql(self):
+        if not self.tokens:
+            raise ValidationError('Expression is empty.')
+        result = self._concatenation()
+        if self.position < len(self.tokens):
+            raise ValidationError(f'Unexpected {self.tokens[self.position][1]!r} in expression.')
+        return result
+
+    def _peek(self):
+        return self.tokens[self.position][1] if self.position < len(self.tokens) else None
+
+    def _next(self):
+        if self.position >= len(self.tokens):
+            raise ValidationError('Unexpected end of expression.')
+        self.position += 1
+        return self.tokens[self.position - 1]
+
+    def _expect(self, value):
+        if self._next()[1] != value:
+            raise ValidationError(f'Expected {value!r} in expression.')
+
+    def _nested(self, parse):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise ValidationError(f'Expression is nested deeper than {MAX_DEPTH} levels.')
+        try:
+            return parse()
+        finally:
+            self.depth -= 1
+
+    def _concatenation(self):
+        sql, result_type = self._sum()
+        while self._peek() == '||':
+            self._next()
+            right_sql, right_type = self._sum()
+            sql, result_type = f'({self._as_text(sql, result_type)} || {self._as_text(right_sql, right_type)})', TEXT
+        return sql, result_type
+
+    def _sum(self):
+        return self._binary(self._product, ('+', '-'))
+
+    def _product(self):
+        return self._binary(self._unary, ('*', '/'))
+
+    def _binary(self, operand, operators):
+        sql, result_type = operand()
+        while self._peek() in operators:
+            operator = self._next()[1]
+            right_sql, right_type = operand()
+            if result_type != NUMERIC or right_type != NUMERIC:
+                raise ValidationError(f'Operator {operator!r} requires numeric operands.')
+            if operator == '/':
+                # Division by zero is null, otherwise writing a row with zero divisor fails
+                right_sql = f'NULLIF({right_sql}, 0)'
+            sql = f'({sql} {operator} {right_sql})'
+        return sql, result_type
+
+    def _unary(self):
+        if self._peek() == '-':
+            self._next()
+            sql, result_type = self._nested(self._unary)
+            if result_type != NUMERIC:
+                raise ValidationError("Operator '-' requires numeric operand.")
+            return f'(-{sql})', NUMERIC
+        return self._primary()
+
+    def _primary(self):
+        kind, value = self._next()
+        if kind == 'number':
+            return value, NUMERIC
+        if kind == 'string':
+            return _quote_string(value[1:-1].replace("''", "'")), TEXT
+        if kind == 'name':
+            if self._peek() == '(':
+                return self._function(value)
+            expression_type = COLUMN_TYPES[self.columns[value]].expression_type if value in self.columns else None
+            if expression_type is None:
+                raise ValidationError(f'Column {value} cannot be referenced by expression.')
+            return connection.ops.quote_name(value), expression_type
+        if value == '(':
+            result = self._nested(self._concatenation)
+            self._expect(')')
+            return result
+        raise ValidationError(f'Unexpected {value!r} in expression.')
+
+    def _function(self, name):
+        self._expect('(')
+        arguments = [self._nested(self._concatenation)]
+        while self._peek() == ',':
+            self._next()
+            arguments.append(self._nested(self._concatenation))
+        self._expect(')')
+        if name == 'coalesce':
+            types = {argument_type for _, argument_type in arguments}
+            if len(arguments) < 2 or len(types) > 1:
+                raise ValidationError('Function coalesce requires at least two arguments of the same type.')
+            return f"coalesce({', '.join(sql for sql, _ in arguments)})", types.pop()
+        if name not in FUNCTIONS:
+            raise ValidationError(f'Unknown function {name}.')
+        argument_types, result_type, template = FUNCTIONS[name]
+        if tuple(argument_type for _, argument_type in arguments) != argument_types:
+            raise ValidationError(f'Function {name} requires arguments of types {", ".join(argument_types)}.')
+        return template.format(*(sql for sql, _ in arguments)), result_type
+
+    @staticmethod
+    def _as_text(sql, result_type):
+        return sql if result_type == TEXT else f'({sql})::text'
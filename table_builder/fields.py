@@ -0,0 +1,64 @@
+from django.db import models
+
+
+class Default(models.Expression):
+    """
+    `DEFAULT` keyword, written instead of values of generated columns.
+    """
+
+    def as_sql(self, compiler, connection):
+        return 'DEFAULT', []
+
+
+class GeneratedFieldMixin:
+    """
+    Stored generated column, its values are computed by the database from the SQL expression on every write.
+    Values are never written, `DEFAULT` is sent instead, and they are read back with `RETURNING` after inserts.
+    :param expression: - compiled SQL expression, see `table_builder.expressions`.
+    """
+    generated = True
+    db_returning = True
+
+    def __init__(self, *args, expression, **kwargs):
+        self.expression = expression
+        kwargs.update(null=True, editable=False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs['null'], kwargs['editable']
+        kwargs['expression'] = self.expression
+        return name, path, args, kwargs
+
+    def db_parameters(self, connection):
+        db_params = super().db_parameters(connection)
+        db_type = db_params['type']
+        db_params['type'] = f'{db_type} GENERATED ALWAYS AS (({self.expression})::{db_type}) STORED'
+        return db_params
+
+    def pre_save(self, model_instance, add):
+        return Default()
+
+
+class GeneratedCharField(GeneratedFieldMixin, models.CharField):
+    pass
+
+
+class GeneratedSmallIntegerField(GeneratedFieldMixin, models.SmallIntegerField):
+    pass
+
+
+class GeneratedIntegerField(GeneratedFieldMixin, models.IntegerField):
+    pass
+
+
+class GeneratedBigIntegerField(GeneratedFieldMixin, models.BigIntegerField):
+    pass
+
+
+class GeneratedFloatField(GeneratedFieldMixin, models.FloatField):
+    pass
+
+
+class GeneratedDecimalField(GeneratedFieldMixin, models.DecimalField):
+    pass
@@ -0,0 +1,120 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.core import exceptions
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.lookups import PatternLookup
+
+from rest_framework.exceptions import ValidationError
+
+from table_builder.conf import get_setting
+from table_builder.types import get_column_type
+
+
+LOOKUP_SEP = '__'
+
+
+class ILikeContains(PatternLookup):
+    """
+    Case-insensitive `contains` using ILIKE on the column itself, unlike django `UPPER(column) LIKE UPPER(value)`,
+    so trigram indexes of the column are used.
+    """
+    lookup_name = 'ilike_contains'
+    param_pattern = '%%%s%%'
+
+    def get_rhs_op(self, connection, rhs):
+        return f'ILIKE {rhs}'
+
+
+class ILikeStartsWith(ILikeContains):
+    lookup_name = 'ilike_startswith'
+    param_pattern = '%s%%'
+
+
+class ILikeEndsWith(ILikeContains):
+    lookup_name = 'ilike_endswith'
+    param_pattern = '%%%s'
+
+
+# Case-insensitive lookups of char columns are built as ILIKE ones
+ILIKE_LOOKUPS = {
+    'icontains': ILikeContains,
+    'istartswith': ILikeStartsWith,
+    'iendswith': ILikeEndsWith,
+}
+
+
+def build_filter(model, expression):
+    """
+    Build Q object for dynamic model from filter expression.
+    Expression is a dict of `<column>__<lookup>` keys (lookup defaults to `exact`) and values,
+    all conditions are combined with AND. Values are coerced to the column type.
+    Raises ValidationError with errors by expression key.
+    """
+    if not isinstance(expression, dict):
+        raise ValidationError({'filter': ['Filter must be an object.']})
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    conditions = {}
+    expressions = []
+    errors = {}
+    for key, value in expression.items():
+        name, _, lookup = key.partition(LOOKUP_SEP)
+        lookup = lookup or 'exact'
+        field = fields.get(name)
+        if field is None:
+            errors[key] = [f'Column {name} does not exist.']
+        elif lookup not in get_column_type(field).lookups:
+            errors[key] = [f'Lookup {lookup} is not supported for column {name}.']
+        else:
+            try:
+                value = _coerce(field, lookup, value)
+            except exceptions.ValidationError as exc:
+                errors[key] = exc.messages
+                continue
+            if lookup in ILIKE_LOOKUPS and field.get_internal_type() == 'CharField':
+                expressions.append(ILIKE_LOOKUPS[lookup](F(name), value))
+            else:
+                conditions[f'{name}{LOOKUP_SEP}{lookup}'] = value
+    if errors:
+        raise ValidationError({'filter': errors})
+    return Q(*expressions, **conditions)
+
+
+def _coerce(field, lookup, value):
+    """
+    Coerce filter value to the python type of the field.
+    """
+    if lookup == 'isnull':
+        if not isinstance(value, bool):
+            raise exceptions.ValidationError('Value must be a boolean.')
+        return value
+    if lookup in ('in', 'range'):
+        if not isinstance(value, list) or (lookup == 'range' and len(value) != 2):
+            raise exceptions.ValidationError('Value must be a list.' if lookup == 'in' else 'Value must be a pair.')
+        return [_coerce_value(field, item) for item in value]
+    return _coerce_value(field, value)
+
+
+def _coerce_value(field, value):
+    if value is None:
+        raise exceptions.ValidationError('Value cannot be null, use isnull lookup instead.')
+    try:
+        return field.to_python(value)
+    except TypeError:
+        # E.g. parsers of date and time fields accept strings only
+        raise exceptions.ValidationError(f'Value of {type(value).__name__} type is not supported.')
+
+
+def search(queryset, text, column):
+    """
+    Filter rows of dynamic model by full-text search over the generated search vector column, order them by rank.
+    Query is parsed with `websearch_to_tsquery`, so quotes, `or` and `-` are supported.
+    """
+    quote_name = connection.ops.quote_name
+    vector = RawSQL(
+        f'{quote_name(queryset.model._meta.db_table)}.{quote_name(column)}', [], output_field=SearchVectorField()
+    )
+    query = SearchQuery(text, config=get_setting('SEARCH_CONFIG'), search_type='websearch')
+    return queryset.alias(
+        search_vector=vector, search_rank=SearchRank(vector, query),
+    ).filter(search_vector=query).order_by('-search_rank', 'pk')
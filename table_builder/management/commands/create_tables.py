@@ -0,0 +1,31 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from table_builder.serializers import DynamicTableBulkSerializer
+
+
+class Command(BaseCommand):
+    help = "Create dynamic tables from a JSON file with a list of table definitions, all or nothing."  # noqa: A003
+    stealth_options = ('stdin',)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help="Path of the JSON file with table definitions like in the create table API, - for stdin.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['path'] == '-':
+                definitions = json.load(options.get('stdin', sys.stdin))
+            else:
+                with open(options['path']) as file:
+                    definitions = json.load(file)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Failed to read table definitions: {exc}")
+        serializer = DynamicTableBulkSerializer(data={'tables': definitions})
+        if not serializer.is_valid():
+            raise CommandError(f"Invalid table definitions: {json.dumps(serializer.errors)}")
+        tables = serializer.save()['tables']
+        self.stdout.write(f"Created {len(tables)} tables")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from table_builder.models import DynamicTable
+
+
+class Command(BaseCommand):
+    help = "Pre-create range partitions of dynamic tables and detach old ones."  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table', action='append', dest='tables', help="Name of the table to maintain, all tables by default.",
+        )
+        parser.add_argument(
+            '--ahead', type=int, help="Number of partitions to keep after the current one.",
+        )
+        parser.add_argument(
+            '--retain', type=int, help="Number of partitions to keep before the current one, older ones are detached.",
+        )
+
+    def handle(self, *args, **options):
+        tables = DynamicTable.objects.filter(partitioning=DynamicTable.Partitioning.RANGE)
+        if options['tables']:
+            tables = tables.filter(name__in=options['tables'])
+        failed = []
+        for table in tables:
+            try:
+                created, detached = table.maintain_partitions(ahead=options['ahead'], retain=options['retain'])
+            except DatabaseError as exc:
+                # E.g. rows of the new range are in the default partition, other tables are still maintained
+                self.stderr.write(f"{table.name}: {exc}")
+                failed.append(table.name)
+                continue
+            self.stdout.write(f"{table.name}: created {created or 'none'}, detached {detached or 'none'}")
+        if failed:
+            raise CommandError(f"Failed to maintain partitions of {', '.join(failed)}")
@@ -0,0 +1,47 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from table_builder.models import DynamicTable
+from table_builder.validators import validate_schema_name
+
+
+class Command(BaseCommand):
+    help = "Move dynamic tables between Postgres schemas, each table is moved in its own transaction."  # noqa: A003
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument(
+            '--schema', help="Target schema, empty string for the default schema of the database.",
+        )
+        target.add_argument(
+            '--rebalance', action='store_true',
+            help="Move tables to their shard schemas according to TABLE_BUILDER_SCHEMA_SHARDS setting.",
+        )
+        parser.add_argument(
+            '--table', action='append', dest='tables', help="Name of the table to move, all tables by default.",
+        )
+
+    def handle(self, *args, **options):
+        if options['schema']:
+            try:
+                validate_schema_name(options['schema'])
+            except ValidationError as exc:
+                raise CommandError(' '.join(exc.messages))
+        tables = DynamicTable.objects.order_by('name')
+        if options['tables']:
+            tables = tables.filter(name__in=options['tables'])
+        failed = []
+        for table in tables:
+            schema = DynamicTable.get_shard_schema(table.name) if options['rebalance'] else options['schema']
+            try:
+                moved = table.move_to_schema(schema)
+            except (DatabaseError, ValidationError) as exc:
+                # E.g. a relation with the same name exists in the target schema, other tables are still moved
+                self.stderr.write(f"{table.name}: {exc}")
+                failed.append(table.name)
+                continue
+            if moved:
+                self.stdout.write(f"{table.name}: moved to {schema or 'default schema'}")
+        if failed:
+            raise CommandError(f"Failed to move {', '.join(failed)}")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from table_builder.models import SavedQuery
+
+
+class Command(BaseCommand):
+    help = "Refresh materialized views of saved queries which are due according to their refresh policy."  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--query', action='append', dest='queries',
+            help="Name of the saved query to refresh regardless of its policy, due queries by default.",
+        )
+
+    def handle(self, *args, **options):
+        saved_queries = SavedQuery.objects.select_related('table')
+        if options['queries']:
+            saved_queries = saved_queries.filter(name__in=options['queries'])
+        else:
+            saved_queries = [saved_query for saved_query in saved_queries if saved_query.is_refresh_due()]
+        failed = []
+        for saved_query in saved_queries:
+            try:
+                saved_query.refresh_view()
+            except DatabaseError as exc:
+                self.stderr.write(f"{saved_query.name}: {exc}")
+                failed.append(saved_query.name)
+                continue
+            self.stdout.write(f"{saved_query.name}: refreshed")
+        if failed:
+            raise CommandError(f"Failed to refresh saved queries {', '.join(failed)}")
@@ -0,0 +1,304 @@
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from table_builder.conf import get_setting
+
+
+OTHER_LABEL = '__other__'
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+
+class Metric:
+    """
+    Base class for in-process metrics.
+    Values are stored per tuple of label values. Labels listed in `bounded` can hold at most
+    `TABLE_BUILDER_METRICS_MAX_TABLE_LABELS` distinct values, the rest is folded into `__other__`.
+    """
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), bounded=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.bounded = tuple(self.labelnames.index(label) for label in bounded)
+        self._seen = {index: set() for index in self.bounded}
+        self._values = {}
+        self._lock = threading.Lock()
+        self.registry = registry if registry is not None else REGISTRY
+        self.registry.register(self)
+
+    def _key(self, labels):
+        key = [str(labels[label]) for label in self.labelnames]
+        limit = get_setting('METRICS_MAX_TABLE_LABELS')
+        # Check and add of a label value are atomic, so concurrent threads can't exceed the limit
+        with self._lock:
+            for index in self.bounded:
+                seen = self._seen[index]
+                if key[index] not in seen:
+                    if len(seen) >= limit:
+                        key[index] = OTHER_LABEL
+                    else:
+                        seen.add(key[index])
+        return tuple(key)
+
+    def samples(self):
+        """
+        Return list of `[label values, value]` pairs suitable for json serialization.
+        """
+        with self._lock:
+            return [[list(key), self._copy(value)] for key, value in self._values.items()]
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    @staticmethod
+    def merge(first, second):
+        raise NotImplementedError
+
+    @staticmethod
+    def weight(value):
+        raise NotImplementedError
+
+    def expose(self, key, value):
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self.registry.changed()
+
+    @staticmethod
+    def merge(first, second):
+        return first + second
+
+    @staticmethod
+    def weight(value):
+        return value
+
+    def expose(self, key, value):
+        yield f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), bounded=(), buckets=DURATION_BUCKETS, registry=None):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames=labelnames, bounded=bounded, registry=registry)
+
+    def observe(self, amount, **labels):
+        key = self._key(labels)
+        with self._lock:
+            value = self._values.setdefault(key, {'buckets': [0] * len(self.buckets), 'sum': 0, 'count': 0})
+            for index, bound in enumerate(self.buckets):
+                if amount <= bound:
+                    value['buckets'][index] += 1
+                    break
+            value['sum'] += amount
+            value['count'] += 1
+        self.registry.changed()
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe duration of the wrapped block in seconds.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    @staticmethod
+    def _copy(value):
+        return {'buckets': list(value['buckets']), 'sum': value['sum'], 'count': value['count']}
+
+    @staticmethod
+    def merge(first, second):
+        return {
+            'buckets': [a + b for a, b in zip(first['buckets'], second['buckets'])],
+            'sum': first['sum'] + second['sum'],
+            'count': first['count'] + second['count'],
+        }
+
+    @staticmethod
+    def weight(value):
+        return value['count']
+
+    def expose(self, key, value):
+        cumulative = 0
+        for bound, count in zip(self.buckets, value['buckets']):
+            cumulative += count
+            labels = _format_labels(self.labelnames + ('le',), key + (_format_value(bound),))
+            yield f'{self.name}_bucket{labels} {cumulative}'
+        labels = _format_labels(self.labelnames + ('le',), key + ('+Inf',))
+        yield f'{self.name}_bucket{labels} {value["count"]}'
+        labels = _format_labels(self.labelnames, key)
+        yield f'{self.name}_sum{labels} {_format_value(value["sum"])}'
+        yield f'{self.name}_count{labels} {value["count"]}'
+
+
+class Registry:
+    """
+    Collection of metrics of the current process.
+    When `TABLE_BUILDER_METRICS_DIR` is set, every worker periodically dumps its snapshot into this directory
+    and exposition merges snapshots of all workers, so any worker can serve the aggregated values.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_flush = 0.0
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+
+    def snapshot(self):
+        return {name: metric.samples() for name, metric in self._metrics.items()}
+
+    def changed(self):
+        self._dirty = True
+        if get_setting('METRICS_DIR') and time.monotonic() - self._last_flush >= get_setting('METRICS_FLUSH_INTERVAL'):
+            self.flush()
+
+    def flush(self):
+        """
+        Write snapshot of the current process into the shared metrics directory.
+        """
+        directory = get_setting('METRICS_DIR')
+        if not directory or not self._dirty:
+            return
+        with self._lock:
+            self._dirty = False
+            self._last_flush = time.monotonic()
+            os.makedirs(directory, exist_ok=True)
+            fd, path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as file:
+                json.dump(self.snapshot(), file)
+            os.replace(path, os.path.join(directory, f'{os.getpid()}.json'))
+
+    def _snapshots(self):
+        directory = get_setting('METRICS_DIR')
+        if not directory:
+            yield self.snapshot()
+            return
+        self.flush()
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            try:
+                with open(path) as file:
+                    yield json.load(file)
+            except (OSError, ValueError):
+                # Snapshot is being replaced or was removed meanwhile, skip it
+                continue
+
+    def collect(self):
+        """
+        Merge snapshots of all workers. Returns dict of metric name to dict of label values to value.
+        """
+        merged = {name: {} for name in self._metrics}
+        for snapshot in self._snapshots():
+            for name, samples in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                values = merged[name]
+                for key, value in samples:
+                    key = tuple(key)
+                    values[key] = metric.merge(values[key], value) if key in values else value
+        for name, values in merged.items():
+            merged[name] = self._bound(self._metrics[name], values)
+        return merged
+
+    @staticmethod
+    def _bound(metric, values):
+        """
+        Fold the least significant values of bounded labels into `__other__`,
+        as every worker may have picked its own set of label values.
+        """
+        limit = get_setting('METRICS_MAX_TABLE_LABELS')
+        for index in metric.bounded:
+            totals = {}
+            for key, value in values.items():
+                if key[index] != OTHER_LABEL:
+                    totals[key[index]] = totals.get(key[index], 0) + metric.weight(value)
+            if len(totals) <= limit:
+                continue
+            kept = set(sorted(totals, key=totals.get, reverse=True)[:limit])
+            bounded = {}
+            for key, value in values.items():
+                if key[index] not in kept:
+                    key = key[:index] + (OTHER_LABEL,) + key[index + 1:]
+                bounded[key] = metric.merge(bounded[key], value) if key in bounded else value
+            values = bounded
+        return values
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for name, values in self.collect().items():
+            metric = self._metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for key in sorted(values):
+                lines.extend(metric.expose(key, values[key]))
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f'{{{labels}}}'
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_value(value):
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+
+MODEL_CACHE_HITS = Counter(
+    'table_builder_model_cache_hits_total', 'Dynamic model lookups served from the model cache.'
+)
+MODEL_CACHE_MISSES = Counter(
+    'table_builder_model_cache_misses_total', 'Dynamic model lookups which required building the model.'
+)
+MODEL_BUILD_SECONDS = Histogram(
+    'table_builder_model_build_seconds', 'Time spent building and registering dynamic models.'
+)
+DDL_SECONDS = Histogram(
+    'table_builder_ddl_seconds', 'Time spent executing DDL on dynamic tables.', labelnames=('operation',)
+)
+ROWS_REQUESTS = Counter(
+    'table_builder_rows_requests_total', 'Requests to the rows endpoint.', labelnames=('table',), bounded=('table',)
+)
+ROWS_SERVED = Counter(
+    'table_builder_rows_served_total', 'Rows returned by the rows endpoint.', labelnames=('table',), bounded=('table',)
+)
+ROWS_RESPONSE_BYTES = Histogram(
+    'table_builder_rows_response_bytes', 'Size of rendered rows responses.', buckets=SIZE_BUCKETS
+)
+ROWS_INSERTED = Counter(
+    'table_builder_rows_inserted_total', 'Rows inserted into dynamic tables.', labelnames=('table',), bounded=('table',)
+)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamiccolumn',
+            name='unique',
+            field=models.BooleanField(default=False, help_text='Column values are unique, used as upsert key.', verbose_name='Unique'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0002_dynamiccolumn_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamictable',
+            name='versioned',
+            field=models.BooleanField(default=False, help_text='Rows have a version column used for optimistic concurrency.', verbose_name='Versioned'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0003_dynamictable_versioned'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamictable',
+            name='track_changes',
+            field=models.BooleanField(default=False, help_text='Rows have modification time and deletion mark used by change feed.', verbose_name='Track changes'),
+        ),
+    ]
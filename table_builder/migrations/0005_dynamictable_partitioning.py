@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-19 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0004_dynamictable_track_changes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamictable',
+            name='partition_key',
+            field=models.CharField(blank=True, help_text='Integer column, or `created_at` for range partitioning by row creation time.', max_length=59, verbose_name='Partition key'),
+        ),
+        migrations.AddField(
+            model_name='dynamictable',
+            name='partition_size',
+            field=models.PositiveIntegerField(blank=True, help_text='Range width of integer key, days of `created_at` key, or number of hash partitions.', null=True, verbose_name='Partition size'),
+        ),
+        migrations.AddField(
+            model_name='dynamictable',
+            name='partitioning',
+            field=models.CharField(blank=True, choices=[('', 'None'), ('range', 'Range'), ('hash', 'Hash')], default='', max_length=5, verbose_name='Partitioning'),
+        ),
+    ]
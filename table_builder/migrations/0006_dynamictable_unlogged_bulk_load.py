@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0005_dynamictable_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamictable',
+            name='bulk_load_indexes',
+            field=models.JSONField(blank=True, editable=False, help_text='Definitions of indexes dropped for the bulk load, they are recreated when it is finished.', null=True, verbose_name='Bulk load indexes'),
+        ),
+        migrations.AddField(
+            model_name='dynamictable',
+            name='unlogged',
+            field=models.BooleanField(default=False, help_text='Table is not written to WAL: faster writes, but rows are lost on crash and not replicated.', verbose_name='Unlogged'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-19 12:30
+
+from django.db import migrations, models
+import table_builder.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0006_dynamictable_unlogged_bulk_load'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dynamiccolumn',
+            name='name',
+            field=models.CharField(max_length=59, validators=[table_builder.validators.validate_column_name], verbose_name='Column name'),
+        ),
+    ]
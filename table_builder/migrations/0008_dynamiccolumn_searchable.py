@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0007_alter_dynamiccolumn_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamiccolumn',
+            name='searchable',
+            field=models.BooleanField(default=False, help_text='Char column is included into the full-text search of rows.', verbose_name='Searchable'),
+        ),
+    ]
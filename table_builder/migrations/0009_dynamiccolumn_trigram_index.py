@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0008_dynamiccolumn_searchable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamiccolumn',
+            name='trigram_index',
+            field=models.BooleanField(default=False, help_text='Char column has trigram index used by substring and prefix filters, requires pg_trgm extension.', verbose_name='Trigram index'),
+        ),
+    ]
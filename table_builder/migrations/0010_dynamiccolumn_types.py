@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0009_dynamiccolumn_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamiccolumn',
+            name='decimal_places',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Scale of decimal column, 4 by default.', null=True, verbose_name='Decimal places'),
+        ),
+        migrations.AddField(
+            model_name='dynamiccolumn',
+            name='max_digits',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Precision of decimal column, 19 by default.', null=True, verbose_name='Max digits'),
+        ),
+        migrations.AddField(
+            model_name='dynamiccolumn',
+            name='max_length',
+            field=models.PositiveIntegerField(blank=True, help_text='Maximal length of char column values, 255 by default.', null=True, verbose_name='Max length'),
+        ),
+        migrations.AlterField(
+            model_name='dynamiccolumn',
+            name='field_type',
+            field=models.CharField(choices=[('Char', 'CharField'), ('SmallInteger', 'SmallIntegerField'), ('Integer', 'IntegerField'), ('BigInteger', 'BigIntegerField'), ('Float', 'FloatField'), ('Decimal', 'DecimalField'), ('Boolean', 'BooleanField'), ('Date', 'DateField'), ('DateTime', 'DateTimeField'), ('UUID', 'UUIDField')], default='Char', max_length=100, verbose_name='Field type'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 12:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0010_dynamiccolumn_types'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamiccolumn',
+            name='expression',
+            field=models.CharField(blank=True, default='', help_text='Expression of stored generated column computed by the database, see `table_builder.expressions`.', max_length=1000, verbose_name='Expression'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-19 12:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+import table_builder.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0011_dynamiccolumn_expression'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('name', models.CharField(max_length=59, unique=True, validators=[table_builder.validators.validate_table_name], verbose_name='View name')),
+                ('filter', models.JSONField(blank=True, default=dict, help_text='Filter expression of rows, see `table_builder.filters`.', verbose_name='Filter')),
+                ('fields', models.JSONField(blank=True, default=list, help_text='Selected columns of not aggregated query, all by default.', verbose_name='Fields')),
+                ('group_by', models.JSONField(blank=True, default=list, help_text='Group by columns of aggregates.', verbose_name='Group by')),
+                ('aggregates', models.JSONField(blank=True, default=dict, help_text='Aggregates by alias, e.g. {"total": {"function": "sum", "column": "amount"}}.', verbose_name='Aggregates')),
+                ('refresh_policy', models.CharField(choices=[('manual', 'Manual'), ('scheduled', 'Scheduled'), ('on_write', 'On write')], default='manual', max_length=16, verbose_name='Refresh policy')),
+                ('refresh_interval', models.PositiveIntegerField(blank=True, help_text='Seconds between scheduled refreshes, or minimal seconds between refreshes on write.', null=True, verbose_name='Refresh interval')),
+                ('refreshed_at', models.DateTimeField(editable=False, null=True, verbose_name='Refreshed at')),
+                ('changed_at', models.DateTimeField(editable=False, help_text='Time of the last write to rows of the table.', null=True, verbose_name='Changed at')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_queries', to='table_builder.dynamictable', verbose_name='Table name')),
+            ],
+            options={
+                'get_latest_by': 'modified',
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-19 12:54
+
+from django.db import migrations, models
+import table_builder.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0012_savedquery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamictable',
+            name='schema',
+            field=models.CharField(blank=True, default='', help_text='Postgres schema of the table, the default schema of the database when empty.', max_length=63, validators=[table_builder.validators.validate_schema_name], verbose_name='Schema'),
+        ),
+    ]
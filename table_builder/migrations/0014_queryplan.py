@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 12:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table_builder', '0013_dynamictable_schema'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('operation', models.CharField(choices=[('rows', 'Rows'), ('update', 'Update')], max_length=16, verbose_name='Operation')),
+                ('columns', models.JSONField(default=list, help_text='Names of the table columns when it was captured.', verbose_name='Columns')),
+                ('sql', models.TextField(verbose_name='SQL')),
+                ('duration', models.FloatField(help_text='Duration of the query in seconds.', verbose_name='Duration')),
+                ('plan', models.JSONField(help_text='`EXPLAIN` output in JSON format, null for statements without plans, e.g. DDL.', null=True, verbose_name='Plan')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='query_plans', to='table_builder.dynamictable', verbose_name='Table name')),
+            ],
+            options={
+                'get_latest_by': 'modified',
+                'abstract': False,
+            },
+        ),
+    ]
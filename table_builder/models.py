@@ -1,44 +1,437 @@
+import logging
+import re
+import time
+import zlib
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+
 from django.apps import apps
+from django.apps.registry import Apps
+from django.contrib.postgres.indexes import GinIndex
 from django.core.exceptions import ValidationError
-from django.db import connection, models
+from django.core.management.color import no_style
+from django.db import DatabaseError, connection, models, transaction
+from django.db.backends.utils import truncate_name
+from django.db.models.functions import Cast, Now
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
 
 from django_extensions.db.models import TimeStampedModel
 
+from table_builder import metrics
 from table_builder.apps import TableBuilderConfig
-from table_builder.validators import validate_column_name, validate_table_name
+from table_builder.conf import get_setting
+from table_builder.expressions import compile_expression
+from table_builder.filters import build_filter
+from table_builder.queries import insert_select
+from table_builder.schema import PartitionedSchemaEditor, TableSchemaEditor, UnloggedSchemaEditor, qualify_name
+from table_builder.signals import rows_changed
+from table_builder.types import COLUMN_TYPES
+from table_builder.validators import validate_column_name, validate_schema_name, validate_table_name
+
+
+logger = logging.getLogger(__name__)
+
+# Dynamic models of the current process, keyed by table pk.
+# Values are `((db_table, modified), model)`, any save of the table invalidates the entry.
+_dynamic_models = {}
+# Models of saved query views by saved query pk, with their cache keys
+_view_models = {}
+# Views store values of auto fields, they are plain integers there
+VIEW_FIELD_CLASSES = {
+    'AutoField': models.IntegerField,
+    'BigAutoField': models.BigIntegerField,
+}
+TRIGRAM_EXTENSION = 'pg_trgm'
+TRIGRAM_OPCLASS = 'gin_trgm_ops'
+# Bound of a range partition as returned by `pg_get_expr`
+RANGE_BOUND_RE = re.compile(r"^FOR VALUES FROM \('?(?P<start>[^')]*)'?\) TO \('?(?P<end>[^')]*)'?\)$")
+
+
+class RowsQuerySet(models.QuerySet):
+    """
+    QuerySet of dynamic models, updates increment the version of rows of versioned tables.
+    """
+
+    def update(self, **kwargs):
+        version = DynamicTable.ROW_VERSION_COLUMN
+        if any(field.name == version for field in self.model._meta.concrete_fields):
+            kwargs.setdefault(version, models.F(version) + 1)
+        return super().update(**kwargs)
+
+
+class TrackedRowsQuerySet(RowsQuerySet):
+    """
+    QuerySet of dynamic models with change tracking.
+    Updates touch the modification time and deletes only mark rows as deleted, so they appear in the change feed.
+    """
+
+    def update(self, **kwargs):
+        kwargs.setdefault(DynamicTable.MODIFIED_AT_COLUMN, Now())
+        return super().update(**kwargs)
+
+    def delete(self):
+        deleted = self.update(**{DynamicTable.DELETED_COLUMN: True})
+        return deleted, {self.model._meta.label: deleted}
+
+
+class TrackedRowsManager(models.Manager.from_queryset(TrackedRowsQuerySet)):
+    """
+    Manager of dynamic models with change tracking, excludes deleted rows.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**{DynamicTable.DELETED_COLUMN: False})
 
 
 class DynamicTable(TimeStampedModel, models.Model):
+    ROW_VERSION_COLUMN = 'row_version'
+    MODIFIED_AT_COLUMN = 'modified_at'
+    DELETED_COLUMN = 'deleted'
+    CREATED_AT_COLUMN = 'created_at'
+    # Generated column, it's not a field of dynamic model, so rows are never written to it
+    SEARCH_VECTOR_COLUMN = 'search_vector'
+    # Range partitions by creation time are aligned to multiples of partition size since the epoch
+    PARTITION_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    # Samples are estimated for more rows than requested and at least this number of pages
+    SAMPLE_OVERSAMPLING = 2
+    SAMPLE_MIN_PAGES = 10
+
+    class Partitioning(models.TextChoices):
+        NONE = '', 'None'
+        RANGE = 'range', 'Range'
+        HASH = 'hash', 'Hash'
+
     name = models.CharField("Table Name", max_length=63, unique=True, validators=[validate_table_name])
+    schema = models.CharField(
+        "Schema", max_length=63, blank=True, default='', validators=[validate_schema_name],
+        help_text="Postgres schema of the table, the default schema of the database when empty.",
+    )
+    versioned = models.BooleanField(
+        "Versioned", default=False, help_text="Rows have a version column used for optimistic concurrency."
+    )
+    track_changes = models.BooleanField(
+        "Track changes", default=False, help_text="Rows have modification time and deletion mark used by change feed."
+    )
+    partitioning = models.CharField(
+        "Partitioning", max_length=5, choices=Partitioning.choices, default=Partitioning.NONE, blank=True
+    )
+    partition_key = models.CharField(
+        "Partition key", max_length=59, blank=True,
+        help_text="Integer column, or `created_at` for range partitioning by row creation time.",
+    )
+    partition_size = models.PositiveIntegerField(
+        "Partition size", null=True, blank=True,
+        help_text="Range width of integer key, days of `created_at` key, or number of hash partitions.",
+    )
+    unlogged = models.BooleanField(
+        "Unlogged", default=False,
+        help_text="Table is not written to WAL: faster writes, but rows are lost on crash and not replicated.",
+    )
+    bulk_load_indexes = models.JSONField(
+        "Bulk load indexes", null=True, blank=True, editable=False,
+        help_text="Definitions of indexes dropped for the bulk load, they are recreated when it is finished.",
+    )
 
     def __str__(self):
         return self.name
 
+    @property
+    def db_table(self):
+        """
+        Schema-qualified name of the table, see `schema.qualify_name`.
+        """
+        return qualify_name(self.schema, self.name)
+
+    @staticmethod
+    def get_shard_schema(name):
+        """
+        Get schema of a new table with the name, tables are spread across `TABLE_BUILDER_SCHEMA_SHARDS` schemas
+        by a stable hash of their names. Returns the default schema when sharding is disabled.
+        """
+        shards = get_setting('SCHEMA_SHARDS')
+        if not shards:
+            return ''
+        return f"{get_setting('SCHEMA_PREFIX')}{zlib.crc32(name.encode()) % shards}"
+
+    def _get_system_fields(self):
+        """
+        Method to get fields maintained by the table builder itself, depending on table options.
+        """
+        fields = {}
+        if self.versioned:
+            fields[self.ROW_VERSION_COLUMN] = models.IntegerField(default=1, editable=False)
+        if self.track_changes:
+            fields[self.MODIFIED_AT_COLUMN] = models.DateTimeField(auto_now=True, db_index=True, editable=False)
+            fields[self.DELETED_COLUMN] = models.BooleanField(default=False, editable=False)
+        if self.partition_key == self.CREATED_AT_COLUMN:
+            fields[self.CREATED_AT_COLUMN] = models.DateTimeField(auto_now_add=True)
+        return fields
+
+    def _get_fields(self):
+        """
+        Method to get fields of the dynamic model, both column and system ones.
+        """
+        columns = list(self.columns.all())
+        # Generated columns can reference other columns only
+        field_types = {column.name: column.field_type for column in columns if not column.expression}
+        return {
+            **{column.name: column._get_field(field_types) for column in columns},
+            **self._get_system_fields(),
+        }
+
     def _create_dynamic_model(self):
         """
         Create dynamic model class.
         """
-        fields = {
-            field.name: field._get_field() for field in self.columns.all()
-        }
+        fields = self._get_fields()
         attrs = {
             '__module__': 'table_builder.models',
             'Meta': type('Meta', (object,), {
-                'db_table': self.name,
+                'db_table': self.db_table,
             }),
             **fields,
         }
+        if self.track_changes:
+            # Default manager hides deleted rows, change feed reads all rows
+            attrs['objects'] = TrackedRowsManager()
+            attrs['all_objects'] = models.Manager.from_queryset(TrackedRowsQuerySet)()
+        elif self.versioned:
+            attrs['objects'] = models.Manager.from_queryset(RowsQuerySet)()
 
         model = type(str(self.name), (models.Model,), attrs)
         return model
 
-    @staticmethod
-    def _create_table(_model):
+    def _create_table(self, _model, schema_editor=None):
         """
-        Create table in the database.
+        Create table in the database, with initial partitions for partitioned tables.
+        :param schema_editor: - schema editor shared by tables created at once, used by tables with the default one.
+        Partitioned and unlogged tables open their own schema editors in the same transaction.
         """
-        with connection.schema_editor() as schema_editor:
+        if schema_editor is None or self.partitioning or self.unlogged:
+            context = self._schema_editor()
+        else:
+            context = nullcontext(schema_editor)
+        with metrics.DDL_SECONDS.time(operation='create'), context as schema_editor:
+            if self.schema:
+                schema_editor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema_editor.quote_name(self.schema)}")
             schema_editor.create_model(_model)
+            search_columns = self.get_search_columns()
+            if search_columns:
+                self._add_search_vector(schema_editor, search_columns)
+            for column in self.get_trigram_columns():
+                self._add_trigram_index(schema_editor, _model, column)
+            if self.partitioning == self.Partitioning.HASH:
+                for remainder in range(self.partition_size):
+                    schema_editor.create_partition(
+                        self.db_table, qualify_name(self.schema, self._get_relation_name(f'h{remainder}')),
+                        f'FOR VALUES WITH (MODULUS {self.partition_size:d}, REMAINDER {remainder:d})',
+                    )
+            elif self.partitioning == self.Partitioning.RANGE:
+                # Rows out of the created ranges are kept in the default partition
+                schema_editor.create_partition(
+                    self.db_table, qualify_name(self.schema, self._get_relation_name('default')), 'DEFAULT'
+                )
+                start = self._get_partition_range(self._get_current_partition_value())[0]
+                for index in range(get_setting('PARTITIONS_AHEAD') + 1):
+                    self._create_range_partition(schema_editor, start + index * self._get_partition_step())
+
+    def get_relation_names(self, columns, partitions=True):
+        """
+        Get schema-qualified names of relations created with the table: the table itself, indexes named after it
+        and its initial partitions. They share the namespace of the schema with other tables.
+        :param columns: - columns of the table, they may be not saved yet.
+        :param partitions: - include the table and its partitions, otherwise only indexes of the columns.
+        """
+        suffixes = []
+        if any(column.searchable for column in columns):
+            suffixes.append(self.SEARCH_VECTOR_COLUMN)
+        suffixes.extend(f'{column.name}_trgm' for column in columns if column.trigram_index)
+        if partitions and self.partitioning == self.Partitioning.HASH:
+            suffixes.extend(f'h{remainder}' for remainder in range(self.partition_size))
+        elif partitions and self.partitioning == self.Partitioning.RANGE:
+            suffixes.append('default')
+            start = self._get_partition_range(self._get_current_partition_value())[0]
+            suffixes.extend(
+                self._get_range_partition_suffix(start + index * self._get_partition_step())
+                for index in range(get_setting('PARTITIONS_AHEAD') + 1)
+            )
+        names = [qualify_name(self.schema, self._get_relation_name(suffix)) for suffix in suffixes]
+        return [self.db_table, *names] if partitions else names
+
+    def get_search_columns(self):
+        """
+        Get names of searchable columns, they are indexed by the search vector column.
+        """
+        return [column.name for column in self.columns.all() if column.searchable]
+
+    def _add_search_vector(self, schema_editor, columns):
+        """
+        Add generated `tsvector` column over the searchable columns, with GIN index.
+        """
+        quote_name = schema_editor.quote_name
+        document = " || ' ' || ".join(f"coalesce({quote_name(column)}, '')" for column in columns)
+        with metrics.DDL_SECONDS.time(operation='add'):
+            schema_editor.execute(
+                f"ALTER TABLE {quote_name(self.db_table)} ADD COLUMN {quote_name(self.SEARCH_VECTOR_COLUMN)} tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector(%s::regconfig, {document})) STORED",
+                [get_setting('SEARCH_CONFIG')],
+            )
+            schema_editor.execute(
+                f"CREATE INDEX {quote_name(self._get_relation_name(self.SEARCH_VECTOR_COLUMN))} "
+                f"ON {quote_name(self.db_table)} USING GIN ({quote_name(self.SEARCH_VECTOR_COLUMN)})"
+            )
+
+    def _remove_search_vector(self, schema_editor):
+        quote_name = schema_editor.quote_name
+        with metrics.DDL_SECONDS.time(operation='remove'):
+            schema_editor.execute(
+                f"ALTER TABLE {quote_name(self.db_table)} DROP COLUMN IF EXISTS {quote_name(self.SEARCH_VECTOR_COLUMN)}"
+            )
+
+    def get_trigram_columns(self):
+        """
+        Get names of columns with trigram index.
+        """
+        return [column.name for column in self.columns.all() if column.trigram_index]
+
+    def _get_trigram_index(self, column):
+        return GinIndex(
+            fields=[column], name=self._get_relation_name(f'{column}_trgm'), opclasses=[TRIGRAM_OPCLASS],
+        )
+
+    def _add_trigram_index(self, schema_editor, _model, column):
+        """
+        Add GIN trigram index used by `contains`, `startswith`, `endswith` lookups and their case-insensitive variants.
+        """
+        schema_editor.execute(f"CREATE EXTENSION IF NOT EXISTS {TRIGRAM_EXTENSION}")
+        with metrics.DDL_SECONDS.time(operation='create_index'):
+            schema_editor.add_index(_model, self._get_trigram_index(column))
+
+    def _remove_trigram_index(self, schema_editor, _model, column):
+        with metrics.DDL_SECONDS.time(operation='drop_index'):
+            schema_editor.remove_index(_model, self._get_trigram_index(column))
+
+    def _schema_editor(self):
+        """
+        Get schema editor of the table, partitioned tables are created with `PARTITION BY`.
+        """
+        if self.partitioning:
+            return PartitionedSchemaEditor(connection, self.partitioning, self.partition_key)
+        if self.unlogged:
+            return UnloggedSchemaEditor(connection)
+        return TableSchemaEditor(connection)
+
+    def _get_relation_name(self, suffix):
+        """
+        Get name of a partition or an index of the table, truncated to the maximal identifier length.
+        Relations are created in the schema of the table, the name is not qualified.
+        """
+        return truncate_name(f'{self.name}_{suffix}', connection.ops.max_name_length())
+
+    def _get_partition_step(self):
+        if self.partition_key == self.CREATED_AT_COLUMN:
+            return timedelta(days=self.partition_size)
+        return self.partition_size
+
+    def _get_partition_range(self, value):
+        """
+        Get bounds `(start, end)` of the range partition containing the partition key value.
+        """
+        step = self._get_partition_step()
+        if self.partition_key == self.CREATED_AT_COLUMN:
+            start = self.PARTITION_EPOCH + (value - self.PARTITION_EPOCH) // step * step
+        else:
+            start = value // step * step
+        return start, start + step
+
+    def _get_current_partition_value(self, partitions=()):
+        """
+        Get partition key value of the current range partition:
+        current time for `created_at` key, start of the last partition with rows (or zero) for integer key.
+        :param partitions: - existing partitions, see `get_partitions`.
+        """
+        if self.partition_key == self.CREATED_AT_COLUMN:
+            return datetime.now(timezone.utc)
+        with connection.cursor() as cursor:
+            for name, start, _ in sorted(
+                (partition for partition in partitions if partition[1] is not None), key=lambda p: p[1], reverse=True
+            ):
+                # Stops on the first row, unlike max() of the key
+                cursor.execute(
+                    f"SELECT EXISTS (SELECT 1 FROM {connection.ops.quote_name(qualify_name(self.schema, name))})"
+                )
+                if cursor.fetchone()[0]:
+                    return start
+        return 0
+
+    @staticmethod
+    def _get_range_partition_suffix(start):
+        return start.strftime('p%Y%m%d') if isinstance(start, datetime) else f'p{start}'.replace('-', 'm')
+
+    def _create_range_partition(self, schema_editor, start):
+        """
+        Create range partition starting at the value, returns name of the partition.
+        """
+        name = self._get_relation_name(self._get_range_partition_suffix(start))
+        with metrics.DDL_SECONDS.time(operation='create_partition'):
+            schema_editor.create_partition(
+                self.db_table, qualify_name(self.schema, name), 'FOR VALUES FROM (%s) TO (%s)',
+                [start, start + self._get_partition_step()],
+            )
+        return name
+
+    def get_partitions(self):
+        """
+        Get partitions of the table.
+        Returns list of `(name, start, end)` tuples, bounds are None for default and hash partitions.
+        """
+        field = self._get_fields()[self.partition_key]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(%s)",
+                [connection.ops.quote_name(self.db_table)],
+            )
+            rows = cursor.fetchall()
+        partitions = []
+        for name, bound in rows:
+            match = RANGE_BOUND_RE.match(bound)
+            if match:
+                partitions.append((name, field.to_python(match['start']), field.to_python(match['end'])))
+            else:
+                partitions.append((name, None, None))
+        return partitions
+
+    def maintain_partitions(self, ahead=None, retain=None):
+        """
+        Pre-create and detach range partitions.
+        Detached partitions are kept as standalone tables, so they can be archived or dropped.
+        :param ahead: - number of partitions to keep after the current one, `TABLE_BUILDER_PARTITIONS_AHEAD` by default.
+        :param retain: - number of partitions to keep before the current one, older ones are detached.
+        Returns tuple of lists of created and detached partition names.
+        """
+        if self.partitioning != self.Partitioning.RANGE:
+            return [], []
+        ahead = get_setting('PARTITIONS_AHEAD') if ahead is None else ahead
+        partitions = self.get_partitions()
+        existing = {start for _, start, _ in partitions if start is not None}
+        current = self._get_partition_range(self._get_current_partition_value(partitions))[0]
+        step = self._get_partition_step()
+        created = []
+        detached = []
+        with self._schema_editor() as schema_editor:
+            for index in range(ahead + 1):
+                start = current + index * step
+                if start not in existing:
+                    created.append(self._create_range_partition(schema_editor, start))
+            if retain is not None:
+                for name, _, end in partitions:
+                    if end is not None and end <= current - retain * step:
+                        with metrics.DDL_SECONDS.time(operation='detach_partition'):
+                            schema_editor.detach_partition(self.db_table, qualify_name(self.schema, name))
+                        detached.append(name)
+        return created, detached
 
     @staticmethod
     def _register_model(_model):
@@ -53,21 +446,164 @@ class DynamicTable(TimeStampedModel, models.Model):
         Returns True if the table exists, False otherwise.
         """
         with connection.cursor() as cursor:
-            cursor.execute("SELECT to_regclass(%s)", [self.name])
+            cursor.execute("SELECT to_regclass(%s)", [connection.ops.quote_name(self.db_table)])
             result = cursor.fetchone()
             return result[0] is not None
 
+    def estimate_size(self):
+        """
+        Get numbers of rows and pages of the table estimated by planner statistics, including partitions.
+        Returns zeros when the table was not analyzed yet.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT coalesce(sum(greatest(c.reltuples, 0)), 0), coalesce(sum(c.relpages), 0) FROM pg_class c "
+                "WHERE c.oid = to_regclass(%s) "
+                "OR c.oid IN (SELECT i.inhrelid FROM pg_inherits i WHERE i.inhparent = to_regclass(%s))",
+                [connection.ops.quote_name(self.db_table)] * 2,
+            )
+            rows, pages = cursor.fetchone()
+            return int(rows), int(pages)
+
+    def get_sample_percent(self, limit):
+        """
+        Get percent of the table sampled to return about `limit` rows, see `queries.sample_rows`.
+        The percent is estimated for more rows and at least `SAMPLE_MIN_PAGES` pages,
+        so sampling of whole pages rarely returns fewer rows. All the table is sampled when it was not analyzed.
+        """
+        rows, pages = self.estimate_size()
+        if not rows or not pages:
+            return 100
+        percent = max(100 * self.SAMPLE_OVERSAMPLING * limit / rows, 100 * self.SAMPLE_MIN_PAGES / pages)
+        return min(100, percent)
+
+    @staticmethod
+    def existing_tables(names):
+        """
+        Function to check which of the tables exist in the database using a single catalog query.
+        :param names: - schema-qualified table names, see `db_table`.
+        Returns set of existing table names.
+        """
+        quoted = {connection.ops.quote_name(name): name for name in names}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM unnest(%s::text[]) AS name WHERE to_regclass(name) IS NOT NULL", [list(quoted)]
+            )
+            return {quoted[name] for name, in cursor.fetchall()}
+
+    @classmethod
+    def warm_up_dynamic_models(cls, budget=None):
+        """
+        Build dynamic models of all tables up front, so first requests don't pay model construction.
+        Tables and their columns are loaded with one prefetch and existence is checked with one catalog query.
+        :param budget: - time budget in seconds, tables left after the budget is spent are loaded lazily.
+        Returns number of built models.
+        """
+        start = time.monotonic()
+        tables = list(cls.objects.prefetch_related('columns'))
+        existing = cls.existing_tables([table.db_table for table in tables])
+        built = 0
+        for index, table in enumerate(tables):
+            if budget is not None and time.monotonic() - start > budget:
+                logger.warning(
+                    "Dynamic models warm-up exceeded %ss budget, %s of %s tables left for lazy loading",
+                    budget, len(tables) - index, len(tables),
+                )
+                break
+            if table.db_table in existing:
+                table._build_dynamic_model()
+                built += 1
+        return built
+
+    def _cache_key(self):
+        return self.db_table, self.modified
+
+    def _build_dynamic_model(self):
+        """
+        Create and register dynamic model, and put it into the model cache.
+        """
+        with metrics.MODEL_BUILD_SECONDS.time():
+            _model = self._create_dynamic_model()
+            self._register_model(_model)
+        _dynamic_models[self.pk] = (self._cache_key(), _model)
+        return _model
+
+    def _evict_dynamic_model(self):
+        """
+        Remove dynamic model from the model cache.
+        """
+        _dynamic_models.pop(self.pk, None)
+
+    @classmethod
+    def get_dynamic_models(cls, tables):
+        """
+        Get dynamic models of the tables at once.
+        Models missing in the model cache are built with one columns prefetch and one catalog query.
+        Returns dict of dynamic models by table pk.
+        """
+        dynamic_models = {}
+        missing = []
+        for table in tables:
+            cached = _dynamic_models.get(table.pk)
+            if cached is not None and cached[0] == table._cache_key():
+                metrics.MODEL_CACHE_HITS.inc()
+                dynamic_models[table.pk] = cached[1]
+            else:
+                metrics.MODEL_CACHE_MISSES.inc()
+                missing.append(table)
+        if missing:
+            models.prefetch_related_objects(missing, 'columns')
+            existing = cls.existing_tables([table.db_table for table in missing])
+            for table in missing:
+                if table.db_table not in existing:
+                    raise ValidationError(f"Table with name {table.name} does not exist")
+                dynamic_models[table.pk] = table._build_dynamic_model()
+        return dynamic_models
+
     def get_dynamic_model(self):
         """
         Method to get dynamic model.
+        Model is taken from the model cache while the table is not modified.
         """
+        cached = _dynamic_models.get(self.pk)
+        if cached is not None and cached[0] == self._cache_key():
+            metrics.MODEL_CACHE_HITS.inc()
+            return cached[1]
+        metrics.MODEL_CACHE_MISSES.inc()
         if self.is_table_exists():
-            _model = self._create_dynamic_model()
-            self._register_model(_model)
-            return _model
+            return self._build_dynamic_model()
         else:
             raise ValidationError(f"Table with name {self.name} does not exist")
 
+    @classmethod
+    def bulk_create_dynamic_models(cls, tables):
+        """
+        Create tables with their columns and dynamic models at once, all or nothing.
+        Metadata is inserted with `bulk_create`, existence of the tables is checked with one catalog query
+        and DDL of all tables is run by one schema editor in one transaction.
+        :param tables: - list of `(table, columns)` tuples of unsaved instances.
+        Returns list of created tables.
+        """
+        existing = cls.existing_tables([table.db_table for table, _ in tables])
+        if existing:
+            names = sorted(table.name for table, _ in tables if table.db_table in existing)
+            raise ValidationError(f"Tables with names {', '.join(names)} already exist")
+        with transaction.atomic():
+            created = cls.objects.bulk_create([table for table, _ in tables])
+            for table, columns in tables:
+                for column in columns:
+                    column.table = table
+            DynamicColumn.objects.bulk_create([column for _, columns in tables for column in columns])
+            models.prefetch_related_objects(created, 'columns')
+            dynamic_models = [table._create_dynamic_model() for table in created]
+            with TableSchemaEditor(connection) as schema_editor:
+                for table, _model in zip(created, dynamic_models):
+                    table._create_table(_model, schema_editor)
+        for table, _model in zip(created, dynamic_models):
+            cls._register_model(_model)
+            _dynamic_models[table.pk] = (table._cache_key(), _model)
+        return created
+
     def create_dynamic_model(self):
         """
         Method to create dynamic model.
@@ -76,18 +612,29 @@ class DynamicTable(TimeStampedModel, models.Model):
             _model = self._create_dynamic_model()
             self._create_table(_model)
             self._register_model(_model)
+            _dynamic_models[self.pk] = (self._cache_key(), _model)
         else:
             raise ValidationError(f"Table with name {self.name} already exists")
 
-    def update_dynamic_model(self, previous_state: dict["str", "str"]):
+    def get_columns_state(self):
+        """
+        Method to get state of columns, including system ones.
+        Returns dict with column names as keys and deconstructed fields `(path, args, kwargs)` as values.
+        """
+        return {name: field.deconstruct()[1:] for name, field in self._get_fields().items()}
+
+    def update_dynamic_model(self, previous_state: dict[str, tuple], previous_search_columns=(),
+                             previous_trigram_columns=()):
         """
         Method to update dynamic model.
         This method depends on previous state of columns.
-        :param previous_state: - dict with previous state of columns. Keys are column names, values are field types.
+        :param previous_state: - dict with previous state of columns, see `get_columns_state`.
+        :param previous_search_columns: - previous names of searchable columns, see `get_search_columns`.
+        :param previous_trigram_columns: - previous names of columns with trigram index, see `get_trigram_columns`.
         """
         # TODO: This method is too long and hard to read. I think it ok for now, but it should be refactored.
         if self.is_table_exists():
-            new_state = dict(self.columns.values_list('name', 'field_type'))
+            new_state = self.get_columns_state()
             # Get columns to add, remove and update
             columns_to_add = set(new_state.keys()) - set(previous_state.keys())
             columns_to_remove = set(previous_state.keys()) - set(new_state.keys())
@@ -95,54 +642,247 @@ class DynamicTable(TimeStampedModel, models.Model):
             for column in set(new_state.keys()) & set(previous_state.keys()):
                 if new_state[column] != previous_state[column]:
                     columns_to_update.add(column)
+            # Generated columns can't be altered and block changes of referenced columns, so they are re-created
+            previous_generated = {
+                column for column, state in previous_state.items() if 'expression' in state[2]
+            }
+            generated = {column for column, state in new_state.items() if 'expression' in state[2]}
+            if (columns_to_remove | columns_to_update) - previous_generated:
+                generated_to_recreate = previous_generated & generated
+            else:
+                generated_to_recreate = previous_generated & generated & columns_to_update
+            generated_to_recreate |= (previous_generated ^ generated) & columns_to_update
+            columns_to_remove |= generated_to_recreate
+            columns_to_add |= generated_to_recreate
+            columns_to_update -= generated_to_recreate
+            # Search vector is regenerated when searchable columns are changed, it depends on them
+            search_columns = self.get_search_columns()
+            previous_search_columns = list(previous_search_columns)
+            search_changed = search_columns != previous_search_columns or bool(
+                set(previous_search_columns) & (columns_to_remove | columns_to_update)
+            )
+            trigram_columns = self.get_trigram_columns()
+            # Views of saved queries depend on the columns, they are re-created over the new ones
+            saved_queries = []
+            if columns_to_add | columns_to_remove | columns_to_update:
+                saved_queries = list(self.saved_queries.all())
             # Get model
-            _model = self._create_dynamic_model()
-            self._register_model(_model)
+            _model = self._build_dynamic_model()
 
-            with connection.schema_editor() as schema_editor:
-                # Delete removed columns
-                for column in columns_to_remove:
-                    old_field = DynamicColumn._get_field_by_type(previous_state[column])
-                    old_field.set_attributes_from_name(column)
-                    schema_editor.remove_field(_model, old_field)
-                # Add new columns
-                for column in columns_to_add:
-                    field = DynamicColumn._get_field_by_type(new_state[column])
-                    field.set_attributes_from_name(column)
-                    schema_editor.add_field(_model, field)
+            with TableSchemaEditor(connection) as schema_editor:
+                for saved_query in saved_queries:
+                    saved_query.delete_view()
+                if self.DELETED_COLUMN in columns_to_remove:
+                    # Change tracking is disabled, rows marked as deleted would become visible without the mark
+                    schema_editor.execute('DELETE FROM {table} WHERE {deleted}'.format(
+                        table=schema_editor.quote_name(self.db_table),
+                        deleted=schema_editor.quote_name(self.DELETED_COLUMN),
+                    ))
+                if search_changed and previous_search_columns:
+                    self._remove_search_vector(schema_editor)
+                # Indexes of removed columns are dropped with them
+                for column in set(previous_trigram_columns) - set(trigram_columns) - columns_to_remove:
+                    self._remove_trigram_index(schema_editor, _model, column)
+                # Delete removed columns, generated ones first as they depend on the others
+                for column in sorted(columns_to_remove, key=lambda name: name not in previous_generated):
+                    old_field = DynamicColumn._get_field_from_state(column, previous_state[column])
+                    with metrics.DDL_SECONDS.time(operation='remove'):
+                        schema_editor.remove_field(_model, old_field)
                 # Update existing columns
                 for column in columns_to_update:
-                    old_field = DynamicColumn._get_field_by_type(previous_state[column])
-                    old_field.set_attributes_from_name(column)
-                    field = DynamicColumn._get_field_by_type(new_state[column])
-                    field.set_attributes_from_name(column)
-                    schema_editor.alter_field(_model, old_field, field, strict=False)
+                    old_field = DynamicColumn._get_field_from_state(column, previous_state[column])
+                    field = DynamicColumn._get_field_from_state(column, new_state[column])
+                    with metrics.DDL_SECONDS.time(operation='alter'):
+                        schema_editor.alter_field(_model, old_field, field, strict=False)
+                # Add new columns, generated ones last as they depend on the others
+                for column in sorted(columns_to_add, key=lambda name: name in generated):
+                    field = DynamicColumn._get_field_from_state(column, new_state[column])
+                    with metrics.DDL_SECONDS.time(operation='add'):
+                        schema_editor.add_field(_model, field)
+                if search_changed and search_columns:
+                    self._add_search_vector(schema_editor, search_columns)
+                # Indexes of re-created columns are dropped with them too
+                for column in set(trigram_columns) - (set(previous_trigram_columns) - generated_to_recreate):
+                    self._add_trigram_index(schema_editor, _model, column)
+            for saved_query in saved_queries:
+                saved_query.table = self
+                saved_query.create_view()
         else:
             raise ValidationError(f"Table with name {self.name} does not exist")
 
+    def set_logged(self, logged):
+        """
+        Switch the table to LOGGED or UNLOGGED, the table is rewritten.
+        """
+        with metrics.DDL_SECONDS.time(operation='alter'), connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {connection.ops.quote_name(self.db_table)} SET {'LOGGED' if logged else 'UNLOGGED'}"
+            )
+
+    def start_bulk_load(self):
+        """
+        Start bulk load of the table: secondary indexes are dropped, so they are built once when the load is finished.
+        Indexes of primary key and unique constraints are kept. Definitions of dropped indexes are kept in the table.
+        """
+        quote_name = connection.ops.quote_name
+        with transaction.atomic():
+            table = DynamicTable.objects.select_for_update().get(pk=self.pk)
+            if table.bulk_load_indexes is not None:
+                raise ValidationError(f"Bulk load of table {self.name} is already started")
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+                    "JOIN pg_class c ON c.oid = i.indexrelid WHERE i.indrelid = to_regclass(%s) "
+                    "AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = i.indexrelid)",
+                    [quote_name(self.db_table)],
+                )
+                indexes = dict(cursor.fetchall())
+                with metrics.DDL_SECONDS.time(operation='drop_index'):
+                    for name in indexes:
+                        cursor.execute(f"DROP INDEX {quote_name(qualify_name(self.schema, name))}")
+            # Queryset update keeps the table modification time, so the cached dynamic model stays valid
+            DynamicTable.objects.filter(pk=self.pk).update(bulk_load_indexes=indexes)
+        self.bulk_load_indexes = indexes
+
+    def finish_bulk_load(self, logged=False):
+        """
+        Finish bulk load of the table: recreate dropped indexes and update planner statistics.
+        :param logged: - switch unlogged table to LOGGED, e.g. after the initial load of a staging table.
+        """
+        with transaction.atomic():
+            table = DynamicTable.objects.select_for_update().get(pk=self.pk)
+            if table.bulk_load_indexes is None:
+                raise ValidationError(f"Bulk load of table {self.name} is not started")
+            with connection.cursor() as cursor:
+                with metrics.DDL_SECONDS.time(operation='create_index'):
+                    for definition in table.bulk_load_indexes.values():
+                        cursor.execute(definition)
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(self.db_table)}")
+            if logged and table.unlogged:
+                self.set_logged(True)
+            DynamicTable.objects.filter(pk=self.pk).update(
+                bulk_load_indexes=None, unlogged=table.unlogged and not logged
+            )
+        self.bulk_load_indexes = None
+        self.unlogged = table.unlogged and not logged
+
+    def copy_rows(self, queryset):
+        """
+        Copy rows of a dynamic model queryset into the table with `INSERT ... SELECT`, rows don't pass through python.
+        Fields present in both models are copied, including `id`, generated columns are computed by the target.
+        Secondary indexes are built once after the copy.
+        Returns number of copied rows.
+        """
+        _model = self.get_dynamic_model()
+        source_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        fields = [
+            field.name for field in _model._meta.concrete_fields
+            if field.name in source_fields and not getattr(field, 'generated', False)
+        ]
+        with transaction.atomic():
+            if not self.partitioning:
+                self.start_bulk_load()
+            copied = insert_select(_model, queryset, fields)
+            with connection.cursor() as cursor:
+                # Copied ids are not taken from the identity sequence
+                for sql in connection.ops.sequence_reset_sql(no_style(), [_model]):
+                    cursor.execute(sql)
+            if not self.partitioning:
+                self.finish_bulk_load()
+        return copied
+
+    def move_to_schema(self, schema):
+        """
+        Move the table with its partitions and views of saved queries to another schema, created if needed.
+        Indexes, constraints and the identity sequence are moved with the table, rows are not rewritten.
+        :param schema: - target schema, empty for the default schema of the database.
+        Returns False when the table is already in the schema.
+        """
+        if schema == self.schema:
+            return False
+        if not self.is_table_exists():
+            raise ValidationError(f"Table with name {self.name} does not exist")
+        if self.bulk_load_indexes is not None:
+            # Definitions of dropped indexes reference the table by its current name
+            raise ValidationError(f"Table {self.name} cannot be moved during bulk load")
+        quote_name = connection.ops.quote_name
+        partitions = [name for name, _, _ in self.get_partitions()] if self.partitioning else []
+        saved_queries = list(self.saved_queries.all())
+        if self.existing_tables([
+            qualify_name(schema, name) for name in [self.name, *partitions, *(query.name for query in saved_queries)]
+        ]):
+            raise ValidationError(f"Relations of table {self.name} already exist in the target schema")
+        with transaction.atomic(), metrics.DDL_SECONDS.time(operation='move'), connection.cursor() as cursor:
+            if schema:
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {quote_name(schema)}")
+                target = quote_name(schema)
+            else:
+                cursor.execute("SELECT current_schema()")
+                target = quote_name(cursor.fetchone()[0])
+            for name in [self.name, *partitions]:
+                cursor.execute(f"ALTER TABLE {quote_name(qualify_name(self.schema, name))} SET SCHEMA {target}")
+            for saved_query in saved_queries:
+                cursor.execute(f"ALTER MATERIALIZED VIEW {quote_name(saved_query.db_table)} SET SCHEMA {target}")
+            self.schema = schema
+            # Saving updates the modification time, so cached models of the old relations are rebuilt
+            self.save()
+        return True
+
     def delete_dynamic_model(self):
         """
         Method to delete dynamic model.
         """
         if self.is_table_exists():
-            _model = apps.get_model(TableBuilderConfig.name, self.name)
-            with connection.schema_editor() as schema_editor:
+            _model = self.get_dynamic_model()
+            for saved_query in self.saved_queries.all():
+                saved_query.delete_view()
+            with metrics.DDL_SECONDS.time(operation='drop'), TableSchemaEditor(connection) as schema_editor:
                 schema_editor.delete_model(_model)
+            self._evict_dynamic_model()
         else:
             raise ValidationError(f"Table with name {self.name} does not exist")
 
 
 class DynamicColumn(TimeStampedModel, models.Model):
+    # Model fields of the types are built by the column types registry, see `table_builder.types`
     class FieldTypes(models.TextChoices):
         CHAR_FIELD = 'Char', 'CharField'
+        SMALL_INTEGER_FIELD = 'SmallInteger', 'SmallIntegerField'
         INTEGER_FIELD = 'Integer', 'IntegerField'
+        BIG_INTEGER_FIELD = 'BigInteger', 'BigIntegerField'
+        FLOAT_FIELD = 'Float', 'FloatField'
+        DECIMAL_FIELD = 'Decimal', 'DecimalField'
         BOOLEAN_FIELD = 'Boolean', 'BooleanField'
+        DATE_FIELD = 'Date', 'DateField'
+        DATE_TIME_FIELD = 'DateTime', 'DateTimeField'
+        UUID_FIELD = 'UUID', 'UUIDField'
 
-    name = models.CharField("Column name", max_length=59, unique=True, validators=[validate_column_name])
+    name = models.CharField("Column name", max_length=59, validators=[validate_column_name])
     table = models.ForeignKey(DynamicTable, verbose_name="Table name", on_delete=models.CASCADE, related_name='columns')
     field_type = models.CharField(
         "Field type", max_length=100, choices=FieldTypes.choices, default=FieldTypes.CHAR_FIELD
     )
+    unique = models.BooleanField("Unique", default=False, help_text="Column values are unique, used as upsert key.")
+    searchable = models.BooleanField(
+        "Searchable", default=False, help_text="Char column is included into the full-text search of rows."
+    )
+    trigram_index = models.BooleanField(
+        "Trigram index", default=False,
+        help_text="Char column has trigram index used by substring and prefix filters, requires pg_trgm extension.",
+    )
+    max_length = models.PositiveIntegerField(
+        "Max length", null=True, blank=True, help_text="Maximal length of char column values, 255 by default."
+    )
+    max_digits = models.PositiveSmallIntegerField(
+        "Max digits", null=True, blank=True, help_text="Precision of decimal column, 19 by default."
+    )
+    decimal_places = models.PositiveSmallIntegerField(
+        "Decimal places", null=True, blank=True, help_text="Scale of decimal column, 4 by default."
+    )
+    expression = models.CharField(
+        "Expression", max_length=1000, blank=True, default='',
+        help_text="Expression of stored generated column computed by the database, see `table_builder.expressions`.",
+    )
 
     def __str__(self):
         return f"{self.name} ({self.get_field_type_display()})"
@@ -150,22 +890,284 @@ class DynamicColumn(TimeStampedModel, models.Model):
     class Meta:
         unique_together = ('name', 'table')
 
-    def _get_field(self):
+    def _get_field(self, field_types=None):
         """
         Method to get Django model field by field type.
+        :param field_types: - field types of columns which can be referenced by the expression, by column name.
         """
-        return self._get_field_by_type(self.field_type)
+        options = {
+            name: getattr(self, name) for name in ('max_length', 'max_digits', 'decimal_places')
+            if getattr(self, name) is not None
+        }
+        if self.expression:
+            options['expression'] = compile_expression(self.expression, field_types or {})[0]
+        return self._get_field_by_type(self.field_type, unique=self.unique, **options)
 
     @staticmethod
-    def _get_field_by_type(field_type):
+    def _get_field_by_type(field_type, **options):
         """
         Method to get Django model field by field type.
+        :param options: - additional field options, e.g. `unique` or `expression` of generated columns.
         """
-        if field_type == DynamicColumn.FieldTypes.CHAR_FIELD:
-            return models.CharField(max_length=255)
-        elif field_type == DynamicColumn.FieldTypes.INTEGER_FIELD:
-            return models.IntegerField()
-        elif field_type == DynamicColumn.FieldTypes.BOOLEAN_FIELD:
-            return models.BooleanField()
-        else:
+        column_type = COLUMN_TYPES.get(field_type)
+        if column_type is None or ('expression' in options and column_type.generated_field_class is None):
             raise NotImplementedError("This field type is not supported.")
+        return column_type.get_field(**options)
+
+    @staticmethod
+    def _get_field_from_state(name, state):
+        """
+        Method to get Django model field from the deconstructed field, see `DynamicTable.get_columns_state`.
+        """
+        path, args, kwargs = state
+        field = import_string(path)(*args, **kwargs)
+        field.set_attributes_from_name(name)
+        return field
+
+
+class SavedQuery(TimeStampedModel, models.Model):
+    """
+    Filter or aggregate query over a dynamic table, stored as a materialized view.
+    Views have a unique index on `id` or group by columns, so they are refreshed concurrently without blocking reads.
+    """
+    class RefreshPolicy(models.TextChoices):
+        MANUAL = 'manual', 'Manual'
+        SCHEDULED = 'scheduled', 'Scheduled'
+        ON_WRITE = 'on_write', 'On write'
+
+    AGGREGATES = {
+        'count': models.Count,
+        'sum': models.Sum,
+        'avg': models.Avg,
+        'min': models.Min,
+        'max': models.Max,
+    }
+
+    name = models.CharField("View name", max_length=59, unique=True, validators=[validate_table_name])
+    table = models.ForeignKey(
+        DynamicTable, verbose_name="Table name", on_delete=models.CASCADE, related_name='saved_queries'
+    )
+    filter = models.JSONField(  # noqa: A003
+        "Filter", default=dict, blank=True, help_text="Filter expression of rows, see `table_builder.filters`.",
+    )
+    fields = models.JSONField(
+        "Fields", default=list, blank=True, help_text="Selected columns of not aggregated query, all by default.",
+    )
+    group_by = models.JSONField("Group by", default=list, blank=True, help_text="Group by columns of aggregates.")
+    aggregates = models.JSONField(
+        "Aggregates", default=dict, blank=True,
+        help_text="Aggregates by alias, e.g. {\"total\": {\"function\": \"sum\", \"column\": \"amount\"}}.",
+    )
+    refresh_policy = models.CharField(
+        "Refresh policy", max_length=16, choices=RefreshPolicy.choices, default=RefreshPolicy.MANUAL
+    )
+    refresh_interval = models.PositiveIntegerField(
+        "Refresh interval", null=True, blank=True,
+        help_text="Seconds between scheduled refreshes, or minimal seconds between refreshes on write.",
+    )
+    refreshed_at = models.DateTimeField("Refreshed at", null=True, editable=False)
+    changed_at = models.DateTimeField(
+        "Changed at", null=True, editable=False, help_text="Time of the last write to rows of the table."
+    )
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def db_table(self):
+        """
+        Schema-qualified name of the view, views are created in the schema of their table.
+        """
+        return qualify_name(self.table.schema, self.name)
+
+    def is_stale(self):
+        """
+        Check if rows of the table were written after the last refresh of the view.
+        """
+        return self.changed_at is not None and (self.refreshed_at is None or self.changed_at > self.refreshed_at)
+
+    def get_columns(self):
+        """
+        Get names of the table columns used by the query.
+        """
+        return {
+            *(key.partition('__')[0] for key in self.filter),
+            *self.fields,
+            *self.group_by,
+            *(aggregate['column'] for aggregate in self.aggregates.values() if aggregate.get('column')),
+        }
+
+    def get_key_columns(self):
+        """
+        Get columns of the unique index of the view, empty for aggregates without group by columns.
+        """
+        return list(self.group_by) if self.aggregates else ['id']
+
+    def get_queryset(self):
+        """
+        Get `values()` queryset of the query over the dynamic model of the table.
+        """
+        dynamic_model = self.table.get_dynamic_model()
+        queryset = dynamic_model.objects.filter(build_filter(dynamic_model, self.filter))
+        if self.aggregates:
+            aggregates = {
+                alias: self._cast_aggregate(
+                    queryset, self.AGGREGATES[aggregate['function']](aggregate.get('column') or '*')
+                )
+                for alias, aggregate in self.aggregates.items()
+            }
+            if self.group_by:
+                queryset = queryset.values(*self.group_by)
+            else:
+                # Grouping on a constant aggregates all rows into a single one, `values()` would group by `id`
+                queryset = queryset.annotate(_all=models.Value(1)).values('_all')
+            return queryset.annotate(**aggregates).values(*self.group_by, *aggregates).order_by()
+        fields = self.fields or [field.attname for field in dynamic_model._meta.concrete_fields]
+        return queryset.values('id', *(name for name in fields if name != 'id'))
+
+    @staticmethod
+    def _cast_aggregate(queryset, aggregate):
+        """
+        Cast the aggregate to its output field, Postgres types of aggregates differ from it,
+        e.g. `avg` of integers is numeric and `count` is bigint.
+        Integers are widened so sums don't overflow, decimals keep the precision of the result.
+        """
+        output_field = aggregate.resolve_expression(queryset.query).output_field
+        if isinstance(output_field, models.DecimalField):
+            return aggregate
+        if isinstance(output_field, models.IntegerField):
+            output_field = models.BigIntegerField()
+        return Cast(aggregate, output_field)
+
+    def get_view_model(self):
+        """
+        Get unmanaged model of the view, used to read, filter and represent rows like the dynamic model ones.
+        Models are cached while the saved query and its table are not modified.
+        """
+        cache_key = (self.name, self.modified, self.table._cache_key())
+        cached = _view_models.get(self.pk)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        queryset = self.get_queryset()
+        source_fields = {field.attname: field for field in queryset.model._meta.concrete_fields}
+        names = [*queryset.query.values_select, *queryset.query.annotation_select]
+        fields = {
+            name: source_fields[name] if name in source_fields else queryset.query.annotations[name].output_field
+            for name in names
+        }
+        # Unmanaged models require a primary key, it's never written so it doesn't have to be unique
+        attrs = {
+            '__module__': 'table_builder.models',
+            'Meta': type('Meta', (object,), {
+                'db_table': self.db_table,
+                'managed': False,
+                'apps': Apps(),
+                'app_label': TableBuilderConfig.name,
+            }),
+            **{
+                name: self._get_view_field(field, primary_key=index == 0)
+                for index, (name, field) in enumerate(fields.items())
+            },
+        }
+        _model = type(str(self.name), (models.Model,), attrs)
+        _view_models[self.pk] = (cache_key, _model)
+        return _model
+
+    @staticmethod
+    def _get_view_field(field, primary_key):
+        _, _, args, kwargs = field.deconstruct()
+        field_class = VIEW_FIELD_CLASSES.get(field.get_internal_type(), field.__class__)
+        kwargs.pop('auto_created', None)
+        kwargs.update(primary_key=primary_key, unique=False, db_index=False)
+        if not primary_key:
+            kwargs['null'] = True
+        return field_class(*args, **kwargs)
+
+    def create_view(self):
+        """
+        Create materialized view of the query with the unique index of the key columns.
+        """
+        quote_name = connection.ops.quote_name
+        sql, params = self.get_queryset().query.sql_with_params()
+        with metrics.DDL_SECONDS.time(operation='create_view'), connection.schema_editor() as schema_editor:
+            schema_editor.execute(f"CREATE MATERIALIZED VIEW {quote_name(self.db_table)} AS {sql}", params)
+            key_columns = self.get_key_columns()
+            if key_columns:
+                index_name = truncate_name(f'{self.name}_key', connection.ops.max_name_length())
+                schema_editor.execute(
+                    f"CREATE UNIQUE INDEX {quote_name(index_name)} "
+                    f"ON {quote_name(self.db_table)} ({', '.join(quote_name(column) for column in key_columns)})"
+                )
+        self.refreshed_at = datetime.now(timezone.utc)
+        SavedQuery.objects.filter(pk=self.pk).update(refreshed_at=self.refreshed_at)
+
+    def delete_view(self):
+        with metrics.DDL_SECONDS.time(operation='drop_view'), connection.cursor() as cursor:
+            cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {connection.ops.quote_name(self.db_table)}")
+        _view_models.pop(self.pk, None)
+
+    def refresh_view(self):
+        """
+        Refresh the view, concurrently when it has a unique index, so reads are not blocked.
+        """
+        refreshed_at = datetime.now(timezone.utc)
+        concurrently = 'CONCURRENTLY ' if self.get_key_columns() else ''
+        with metrics.DDL_SECONDS.time(operation='refresh_view'), connection.cursor() as cursor:
+            cursor.execute(f"REFRESH MATERIALIZED VIEW {concurrently}{connection.ops.quote_name(self.db_table)}")
+        self.refreshed_at = refreshed_at
+        SavedQuery.objects.filter(pk=self.pk).update(refreshed_at=refreshed_at)
+
+    def is_refresh_due(self):
+        """
+        Check if the view should be refreshed according to the refresh policy.
+        """
+        if self.refresh_policy == self.RefreshPolicy.MANUAL:
+            return False
+        if self.refresh_policy == self.RefreshPolicy.ON_WRITE and not self.is_stale():
+            return False
+        return self.refreshed_at is None or not self.refresh_interval or (
+            datetime.now(timezone.utc) - self.refreshed_at >= timedelta(seconds=self.refresh_interval)
+        )
+
+
+@receiver(rows_changed)
+def refresh_saved_queries(sender, table, operation, **kwargs):
+    """
+    Mark saved queries of the table as changed, refresh views of `on_write` ones after the transaction is committed.
+    """
+    now = datetime.now(timezone.utc)
+    if not SavedQuery.objects.filter(table=table).update(changed_at=now):
+        return
+
+    def refresh():
+        for saved_query in SavedQuery.objects.filter(table=table, refresh_policy=SavedQuery.RefreshPolicy.ON_WRITE):
+            if not saved_query.is_refresh_due():
+                # Skipped refreshes are left for the `refresh_saved_queries` command
+                continue
+            try:
+                saved_query.refresh_view()
+            except DatabaseError:
+                # Rows are already written, the view stays stale until the next refresh
+                logger.exception("Failed to refresh saved query %s", saved_query.name)
+
+    transaction.on_commit(refresh)
+
+
+class QueryPlan(TimeStampedModel, models.Model):
+    """
+    Plan of a slow query of a dynamic table, captured by `table_builder.slow_queries`.
+    """
+    class Operation(models.TextChoices):
+        ROWS = 'rows', 'Rows'
+        UPDATE = 'update', 'Update'
+
+    table = models.ForeignKey(
+        DynamicTable, verbose_name="Table name", on_delete=models.CASCADE, related_name='query_plans'
+    )
+    operation = models.CharField("Operation", max_length=16, choices=Operation.choices)
+    columns = models.JSONField("Columns", default=list, help_text="Names of the table columns when it was captured.")
+    sql = models.TextField("SQL")
+    duration = models.FloatField("Duration", help_text="Duration of the query in seconds.")
+    plan = models.JSONField(
+        "Plan", null=True, help_text="`EXPLAIN` output in JSON format, null for statements without plans, e.g. DDL.",
+    )
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+from django.db import connection, connections
+from django.dispatch import receiver
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+
+from table_builder.conf import get_setting
+from table_builder.signals import rows_changed
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'table_builder_rows'
+# Database settings options used by django itself, they are not connection parameters
+DJANGO_OPTIONS = ('isolation_level', 'server_side_binding', 'assume_role')
+
+
+@receiver(rows_changed)
+def notify_rows_changed(sender, table, operation, **kwargs):
+    """
+    Send notification about changed rows of the table.
+    Notification is delivered to listeners when the transaction is committed.
+    """
+    if not get_setting('ROW_NOTIFICATIONS'):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, json.dumps({'table': table.pk, 'operation': operation})])
+
+
+class Subscription:
+    """
+    Subscription to changes of a single table.
+    Notifications received until the subscriber asks for the next event are coalesced into a single event.
+    """
+
+    def __init__(self, table_pk):
+        self.table_pk = table_pk
+        self._operations = set()
+        self._notifications = 0
+        self._event = asyncio.Event()
+
+    def push(self, operation):
+        self._operations.add(operation)
+        self._notifications += 1
+        self._event.set()
+
+    async def get(self, timeout=None):
+        """
+        Wait for changes and return event with operations and number of coalesced notifications.
+        Returns None on timeout.
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        # Collect the rest of a write burst into the same event
+        await asyncio.sleep(get_setting('NOTIFY_COALESCE_INTERVAL'))
+        event = {
+            'table': self.table_pk,
+            'operations': sorted(self._operations),
+            'notifications': self._notifications,
+        }
+        self._operations = set()
+        self._notifications = 0
+        self._event.clear()
+        return event
+
+
+class Listener:
+    """
+    Single LISTEN connection of the worker, fans out notifications to subscriptions of the event loop.
+    The connection is opened on the first subscription and reopened when it is lost.
+    """
+
+    def __init__(self, using='default'):
+        self.using = using
+        self.ready = None
+        self._loop = None
+        self._task = None
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, table_pk):
+        self._start()
+        subscription = Subscription(table_pk)
+        self._subscriptions[table_pk].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscriptions = self._subscriptions.get(subscription.table_pk)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.table_pk]
+
+    def dispatch(self, payload):
+        """
+        Push notification payload to subscriptions of its table.
+        """
+        try:
+            notification = json.loads(payload)
+            table_pk, operation = notification['table'], notification['operation']
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Invalid rows notification: %s", payload)
+            return
+        for subscription in self._subscriptions.get(table_pk, ()):
+            subscription.push(operation)
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and not self._task.done():
+            return
+        # Subscriptions and connection of another event loop can't be used anymore
+        self._loop = loop
+        self._subscriptions = defaultdict(set)
+        self.ready = asyncio.Event()
+        self._task = loop.create_task(self._listen())
+
+    def _get_conninfo(self):
+        settings_dict = connections[self.using].settings_dict
+        params = {
+            'dbname': settings_dict['NAME'],
+            'user': settings_dict['USER'],
+            'password': settings_dict['PASSWORD'],
+            'host': settings_dict['HOST'],
+            'port': settings_dict['PORT'],
+            **{key: value for key, value in settings_dict['OPTIONS'].items() if key not in DJANGO_OPTIONS},
+        }
+        return make_conninfo(**{key: value for key, value in params.items() if value})
+
+    async def _listen(self):
+        delay = 1
+        reconnect = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self._get_conninfo(), autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    self.ready.set()
+                    delay = 1
+                    if reconnect:
+                        # Notifications could be missed while disconnected, let subscribers resync
+                        for subscriptions in self._subscriptions.values():
+                            for subscription in subscriptions:
+                                subscription.push('resync')
+                    async for notify in conn.notifies():
+                        self.dispatch(notify.payload)
+            except psycopg.OperationalError:
+                logger.exception("Rows notifications listener lost connection, reconnecting in %ss", delay)
+            self.ready.clear()
+            reconnect = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+
+listener = Listener()
+
+
+async def event_stream(table_pk):
+    """
+    Stream changes of table rows as Server-Sent Events.
+    Stream is closed after `TABLE_BUILDER_SSE_MAX_DURATION` seconds, clients reconnect automatically.
+    """
+    subscription = listener.subscribe(table_pk)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + get_setting('SSE_MAX_DURATION')
+    try:
+        yield 'retry: 3000\n\n'
+        while loop.time() < deadline:
+            event = await subscription.get(timeout=get_setting('SSE_KEEPALIVE_INTERVAL'))
+            if event is None:
+                yield ': keep-alive\n\n'
+            else:
+                yield f'event: rows\ndata: {json.dumps(event)}\n\n'
+    finally:
+        listener.unsubscribe(subscription)
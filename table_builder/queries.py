@@ -0,0 +1,212 @@
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+
+import psycopg
+
+from table_builder.types import get_column_type
+
+
+def update_row_returning(model, pk, values, conditions=None, increments=()):
+    """
+    Update a single row of dynamic model and return its new state in one round trip,
+    using `UPDATE ... WHERE id = %s RETURNING ...`.
+    :param values: - dict of new values by field name, values must be validated.
+    :param conditions: - dict of expected values by field name, e.g. row version, the row is not updated on mismatch.
+    :param increments: - names of fields incremented by one, e.g. row version.
+    Returns dict of the row values, or None when no row was updated.
+    """
+    quote_name = connection.ops.quote_name
+    opts = model._meta
+    assignments = []
+    params = []
+    for name, value in values.items():
+        field = opts.get_field(name)
+        assignments.append(f'{quote_name(field.column)} = %s')
+        params.append(field.get_db_prep_save(value, connection))
+    for name in increments:
+        column = quote_name(opts.get_field(name).column)
+        assignments.append(f'{column} = {column} + 1')
+    if not assignments:
+        # Nothing to update, keep the single statement and just return the row
+        column = quote_name(opts.pk.column)
+        assignments.append(f'{column} = {column}')
+    where = []
+    for name, value in {opts.pk.name: pk, **(conditions or {})}.items():
+        field = opts.get_field(name)
+        where.append(f'{quote_name(field.column)} = %s')
+        params.append(field.get_db_prep_value(value, connection))
+    fields = opts.concrete_fields
+    sql = 'UPDATE {table} SET {assignments} WHERE {where} RETURNING {returning}'.format(
+        table=quote_name(opts.db_table),
+        assignments=', '.join(assignments),
+        where=' AND '.join(where),
+        returning=', '.join(quote_name(field.column) for field in fields),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return {field.attname: value for field, value in zip(fields, row)}
+
+
+def insert_select(model, queryset, fields):
+    """
+    Insert rows of the queryset into the table of dynamic model with a single `INSERT ... SELECT` statement.
+    :param fields: - names of copied fields, present in both models.
+    Returns number of inserted rows.
+    """
+    quote_name = connection.ops.quote_name
+    opts = model._meta
+    columns = ', '.join(quote_name(opts.get_field(name).column) for name in fields)
+    select, params = queryset.values_list(*fields).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {quote_name(opts.db_table)} ({columns}) {select}', params)
+        return cursor.rowcount
+
+
+def copy_insert(model, objs):
+    """
+    Insert instances of dynamic model with a single binary `COPY ... FROM STDIN` statement.
+    Values are sent in the binary format of column types, see `ColumnType.copy_type`,
+    so the server skips parsing of text values. Generated columns are computed by the database.
+    Returns number of inserted rows.
+    """
+    quote_name = connection.ops.quote_name
+    opts = model._meta
+    fields = [
+        field for field in opts.concrete_fields if not field.primary_key and not getattr(field, 'generated', False)
+    ]
+    columns = ', '.join(quote_name(field.column) for field in fields)
+    sql = f'COPY {quote_name(opts.db_table)} ({columns}) FROM STDIN (FORMAT BINARY)'
+    # Errors of `copy()` are raised by psycopg cursor directly, they are translated to django database errors
+    with connection.cursor() as cursor, connection.wrap_database_errors:
+        with cursor.copy(sql) as copy:
+            copy.set_types([get_column_type(field).copy_type for field in fields])
+            for obj in objs:
+                copy.write_row([field.get_db_prep_save(field.pre_save(obj, True), connection) for field in fields])
+    return len(objs)
+
+
+def upsert_rows(model, objs, unique_field, update_fields, increments=(), batch_size=None):
+    """
+    Insert instances of dynamic model or update their rows on conflict of the unique field,
+    using one `INSERT ... ON CONFLICT DO UPDATE` statement per batch.
+    :param update_fields: - names of fields set to the inserted values on conflict, conflicts are ignored when empty.
+    :param increments: - names of fields of updated rows incremented by one, e.g. row version.
+    Returns number of inserted and updated rows.
+    """
+    quote_name = connection.ops.quote_name
+    opts = model._meta
+    fields = [
+        field for field in opts.concrete_fields if not field.primary_key and not getattr(field, 'generated', False)
+    ]
+    assignments = []
+    for name in update_fields:
+        column = quote_name(opts.get_field(name).column)
+        assignments.append(f'{column} = EXCLUDED.{column}')
+    if assignments:
+        # Existing rows are referenced by the alias of the table, as `EXCLUDED` holds the inserted values
+        for name in increments:
+            column = quote_name(opts.get_field(name).column)
+            assignments.append(f'{column} = "target".{column} + 1')
+    conflict = f'DO UPDATE SET {", ".join(assignments)}' if assignments else 'DO NOTHING'
+    placeholders = '({})'.format(', '.join(['%s'] * len(fields)))
+    upserted = 0
+    batch_size = batch_size or len(objs)
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            sql = 'INSERT INTO {table} AS "target" ({columns}) VALUES {values} ON CONFLICT ({unique}) {conflict}'
+            sql = sql.format(
+                table=quote_name(opts.db_table),
+                columns=', '.join(quote_name(field.column) for field in fields),
+                values=', '.join([placeholders] * len(batch)),
+                unique=quote_name(opts.get_field(unique_field).column),
+                conflict=conflict,
+            )
+            params = [
+                field.get_db_prep_save(field.pre_save(obj, True), connection) for obj in batch for field in fields
+            ]
+            cursor.execute(sql, params)
+            upserted += cursor.rowcount
+    return upserted
+
+
+def sample_rows(model, percent, method='system', seed=None, limit=None, conditions=None):
+    """
+    Get random sample of dynamic model rows with `TABLESAMPLE`.
+    :param percent: - percent of the table sampled, pages with the `system` method and rows with the `bernoulli` one.
+    :param seed: - seed of `REPEATABLE`, the same seed returns the same sample while the table is not changed.
+    :param conditions: - dict of values by field name, e.g. deletion mark, sampled rows are filtered by them.
+    Returns list of row dicts by field attname.
+    """
+    quote_name = connection.ops.quote_name
+    opts = model._meta
+    fields = opts.concrete_fields
+    sql = 'SELECT {columns} FROM {table} TABLESAMPLE {method} (%s)'.format(
+        columns=', '.join(quote_name(field.column) for field in fields),
+        table=quote_name(opts.db_table),
+        method=method.upper(),
+    )
+    params = [percent]
+    if seed is not None:
+        sql += ' REPEATABLE (%s)'
+        params.append(seed)
+    where = []
+    for name, value in (conditions or {}).items():
+        field = opts.get_field(name)
+        where.append(f'{quote_name(field.column)} = %s')
+        params.append(field.get_db_prep_value(value, connection))
+    if where:
+        sql += f' WHERE {" AND ".join(where)}'
+    if limit is not None and percent >= 100:
+        # All rows are sampled, without shuffling the limit would return the first rows in physical order
+        if seed is None:
+            sql += ' ORDER BY random()'
+        else:
+            sql += f' ORDER BY md5({quote_name(opts.pk.column)}::text || %s)'
+            params.append(str(seed))
+    if limit is not None:
+        sql += ' LIMIT %s'
+        params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [{field.attname: value for field, value in zip(fields, row)} for row in cursor.fetchall()]
+
+
+def values_many(querysets):
+    """
+    Evaluate `values()` querysets in one database round trip, sending their queries in psycopg pipeline mode.
+    Falls back to one round trip per queryset when the pipeline mode is not supported by libpq.
+    Queries of the pipeline bypass django cursor wrappers, so they are not logged in debug mode.
+    Returns lists of row dicts, in order of the querysets.
+    """
+    if not psycopg.Pipeline.is_supported():
+        return [list(queryset) for queryset in querysets]
+    statements = []
+    for queryset in querysets:
+        compiler = queryset.query.get_compiler(connection=connection)
+        try:
+            statements.append((compiler, *compiler.as_sql()))
+        except EmptyResultSet:
+            statements.append((compiler, None, None))
+    connection.ensure_connection()
+    cursors = []
+    with connection.connection.pipeline():
+        for compiler, sql, params in statements:
+            cursor = None
+            if sql is not None:
+                cursor = connection.connection.cursor()
+                cursor.execute(sql, params)
+            cursors.append(cursor)
+    results = []
+    for queryset, (compiler, sql, params), cursor in zip(querysets, statements, cursors):
+        if cursor is None:
+            results.append([])
+            continue
+        names = queryset.query.values_select
+        rows = compiler.results_iter([cursor.fetchall()])
+        results.append([dict(zip(names, row)) for row in rows])
+        cursor.close()
+    return results
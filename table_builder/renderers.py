@@ -0,0 +1,102 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by `orjson`.
+    Falls back to the default `JSONRenderer` when `orjson` is not installed or indented output is requested.
+    """
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON, returning a bytestring.
+        """
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        # Types unknown to orjson (decimals, lazy strings, datetimes in DRF format...) use the DRF encoder
+        return orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+
+
+class ColumnarRenderer(ORJSONRenderer):
+    """
+    JSON renderer for the columnar rows representation, selected by the `?format=columnar` query parameter.
+    """
+    format = 'columnar'  # noqa: A003
+
+
+class ArrowStreamRenderer(BaseRenderer):
+    """
+    Apache Arrow IPC stream renderer for the columnar rows representation, selected by `?format=arrow`.
+    Available when `pyarrow` is installed.
+    """
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'  # noqa: A003
+    charset = None
+    render_style = 'binary'
+
+    @staticmethod
+    def get_arrow_types():
+        return {
+            'AutoField': pyarrow.int32(),
+            'BigAutoField': pyarrow.int64(),
+            'CharField': pyarrow.string(),
+            'SmallIntegerField': pyarrow.int16(),
+            'IntegerField': pyarrow.int32(),
+            'BigIntegerField': pyarrow.int64(),
+            'FloatField': pyarrow.float64(),
+            'DecimalField': pyarrow.string(),
+            'BooleanField': pyarrow.bool_(),
+            'DateField': pyarrow.date32(),
+            'DateTimeField': pyarrow.timestamp('us', tz='UTC'),
+            'UUIDField': pyarrow.string(),
+        }
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render columnar `data` into Arrow IPC stream, returning a bytestring.
+        """
+        if data is None:
+            return b''
+        if 'columns' in data:
+            arrow_types = self.get_arrow_types()
+            schema = pyarrow.schema([
+                (column, arrow_types.get(column_type, pyarrow.string()))
+                for column, column_type in zip(data['columns'], data['types'])
+            ])
+            table = pyarrow.table(data['data'], schema=schema)
+        else:
+            # Errors are rendered as a single row table of strings
+            table = pyarrow.table({key: [str(value)] for key, value in data.items()})
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+class PrometheusTextRenderer(BaseRenderer):
+    """
+    Renderer of metrics in the Prometheus text exposition format, `data` is the already rendered text.
+    """
+    media_type = 'text/plain'
+    format = 'prometheus'  # noqa: A003
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            # Error responses, e.g. of failed authentication, are rendered as their detail message
+            data = str(data.get('detail', data))
+        return data.encode(self.charset)
@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from django.db.backends.postgresql.schema import DatabaseSchemaEditor
+from django.db.backends.utils import split_identifier
+
+
+def is_extension_available(connection, name):
+    """
+    Check if the extension is installed or can be installed into the database.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = %s)", [name])
+        return cursor.fetchone()[0]
+
+
+def qualify_name(schema, name):
+    """
+    Get name of a relation in the schema, in the form `quote_name` quotes as `"schema"."name"`.
+    Relations of an empty schema are looked up in the search path.
+    """
+    return f'{schema}"."{name}' if schema else name
+
+
+class TableSchemaEditor(DatabaseSchemaEditor):
+    """
+    Schema editor of dynamic tables, their models have schema-qualified `db_table`, see `qualify_name`.
+    Django looks up indexes and constraints by unqualified names in the search path,
+    so names of dropped indexes are qualified and constraints are introspected in the schema of the table.
+    """
+
+    def _delete_index_sql(self, model, name, sql=None, concurrently=False):
+        schema, _ = split_identifier(model._meta.db_table)
+        statement = super()._delete_index_sql(model, name, sql, concurrently)
+        statement.parts['name'] = self.quote_name(qualify_name(schema, name))
+        return statement
+
+    def _constraint_names(self, model, *args, **kwargs):
+        schema, table = split_identifier(model._meta.db_table)
+        if not schema:
+            return super()._constraint_names(model, *args, **kwargs)
+        # Only `db_table` of the model is used by the introspection
+        with self._search_path(schema):
+            return super()._constraint_names(SimpleNamespace(_meta=SimpleNamespace(db_table=table)), *args, **kwargs)
+
+    @contextmanager
+    def _search_path(self, schema):
+        """
+        Set search path of the transaction to the schema, the previous one is restored on exit.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT current_setting('search_path'), set_config('search_path', %s, true)", [
+                self.quote_name(schema),
+            ])
+            previous = cursor.fetchone()[0]
+            try:
+                yield
+            finally:
+                cursor.execute("SELECT set_config('search_path', %s, true)", [previous])
+
+
+class PartitionedSchemaEditor(TableSchemaEditor):
+    """
+    Schema editor of partitioned tables.
+    Primary key of a partitioned table must include the partition key, so it's declared as a table constraint
+    on `(id, partition_key)` instead of the column one.
+    """
+    sql_create_partition = "CREATE TABLE %(name)s PARTITION OF %(table)s %(bound)s"
+    sql_detach_partition = "ALTER TABLE %(table)s DETACH PARTITION %(name)s"
+
+    def __init__(self, connection, strategy, partition_key, **kwargs):
+        super().__init__(connection, **kwargs)
+        self.strategy = strategy
+        self.partition_key = partition_key
+
+    def table_sql(self, model):
+        key = self.quote_name(self.partition_key)
+        self.sql_create_table = (
+            f"CREATE TABLE %(table)s (%(definition)s, PRIMARY KEY ({self.quote_name(model._meta.pk.column)}, {key}))"
+            f" PARTITION BY {self.strategy.upper()} ({key})"
+        )
+        return super().table_sql(model)
+
+    def _iter_column_sql(self, column_db_type, params, model, field, *args, **kwargs):
+        for sql in super()._iter_column_sql(column_db_type, params, model, field, *args, **kwargs):
+            if not (field.primary_key and sql == "PRIMARY KEY"):
+                yield sql
+
+    def create_partition(self, table, name, bound, params=()):
+        """
+        Create partition of the table.
+        :param bound: - partition bound SQL, e.g. `FOR VALUES FROM (%s) TO (%s)` or `DEFAULT`.
+        """
+        self.execute(
+            self.sql_create_partition % {
+                'name': self.quote_name(name),
+                'table': self.quote_name(table),
+                'bound': bound,
+            },
+            params,
+        )
+
+    def detach_partition(self, table, name):
+        """
+        Detach partition from the table, it's kept as a standalone table.
+        """
+        self.execute(self.sql_detach_partition % {'name': self.quote_name(name), 'table': self.quote_name(table)})
+
+
+class UnloggedSchemaEditor(TableSchemaEditor):
+    """
+    Schema editor of unlogged tables, they are not written to WAL.
+    """
+    sql_create_table = "CREATE UNLOGGED TABLE %(table)s (%(definition)s)"
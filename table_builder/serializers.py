@@ -1,24 +1,399 @@
+import re
+from collections import Counter
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+
+from django.core.exceptions import ValidationError
+from django.core.validators import (
+    MaxLengthValidator,
+    MaxValueValidator,
+    MinLengthValidator,
+    MinValueValidator,
+    ProhibitNullCharactersValidator,
+)
+from django.db import connection
+
 from drf_writable_nested import UniqueFieldsMixin
 from drf_writable_nested.serializers import WritableNestedModelSerializer
 
 from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.fields import SkipField, empty, get_error_detail
+from rest_framework.settings import api_settings
+from rest_framework.validators import ProhibitSurrogateCharactersValidator, UniqueValidator
 
-from table_builder.models import DynamicColumn, DynamicTable
+from table_builder.expressions import compile_expression
+from table_builder.filters import build_filter
+from table_builder.models import DynamicColumn, DynamicTable, QueryPlan, SavedQuery, TRIGRAM_EXTENSION
+from table_builder.schema import is_extension_available
+from table_builder.types import COLUMN_TYPES, NUMERIC, get_column_type
+from table_builder.validators import validate_column_name
+
+MAX_HASH_PARTITIONS = 256
+MAX_BATCH_TABLES = 100
+MAX_SAMPLE_ROWS = 10000
+MAX_BULK_TABLES = 1000
+MAX_QUERY_PLANS = 1000
+# Fields defining the query of a saved query
+SAVED_QUERY_FIELDS = ('name', 'table', 'filter', 'fields', 'group_by', 'aggregates')
+INTEGER_FIELD_TYPES = (
+    DynamicColumn.FieldTypes.SMALL_INTEGER_FIELD,
+    DynamicColumn.FieldTypes.INTEGER_FIELD,
+    DynamicColumn.FieldTypes.BIG_INTEGER_FIELD,
+)
+# Internal types of columns without ordering, `min` and `max` aggregates are not defined for them
+UNORDERED_FIELD_TYPES = ('BooleanField', 'UUIDField')
+# Validators of serializer fields checked by compiled checks of `RowsValidator`
+CHAR_VALIDATORS = {
+    MaxLengthValidator, MinLengthValidator, ProhibitNullCharactersValidator, ProhibitSurrogateCharactersValidator,
+}
+INTEGER_VALIDATORS = {MaxValueValidator, MinValueValidator}
+SURROGATE_RE = re.compile('[\ud800-\udfff]')
 
 
 class DynamicColumnSerializer(UniqueFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = DynamicColumn
-        fields = ('pk', 'name', 'table', 'field_type', 'created', 'modified')
+        fields = (
+            'pk', 'name', 'table', 'field_type', 'max_length', 'max_digits', 'decimal_places', 'expression', 'unique',
+            'searchable', 'trigram_index', 'created', 'modified',
+        )
         read_only_fields = ('table',)
+        extra_kwargs = {
+            'max_length': {'min_value': 1, 'max_value': 10485760},
+            'max_digits': {'min_value': 1, 'max_value': 1000},
+        }
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        field_type = attrs.get('field_type', DynamicColumn.FieldTypes.CHAR_FIELD)
+        # Type options are model field options, so they are allowed for types with these options only
+        options = COLUMN_TYPES[field_type].options
+        for name in ('max_length', 'max_digits', 'decimal_places'):
+            if attrs.get(name) is not None and name not in options:
+                raise serializers.ValidationError({name: [f'Option is not supported by {field_type} columns.']})
+        # Options which are not sent take defaults of the type, so they are compared too
+        max_digits, decimal_places = (
+            attrs[name] if attrs.get(name) is not None else options.get(name)
+            for name in ('max_digits', 'decimal_places')
+        )
+        if max_digits is not None and decimal_places is not None and decimal_places > max_digits:
+            raise serializers.ValidationError({
+                'decimal_places' if attrs.get('decimal_places') is not None else 'max_digits': [
+                    'Decimal places cannot exceed max digits.'
+                ],
+            })
+        if attrs.get('searchable') and field_type != DynamicColumn.FieldTypes.CHAR_FIELD:
+            raise serializers.ValidationError({'searchable': ['Only char columns can be searchable.']})
+        if attrs.get('expression'):
+            # References of expressions are validated with the other columns of the table
+            if COLUMN_TYPES[field_type].generated_field_class is None:
+                raise serializers.ValidationError(
+                    {'expression': [f'Generated columns are not supported by {field_type} columns.']}
+                )
+            if attrs.get('searchable'):
+                raise serializers.ValidationError({'searchable': ['Generated columns cannot be searchable.']})
+        if attrs.get('trigram_index'):
+            if field_type != DynamicColumn.FieldTypes.CHAR_FIELD:
+                raise serializers.ValidationError({'trigram_index': ['Only char columns can have trigram index.']})
+            if not is_extension_available(connection, TRIGRAM_EXTENSION):
+                raise serializers.ValidationError(
+                    {'trigram_index': [f'{TRIGRAM_EXTENSION} extension is not available in the database.']}
+                )
+        return attrs
 
 
 class DynamicTableSerializer(WritableNestedModelSerializer):
     columns = DynamicColumnSerializer(many=True)
+    bulk_load = serializers.SerializerMethodField(help_text="Bulk load of the table is started.")
 
     class Meta:
         model = DynamicTable
-        fields = ('pk', 'name', 'columns', 'created', 'modified')
+        fields = (
+            'pk', 'name', 'schema', 'versioned', 'track_changes', 'partitioning', 'partition_key', 'partition_size',
+            'unlogged', 'bulk_load', 'columns', 'created', 'modified',
+        )
+
+    def get_bulk_load(self, obj) -> bool:
+        return obj.bulk_load_indexes is not None
+
+    def validate(self, attrs):
+        """
+        Validate partitioning: the key is an integer column or `created_at`, and can't be changed after creation.
+        Validate column names are unique and expressions of generated columns against the other columns.
+        Tables can't be changed during bulk load. Schema of new tables defaults to the shard schema of their name.
+        """
+        attrs = super().validate(attrs)
+        if self.instance is not None and self.instance.bulk_load_indexes is not None:
+            # Indexes of the table are dropped, columns can't be altered until they are recreated
+            raise serializers.ValidationError({'non_field_errors': ['Table cannot be changed during bulk load.']})
+        if self.instance is None:
+            attrs.setdefault('schema', DynamicTable.get_shard_schema(attrs['name']))
+        elif attrs.get('schema', self.instance.schema) != self.instance.schema:
+            raise serializers.ValidationError({'schema': ['Tables are moved between schemas by move_tables command.']})
+        self._validate_column_names(attrs.get('columns', []))
+        self._validate_expressions(attrs.get('columns', []))
+        if self.instance is not None and 'columns' in attrs:
+            self._validate_saved_queries(attrs['columns'])
+        self._validate_partitioning(attrs)
+        # Relations of tables created at once are checked together, see `DynamicTableBulkSerializer`
+        if not isinstance(self.parent, serializers.ListSerializer):
+            self._validate_relation_names(attrs)
+        return attrs
+
+    def _validate_partitioning(self, attrs):
+        partitioning, partition_key, partition_size = (
+            attrs.get(name, getattr(self.instance, name, default))
+            for name, default in (('partitioning', ''), ('partition_key', ''), ('partition_size', None))
+        )
+        if self.instance is not None and (partitioning, partition_key, partition_size) != (
+            self.instance.partitioning, self.instance.partition_key, self.instance.partition_size
+        ):
+            raise serializers.ValidationError({'partitioning': ['Partitioning of a table cannot be changed.']})
+        if not partitioning:
+            if partition_key or partition_size:
+                raise serializers.ValidationError({'partitioning': ['Partition key and size require partitioning.']})
+            return
+        if attrs.get('unlogged', getattr(self.instance, 'unlogged', False)):
+            raise serializers.ValidationError({'unlogged': ['Partitioned tables cannot be unlogged.']})
+        if not partition_size:
+            raise serializers.ValidationError({'partition_size': ['This field is required for partitioned tables.']})
+        if partitioning == DynamicTable.Partitioning.HASH and partition_size > MAX_HASH_PARTITIONS:
+            raise serializers.ValidationError(
+                {'partition_size': [f'Number of hash partitions must be at most {MAX_HASH_PARTITIONS}.']}
+            )
+        columns = {column['name']: column for column in attrs.get('columns', [])}
+        if partition_key == DynamicTable.CREATED_AT_COLUMN:
+            if partitioning != DynamicTable.Partitioning.RANGE:
+                raise serializers.ValidationError(
+                    {'partition_key': [f'Only range partitioning is supported by {partition_key}.']}
+                )
+        elif columns.get(partition_key, {}).get('field_type') not in INTEGER_FIELD_TYPES:
+            raise serializers.ValidationError(
+                {'partition_key': [f'Partition key must be an integer column or {DynamicTable.CREATED_AT_COLUMN}.']}
+            )
+        if columns.get(partition_key, {}).get('expression'):
+            raise serializers.ValidationError({'partition_key': ['Partition key cannot be a generated column.']})
+        if self.instance is not None and 'columns' in attrs and partition_key != DynamicTable.CREATED_AT_COLUMN:
+            self._validate_partition_key_column(partition_key, attrs['columns'])
+        # Unique constraints of partitioned tables must include the partition key
+        if any(column.get('unique') for column in columns.values()):
+            raise serializers.ValidationError({'columns': ['Unique columns are not supported by partitioned tables.']})
+
+    def _validate_relation_names(self, attrs):
+        """
+        Partitions and indexes are named after the table, so they may collide with other tables of the schema.
+        Relations of an updated table are checked for its new indexes only.
+        """
+        name = attrs.get('name', getattr(self.instance, 'name', None))
+        if name != getattr(self.instance, 'name', None) and SavedQuery.objects.filter(name=name).exists():
+            raise serializers.ValidationError({'name': ['Saved query with this name already exists.']})
+        names = get_relation_names(attrs, self.instance)
+        if self.instance is not None:
+            names = set(names) - set(self.instance.get_relation_names(self.instance.columns.all(), partitions=False))
+        existing = DynamicTable.existing_tables(names)
+        if existing:
+            raise serializers.ValidationError(
+                {'name': [f'Relations of the table already exist in the database: {", ".join(sorted(existing))}.']}
+            )
+
+    def _validate_partition_key_column(self, partition_key, columns):
+        """
+        Postgres can't alter the partition key column, so it keeps its name and type.
+        Columns of the payload are matched to existing ones by `pk` of the initial data, like the nested update does.
+        """
+        key_column = self.instance.columns.get(name=partition_key)
+        for data, column in zip(self.initial_data.get('columns', []), columns):
+            is_key_column = str(data.get('pk')) == str(key_column.pk)
+            if is_key_column != (column['name'] == partition_key) or (
+                is_key_column and column.get('field_type', DynamicColumn.FieldTypes.CHAR_FIELD) != key_column.field_type
+            ):
+                raise serializers.ValidationError(
+                    {'partition_key': ['Partition key column cannot be renamed, re-created or change its type.']}
+                )
+
+    def _validate_saved_queries(self, columns):
+        names = {column['name'] for column in columns} | set(self.instance._get_system_fields()) | {'id'}
+        errors = []
+        for saved_query in self.instance.saved_queries.all():
+            missing = saved_query.get_columns() - names
+            if missing:
+                errors.append(f'Saved query {saved_query.name} uses removed columns {", ".join(sorted(missing))}.')
+        if errors:
+            raise serializers.ValidationError({'columns': errors})
+
+    @staticmethod
+    def _validate_column_names(columns):
+        names = [column['name'] for column in columns]
+        duplicates = sorted(name for name, count in Counter(names).items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError({'columns': [f'Column names are duplicated: {", ".join(duplicates)}.']})
+
+    @staticmethod
+    def _validate_expressions(columns):
+        field_types = {
+            column['name']: column.get('field_type', DynamicColumn.FieldTypes.CHAR_FIELD)
+            for column in columns if not column.get('expression')
+        }
+        errors = {}
+        for column in columns:
+            if not column.get('expression'):
+                continue
+            field_type = column.get('field_type', DynamicColumn.FieldTypes.CHAR_FIELD)
+            try:
+                expression_type = compile_expression(column['expression'], field_types)[1]
+            except ValidationError as exc:
+                errors[column['name']] = exc.messages
+                continue
+            # Numbers are converted to text, but text is never converted to numbers
+            if expression_type != COLUMN_TYPES[field_type].expression_type and expression_type != NUMERIC:
+                errors[column['name']] = [
+                    f'Expression of {expression_type} type cannot be stored in {field_type} column.'
+                ]
+        if errors:
+            raise serializers.ValidationError({'columns': errors})
+
+
+class DynamicTableBulkSerializer(serializers.Serializer):
+    """
+    Serializer for creating many tables at once, see `DynamicTable.bulk_create_dynamic_models`.
+    """
+    tables = DynamicTableSerializer(many=True, allow_empty=False, max_length=MAX_BULK_TABLES)
+
+    def validate_tables(self, value):
+        names = [table['name'] for table in value]
+        duplicates = sorted(name for name, count in Counter(names).items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError(f'Table names are duplicated: {", ".join(duplicates)}.')
+        saved_queries = sorted(SavedQuery.objects.filter(name__in=names).values_list('name', flat=True))
+        if saved_queries:
+            raise serializers.ValidationError(
+                f'Saved queries with these names already exist: {", ".join(saved_queries)}.'
+            )
+        # Relations of all tables are checked with one catalog query, and against each other
+        relation_names = [name for table in value for name in get_relation_names(table)]
+        duplicates = sorted(name for name, count in Counter(relation_names).items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError(f'Relations of the tables collide: {", ".join(duplicates)}.')
+        existing = DynamicTable.existing_tables(relation_names)
+        if existing:
+            raise serializers.ValidationError(
+                f'Relations of the tables already exist in the database: {", ".join(sorted(existing))}.'
+            )
+        return value
+
+    def create(self, validated_data):
+        tables = [
+            (
+                DynamicTable(**{name: value for name, value in table.items() if name != 'columns'}),
+                [DynamicColumn(**column) for column in table['columns']],
+            )
+            for table in validated_data['tables']
+        ]
+        return {'tables': DynamicTable.bulk_create_dynamic_models(tables)}
+
+
+class SavedQuerySerializer(serializers.ModelSerializer):
+    stale = serializers.SerializerMethodField(help_text="Rows of the table were written after the last refresh.")
+
+    class Meta:
+        model = SavedQuery
+        fields = (
+            'pk', 'name', 'table', 'filter', 'fields', 'group_by', 'aggregates', 'refresh_policy', 'refresh_interval',
+            'refreshed_at', 'changed_at', 'stale', 'created', 'modified',
+        )
+
+    def get_stale(self, obj) -> bool:
+        return obj.is_stale()
+
+    def validate(self, attrs):
+        """
+        Validate the query against columns of the table, it can't be changed after creation.
+        Scheduled refresh requires the refresh interval.
+        """
+        attrs = super().validate(attrs)
+        if self.instance is not None:
+            for name in SAVED_QUERY_FIELDS:
+                if name in attrs and attrs[name] != getattr(self.instance, name):
+                    raise serializers.ValidationError({name: ['Query of a saved query cannot be changed.']})
+        refresh_policy = attrs.get('refresh_policy', getattr(self.instance, 'refresh_policy', None))
+        refresh_interval = attrs.get('refresh_interval', getattr(self.instance, 'refresh_interval', None))
+        if refresh_policy == SavedQuery.RefreshPolicy.SCHEDULED and not refresh_interval:
+            raise serializers.ValidationError({'refresh_interval': ['This field is required for scheduled refresh.']})
+        if self.instance is None:
+            self._validate_query(attrs)
+        return attrs
+
+    @staticmethod
+    def _validate_query(attrs):
+        if DynamicTable.objects.filter(name=attrs['name']).exists():
+            raise serializers.ValidationError({'name': ['Table with this name already exists.']})
+        dynamic_model = attrs['table'].get_dynamic_model()
+        fields = {field.attname: field for field in dynamic_model._meta.concrete_fields}
+        aggregates = attrs.get('aggregates', {})
+        errors = {}
+        for name in ('fields', 'group_by'):
+            unknown = [column for column in attrs.get(name, []) if column not in fields]
+            if unknown:
+                errors[name] = [f'Column {column} does not exist.' for column in unknown]
+        if attrs.get('fields') and aggregates:
+            errors['fields'] = ['Fields of aggregated query are group by columns.']
+        if attrs.get('group_by') and not aggregates:
+            errors['group_by'] = ['Group by requires aggregates.']
+        aggregate_errors = {}
+        for alias, aggregate in aggregates.items():
+            function = aggregate.get('function') if isinstance(aggregate, dict) else None
+            column = aggregate.get('column') if isinstance(aggregate, dict) else None
+            try:
+                validate_column_name(alias)
+            except ValidationError as exc:
+                aggregate_errors[alias] = exc.messages
+            else:
+                if alias in attrs.get('group_by', []):
+                    aggregate_errors[alias] = ['Alias is a group by column.']
+                elif function not in SavedQuery.AGGREGATES:
+                    aggregate_errors[alias] = [f'Function must be one of {", ".join(SavedQuery.AGGREGATES)}.']
+                elif column is None and function != 'count':
+                    aggregate_errors[alias] = [f'Function {function} requires a column.']
+                elif column is not None and column not in fields:
+                    aggregate_errors[alias] = [f'Column {column} does not exist.']
+                elif function in ('sum', 'avg') and get_column_type(fields[column]).expression_type != NUMERIC:
+                    aggregate_errors[alias] = [f'Function {function} requires a numeric column.']
+                elif function in ('min', 'max') and fields[column].get_internal_type() in UNORDERED_FIELD_TYPES:
+                    aggregate_errors[alias] = [f'Function {function} is not supported by {column} column.']
+        if aggregate_errors:
+            errors['aggregates'] = aggregate_errors
+        if errors:
+            raise serializers.ValidationError(errors)
+        build_filter(dynamic_model, attrs.get('filter', {}))
+
+
+class SavedQueryRowsQuerySerializer(serializers.Serializer):
+    """
+    Serializer for saved query rows query parameters.
+    """
+    filter = serializers.JSONField(  # noqa: A003
+        required=False, help_text="Filter expression as JSON, e.g. {\"column__gte\": 1}."
+    )
+    limit = serializers.IntegerField(min_value=1, required=False, help_text="Maximal number of returned rows.")
+    offset = serializers.IntegerField(min_value=0, default=0, help_text="Number of skipped rows.")
+
+
+class QueryPlanSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QueryPlan
+        fields = ('pk', 'table', 'operation', 'columns', 'sql', 'duration', 'plan', 'created')
+
+
+class QueryPlanQuerySerializer(serializers.Serializer):
+    """
+    Serializer for query plans query parameters.
+    """
+    table = serializers.PrimaryKeyRelatedField(
+        queryset=DynamicTable.objects.all(), required=False, help_text="Plans of the table only."
+    )
+    operation = serializers.ChoiceField(choices=QueryPlan.Operation.choices, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_QUERY_PLANS, default=50)
 
 
 class DummySerializer(serializers.Serializer):
@@ -31,15 +406,358 @@ class DummySerializer(serializers.Serializer):
     boolean_field = serializers.BooleanField()
 
 
-def serializer_factory(model):
+class RowsDeleteSerializer(serializers.Serializer):
+    """
+    Serializer for deleting rows matching the filter expression.
+    """
+    filter = serializers.DictField(  # noqa: A003
+        help_text="Filter expression, e.g. {\"column__gte\": 1}. Empty object matches all rows."
+    )
+    batch_size = serializers.IntegerField(
+        min_value=1, required=False, help_text="Commit changes in chunks of this size."
+    )
+
+
+class RowsUpdateSerializer(RowsDeleteSerializer):
+    """
+    Serializer for updating rows matching the filter expression.
+    """
+    values = serializers.DictField(allow_empty=False, help_text="New values by column name.")
+
+
+class RowsUpsertSerializer(serializers.Serializer):
+    """
+    Serializer for inserting rows or updating them on conflict of the unique column.
+    """
+    rows = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+    unique_field = serializers.CharField(
+        required=False, help_text="Unique column used as conflict target, defaults to the only unique column."
+    )
+    batch_size = serializers.IntegerField(
+        min_value=1, default=1000, help_text="Number of rows inserted by a single statement."
+    )
+
+
+class RowsInsertSerializer(serializers.Serializer):
+    """
+    Serializer for inserting rows with binary COPY.
+    """
+    rows = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+
+class BulkLoadFinishSerializer(serializers.Serializer):
+    """
+    Serializer for finishing bulk load of the table.
+    """
+    logged = serializers.BooleanField(default=False, help_text="Switch unlogged table to LOGGED.")
+
+
+class TableCloneSerializer(serializers.Serializer):
+    """
+    Serializer for cloning the table with its rows.
+    """
+    name = serializers.CharField(help_text="Name of the new table.")
+    columns = serializers.ListField(
+        child=serializers.CharField(), required=False, allow_empty=False,
+        help_text="Names of copied columns, all columns by default.",
+    )
+    filter = serializers.DictField(  # noqa: A003
+        default=dict, help_text="Filter expression of copied rows, e.g. {\"column__gte\": 1}. All rows by default."
+    )
+
+
+class RowsQuerySerializer(serializers.Serializer):
+    """
+    Serializer for rows query parameters.
+    """
+    search = serializers.CharField(
+        required=False, help_text="Full-text search over searchable columns, rows are ordered by rank."
+    )
+
+
+class BatchRowsTableSerializer(serializers.Serializer):
+    """
+    Serializer for rows query of a single table of the batch read.
+    """
+    table = serializers.IntegerField(help_text="Table id.")
+    fields = serializers.ListField(
+        child=serializers.CharField(), required=False, allow_empty=False,
+        help_text="Returned columns, all columns by default.",
+    )
+    filter = serializers.DictField(  # noqa: A003
+        default=dict, help_text="Filter expression, e.g. {\"column__gte\": 1}. Empty object matches all rows."
+    )
+    limit = serializers.IntegerField(
+        min_value=1, required=False, help_text="Maximal number of returned rows, ordered by id."
+    )
+
+
+class BatchRowsSerializer(serializers.Serializer):
+    """
+    Serializer for reading rows of multiple tables in one request.
+    """
+    tables = serializers.ListField(child=BatchRowsTableSerializer(), allow_empty=False, max_length=MAX_BATCH_TABLES)
+
+
+class RowsSampleQuerySerializer(serializers.Serializer):
+    """
+    Serializer for rows sample query parameters.
+    """
+    percent = serializers.FloatField(
+        min_value=0, max_value=100, required=False,
+        help_text="Sampled percent of the table, by default estimated from the table size to return `limit` rows.",
+    )
+    method = serializers.ChoiceField(
+        choices=['system', 'bernoulli'], default='system',
+        help_text="`system` samples pages and reads only them, `bernoulli` samples rows and reads the whole table.",
+    )
+    seed = serializers.IntegerField(required=False, help_text="Seed of a repeatable sample.")
+    limit = serializers.IntegerField(
+        min_value=1, max_value=MAX_SAMPLE_ROWS, default=100, help_text="Maximal number of returned rows."
+    )
+
+
+class RowVersionSerializer(serializers.Serializer):
+    """
+    Serializer for the expected version of a row in versioned tables.
+    """
+    row_version = serializers.IntegerField(
+        required=False, help_text="Expected row version, the request fails with 409 when the row was changed."
+    )
+
+
+class ChangesCursorField(serializers.Field):
+    """
+    Opaque change feed cursor: modification time in microseconds and pk of the last returned row.
+    """
+    default_error_messages = {
+        'invalid': 'Invalid cursor.',
+    }
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+    def to_representation(self, value):
+        modified_at, pk = value
+        return f'{(modified_at - self.epoch) // timedelta(microseconds=1)}-{pk}'
+
+    def to_internal_value(self, data):
+        try:
+            microseconds, pk = str(data).split('-')
+            return self.epoch + timedelta(microseconds=int(microseconds)), int(pk)
+        except (ValueError, OverflowError):
+            self.fail('invalid')
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    """
+    Serializer for change feed query parameters.
+    """
+    since = ChangesCursorField(required=False, help_text="Cursor returned by the previous request.")
+    limit = serializers.IntegerField(min_value=1, max_value=10000, default=1000)
+
+
+def get_relation_names(attrs, instance=None):
+    """
+    Get schema-qualified names of relations created with a table from its validated data,
+    see `DynamicTable.get_relation_names`. Only indexes are created for an updated table.
+    """
+    if instance is None:
+        table = DynamicTable(**{name: value for name, value in attrs.items() if name != 'columns'})
+    else:
+        table = instance
+    if 'columns' in attrs:
+        columns = [DynamicColumn(**column) for column in attrs['columns']]
+    else:
+        columns = instance.columns.all()
+    return table.get_relation_names(columns, partitions=instance is None)
+
+
+def serializer_factory(model, validate_unique=True):
     """
     Create a serializer class for a given model.
+    :param validate_unique: - add validators checking values of unique columns against the database.
     """
+    # Deleted rows of tables with change tracking keep their unique values, so values are checked against all rows
+    validators = [UniqueValidator(queryset=model._base_manager.all())] if validate_unique else []
+    extra_kwargs = {
+        field.name: {'validators': validators}
+        for field in model._meta.concrete_fields if field.unique and not field.primary_key
+    }
     attrs = {
         'Meta': type('Meta', (object,), {
             'model': model,
             'fields': '__all__',
-
+            'extra_kwargs': extra_kwargs,
         }),
     }
     return type(f'{model.__name__}Serializer', (serializers.ModelSerializer,), attrs)
+
+
+def get_rows_validator(model):
+    """
+    Get rows validator of the dynamic model, it's compiled once and cached with the model.
+    """
+    validator = model.__dict__.get('_rows_validator')
+    if validator is None:
+        validator = model._rows_validator = RowsValidator(model)
+    return validator
+
+
+class RowsValidator:
+    """
+    Validator of dynamic model rows written in batches, equal to the `serializer_factory` serializer
+    with `many=True` and `validate_unique=False`, but without exceptions and serializer machinery for common values.
+    Fields are compiled once into checks of char, integer and boolean values, which return the validated value
+    or `INVALID`. Values the checks don't accept, and values of other fields, are validated by the serializer field,
+    so validated values and error messages are the same as the serializer ones.
+    """
+    INVALID = object()
+
+    def __init__(self, model):
+        self.serializer = serializer_factory(model, validate_unique=False)()
+        self.fields = [
+            (name, field, self._compile(field)) for name, field in self.serializer.fields.items() if not field.read_only
+        ]
+
+    def _compile(self, field):
+        """
+        Get check of the field values, None when values are validated by the field itself.
+        """
+        validators = {type(validator) for validator in field.validators}
+        if type(field) is serializers.CharField and validators <= CHAR_VALIDATORS:
+            return self._compile_char(field)
+        if type(field) is serializers.IntegerField and validators <= INTEGER_VALIDATORS:
+            return self._compile_integer(field)
+        if type(field) is serializers.BooleanField and not validators:
+            return self._compile_boolean(field)
+        return None
+
+    def _compile_char(self, field):
+        invalid = self.INVALID
+        allow_null, allow_blank, trim_whitespace = field.allow_null, field.allow_blank, field.trim_whitespace
+        max_length = field.max_length if field.max_length is not None else float('inf')
+        min_length = field.min_length or 0
+
+        def check(value):
+            if type(value) is not str:
+                return None if value is None and allow_null else invalid
+            if trim_whitespace:
+                value = value.strip()
+            if not value:
+                return '' if allow_blank else invalid
+            if len(value) > max_length or len(value) < min_length or '\x00' in value or SURROGATE_RE.search(value):
+                return invalid
+            return value
+        return check
+
+    def _compile_integer(self, field):
+        invalid = self.INVALID
+        allow_null, max_string_length = field.allow_null, field.MAX_STRING_LENGTH
+        max_value = field.max_value if field.max_value is not None else float('inf')
+        min_value = field.min_value if field.min_value is not None else float('-inf')
+
+        def check(value):
+            if type(value) is str and value.isascii() and value.isdigit() and len(value) <= max_string_length:
+                value = int(value)
+            elif type(value) is not int:
+                return None if value is None and allow_null else invalid
+            return value if min_value <= value <= max_value else invalid
+        return check
+
+    def _compile_boolean(self, field):
+        invalid = self.INVALID
+        allow_null = field.allow_null
+        true_values, false_values = field.TRUE_VALUES, field.FALSE_VALUES
+
+        def check(value):
+            if value is True or value is False:
+                return value
+            if type(value) is str or type(value) is int:
+                if value in true_values:
+                    return True
+                if value in false_values:
+                    return False
+            return None if value is None and allow_null else invalid
+        return check
+
+    def validate(self, rows):
+        """
+        Validate rows, returns tuple of validated rows and errors.
+        Errors are a list of error dicts by row like the serializer errors, None when all rows are valid.
+        """
+        invalid = self.INVALID
+        validated = []
+        errors = []
+        for row in rows:
+            if not isinstance(row, Mapping):
+                message = self.serializer.error_messages['invalid'].format(datatype=type(row).__name__)
+                validated.append(None)
+                errors.append({api_settings.NON_FIELD_ERRORS_KEY: [ErrorDetail(message, code='invalid')]})
+                continue
+            values = {}
+            row_errors = {}
+            for name, field, check in self.fields:
+                value = row.get(name, empty)
+                if check is not None and value is not empty:
+                    validated_value = check(value)
+                    if validated_value is not invalid:
+                        values[name] = validated_value
+                        continue
+                try:
+                    values[name] = field.run_validation(value)
+                except serializers.ValidationError as exc:
+                    row_errors[name] = exc.detail
+                except ValidationError as exc:
+                    row_errors[name] = get_error_detail(exc)
+                except SkipField:
+                    pass
+            validated.append(values)
+            errors.append(row_errors)
+        if not any(errors):
+            return validated, None
+        return validated, errors
+
+
+def rows_representation(queryset, rows=None):
+    """
+    Get plain dicts of dynamic model rows.
+    Output is equal to the `serializer_factory` serializer output, but skips building model instances,
+    serializer fields and ordered dicts.
+    :param rows: - already fetched `values()` rows of the queryset, only they are converted for representation.
+    """
+    fields = queryset.model._meta.concrete_fields
+    if rows is None:
+        rows = list(queryset.values(*[field.attname for field in fields]))
+    for name, to_representation in _get_representations(fields):
+        for row in rows:
+            if row.get(name) is not None:
+                row[name] = to_representation(row[name])
+    return rows
+
+
+def rows_columnar_representation(queryset):
+    """
+    Get columnar representation of dynamic model rows.
+    Column names are listed once, values of every column are built directly from `values_list()` tuples.
+    """
+    fields = queryset.model._meta.concrete_fields
+    columns = [field.attname for field in fields]
+    rows = list(queryset.values_list(*columns))
+    values = zip(*rows) if rows else ([] for _ in columns)
+    data = {column: list(column_values) for column, column_values in zip(columns, values)}
+    for name, to_representation in _get_representations(fields):
+        data[name] = [None if value is None else to_representation(value) for value in data[name]]
+    return {
+        'columns': columns,
+        'types': [field.get_internal_type() for field in fields],
+        'data': data,
+    }
+
+
+def _get_representations(fields):
+    """
+    Get `(attname, to_representation)` of fields which values are converted for representation, see `ColumnType`.
+    """
+    return [
+        (field.attname, get_column_type(field).to_representation)
+        for field in fields if get_column_type(field).to_representation is not None
+    ]
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+
+# Sent after rows of a dynamic table were written, with `table` and `operation` arguments.
+# Operation is one of `insert`, `update`, `upsert`, `delete`.
+rows_changed = Signal()
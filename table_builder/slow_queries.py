@@ -0,0 +1,71 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from django.db import DatabaseError, connection, transaction
+
+from table_builder.conf import get_setting
+from table_builder.models import QueryPlan
+
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def capture_slow_queries(table, operation):
+    """
+    Capture plans of queries run inside the block slower than `TABLE_BUILDER_SLOW_QUERY_THRESHOLD` seconds.
+    Queries are timed for `TABLE_BUILDER_SLOW_QUERY_SAMPLE_RATE` fraction of blocks, plans are captured
+    after the block, so its queries are not slowed down by `EXPLAIN`.
+    :param operation: - operation of the block, see `QueryPlan.Operation`.
+    """
+    threshold = get_setting('SLOW_QUERY_THRESHOLD')
+    if threshold is None or random.random() >= get_setting('SLOW_QUERY_SAMPLE_RATE'):
+        yield
+        return
+    slow = []
+
+    def timer(execute, sql, params, many, context):
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - start
+        if duration >= threshold and not many:
+            slow.append((sql, params, duration))
+        return result
+
+    with connection.execute_wrapper(timer):
+        yield
+    for sql, params, duration in slow:
+        capture_plan(table, operation, sql, params, duration)
+
+
+def capture_plan(table, operation, sql, params, duration):
+    """
+    Store plan of the query with `EXPLAIN (FORMAT JSON)`, statements other than `SELECT` are stored without plans,
+    e.g. DDL can't be explained and writes are not repeated.
+    Only `TABLE_BUILDER_SLOW_QUERY_PLANS` newest plans are kept.
+    Errors are logged, the capture never fails the request.
+    """
+    try:
+        # Savepoint keeps the transaction of the request usable when the capture fails
+        with transaction.atomic(), connection.cursor() as cursor:
+            plan = None
+            if sql.lstrip()[:6].upper() == 'SELECT':
+                options = 'ANALYZE, BUFFERS, FORMAT JSON' if get_setting('SLOW_QUERY_ANALYZE') else 'FORMAT JSON'
+                cursor.execute(f"EXPLAIN ({options}) {sql}", params)
+                plan = cursor.fetchone()[0]
+            QueryPlan.objects.create(
+                table=table,
+                operation=operation,
+                columns=[column.name for column in table.columns.all()],
+                sql=connection.ops.compose_sql(sql, params),
+                duration=duration,
+                plan=plan,
+            )
+            limit = get_setting('SLOW_QUERY_PLANS')
+            oldest = list(QueryPlan.objects.order_by('-pk').values_list('pk', flat=True)[limit:limit + 1])
+            if oldest:
+                QueryPlan.objects.filter(pk__lte=oldest[0]).delete()
+    except DatabaseError:
+        logger.exception("Failed to capture plan of slow query of table %s", table.name)
@@ -1,11 +1,34 @@
+import asyncio
+import decimal
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse_lazy
 from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
-from table_builder.models import DynamicTable, DynamicColumn
-from table_builder.serializers import DynamicTableSerializer
+import psycopg
+from table_builder import metrics, models, notifications
+from table_builder.expressions import compile_expression
+from table_builder.filters import build_filter, search
+from table_builder.models import DynamicTable, DynamicColumn, QueryPlan, SavedQuery
+from table_builder.parsers import ORJSONParser
+from table_builder.renderers import ORJSONRenderer, pyarrow
+from table_builder.schema import is_extension_available
+from table_builder.serializers import DynamicTableSerializer, get_rows_validator, serializer_factory
+from table_builder.signals import rows_changed
 
 
 class PublicDynamicTableApiTests(TestCase):
@@ -104,6 +127,21 @@ class DynamicTableRowCreateApiTests(TestCase):
         self.assertEqual(DynamicTable.objects.count(), 1)
         self.assertEqual(DynamicColumn.objects.count(), 3)
 
+    def test_create_table_with_duplicate_column_names(self):
+        """Test creating a new DynamicTable with columns of the same name"""
+        payload = {
+            'name': 'test_table_1',
+            'columns': [
+                {'name': 'test_column', 'field_type': DynamicColumn.FieldTypes.CHAR_FIELD},
+                {'name': 'test_column', 'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD},
+            ],
+        }
+        res = self.client.post(reverse_lazy('table_builder:table-list'), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data, {'columns': ['Column names are duplicated: test_column.']})
+        self.assertEqual(DynamicTable.objects.count(), 0)
+
     def test_create_table_with_wrong_field_type(self):
         """Test creating a new DynamicTable with wrong field_type"""
         payload = {
@@ -459,6 +497,45 @@ class DynamicTableRowDataListApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_get_rows_representation(self):
+        """Test rows are equal to the dynamic serializer output"""
+        res = self.client.get(
+            reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk}),
+            format='json',
+        )
+
+        dynamic_model = self.test_table.get_dynamic_model()
+        serializer = serializer_factory(dynamic_model)(dynamic_model.objects.all(), many=True)
+        self.assertEqual(res.json(), json.loads(json.dumps(serializer.data)))
+
+    def test_get_rows_columnar(self):
+        """Test getting row data in the columnar format"""
+        res = self.client.get(
+            reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk}),
+            {'format': 'columnar'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = res.json()
+        self.assertEqual(data['columns'], ['id', 'test_column_char', 'test_column_int', 'test_column_bool'])
+        self.assertEqual(data['types'], ['BigAutoField', 'CharField', 'IntegerField', 'BooleanField'])
+        self.assertEqual(sorted(data['data']['test_column_char']), ['test', 'test2'])
+        self.assertEqual(len(data['data']['id']), 2)
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_get_rows_arrow(self):
+        """Test getting row data as Arrow IPC stream"""
+        res = self.client.get(
+            reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk}),
+            {'format': 'arrow'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/vnd.apache.arrow.stream')
+        table = pyarrow.ipc.open_stream(res.content).read_all()
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(sorted(table.column('test_column_int').to_pylist()), [1, 2])
+
 
 class DynamicTableRowDataAddApiTests(TestCase):
     """Test updating DynamicTable row by API"""
@@ -557,3 +634,2193 @@ class DynamicTableRowDataAddApiTests(TestCase):
         self.assertEqual(self.test_table.get_dynamic_model().objects.get(pk=2).test_column_char, 'test2')
         self.assertEqual(self.test_table.get_dynamic_model().objects.get(pk=2).test_column_int, 2)
         self.assertEqual(self.test_table.get_dynamic_model().objects.get(pk=2).test_column_bool, False)
+
+
+class MetricsTests(TestCase):
+    """Test table builder metrics"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.test_table = DynamicTable.objects.create(
+            name='test_table_1',
+        )
+        DynamicColumn.objects.create(
+            name='test_column_char',
+            field_type=DynamicColumn.FieldTypes.CHAR_FIELD,
+            table=self.test_table,
+        )
+        self.test_table.create_dynamic_model()
+
+    def test_model_cache(self):
+        """Test dynamic model is served from the cache until the table is modified"""
+        hits = metrics.MODEL_CACHE_HITS.samples()
+        first = DynamicTable.objects.get(pk=self.test_table.pk).get_dynamic_model()
+        second = DynamicTable.objects.get(pk=self.test_table.pk).get_dynamic_model()
+
+        self.assertIs(first, second)
+        self.assertNotEqual(metrics.MODEL_CACHE_HITS.samples(), hits)
+
+        self.test_table.save()
+        self.assertIsNot(DynamicTable.objects.get(pk=self.test_table.pk).get_dynamic_model(), first)
+
+    def test_metrics_endpoint(self):
+        """Test metrics are exposed in the text format"""
+        self.client.get(reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk}))
+        res = self.client.get(reverse_lazy('table_builder:metrics'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('# TYPE table_builder_ddl_seconds histogram', res.content.decode())
+        self.assertIn('table_builder_rows_requests_total{table="test_table_1"}', res.content.decode())
+
+    def test_metrics_endpoint_permissions(self):
+        """Test metrics are accessible with the configured permissions only"""
+        url = reverse_lazy('table_builder:metrics')
+        res = APIClient().get(url, HTTP_ACCEPT='text/plain;version=0.0.4;q=0.5,*/*;q=0.1')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        with override_settings(TABLE_BUILDER_METRICS_PERMISSION_CLASSES=['rest_framework.permissions.IsAdminUser']):
+            self.assertEqual(APIClient().get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bounded_labels(self):
+        """Test table label values are bounded"""
+        registry = metrics.Registry()
+        counter = metrics.Counter('test_total', 'Test counter.', labelnames=('table',), bounded=('table',),
+                                  registry=registry)
+        with self.settings(TABLE_BUILDER_METRICS_MAX_TABLE_LABELS=2):
+            for name in ('a', 'b', 'c', 'd'):
+                counter.inc(table=name)
+            output = registry.render()
+
+        self.assertIn('test_total{table="a"} 1.0', output)
+        self.assertIn('test_total{table="__other__"} 2.0', output)
+        self.assertNotIn('table="c"', output)
+
+    def test_multi_worker_aggregation(self):
+        """Test snapshots of other workers are merged"""
+        registry = metrics.Registry()
+        counter = metrics.Counter('test_total', 'Test counter.', registry=registry)
+        with tempfile.TemporaryDirectory() as directory, self.settings(TABLE_BUILDER_METRICS_DIR=directory):
+            with open(os.path.join(directory, '1.json'), 'w') as file:
+                json.dump({'test_total': [[[], 5]]}, file)
+            counter.inc(2)
+            output = registry.render()
+
+        self.assertIn('test_total 7.0', output)
+
+
+class DynamicModelWarmUpTests(TestCase):
+    """Test preloading dynamic models of all tables"""
+
+    def setUp(self):
+        for name in ('test_table_1', 'test_table_2'):
+            table = DynamicTable.objects.create(
+                name=name,
+            )
+            DynamicColumn.objects.create(
+                name=f'{name}_char',
+                field_type=DynamicColumn.FieldTypes.CHAR_FIELD,
+                table=table,
+            )
+            table.create_dynamic_model()
+        # Table without database table is skipped
+        DynamicTable.objects.create(
+            name='test_table_3',
+        )
+        models._dynamic_models.clear()
+
+    def test_warm_up(self):
+        """Test warm-up builds all models with a constant number of queries"""
+        with self.assertNumQueries(3):
+            built = DynamicTable.warm_up_dynamic_models()
+
+        self.assertEqual(built, 2)
+        table = DynamicTable.objects.get(name='test_table_2')
+        with self.assertNumQueries(0):
+            table.get_dynamic_model()
+
+    def test_warm_up_budget(self):
+        """Test warm-up stops when the budget is spent"""
+        built = DynamicTable.warm_up_dynamic_models(budget=0)
+
+        self.assertEqual(built, 0)
+        self.assertEqual(models._dynamic_models, {})
+
+
+class ORJSONRendererParserTests(TestCase):
+    """Test orjson based renderer and parser"""
+
+    def test_render(self):
+        """Test rendering is compatible with the default renderer"""
+        data = [{'id': 1, 'char': 'тест', 'decimal': decimal.Decimal('1.5'), 'bool': True, 'none': None}]
+
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_render_indent(self):
+        """Test indented output falls back to the default renderer"""
+        data = {'id': 1}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4'),
+        )
+
+    def test_parse(self):
+        """Test parsing and parse errors"""
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(b'[{"id": 1}]')), [{'id': 1}])
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'[{"id": 1'))
+
+
+class DynamicTableRowsBulkApiTests(TestCase):
+    """Test updating and deleting DynamicTable rows matching filter by API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.test_table = DynamicTable.objects.create(
+            name='test_table_1',
+        )
+        DynamicColumn.objects.create(
+            name='test_column_char',
+            field_type=DynamicColumn.FieldTypes.CHAR_FIELD,
+            table=self.test_table,
+        )
+        DynamicColumn.objects.create(
+            name='test_column_int',
+            field_type=DynamicColumn.FieldTypes.INTEGER_FIELD,
+            table=self.test_table,
+        )
+        DynamicColumn.objects.create(
+            name='test_column_bool',
+            field_type=DynamicColumn.FieldTypes.BOOLEAN_FIELD,
+            table=self.test_table,
+        )
+        self.test_table.create_dynamic_model()
+        self.dynamic_model = self.test_table.get_dynamic_model()
+        for i in range(5):
+            self.dynamic_model.objects.create(
+                test_column_char=f'test{i}',
+                test_column_int=i,
+                test_column_bool=i % 2 == 0,
+            )
+        self.url = reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk})
+
+    def test_update_rows(self):
+        """Test updating rows matching filter"""
+        payload = {
+            'filter': {'test_column_int__gte': '2', 'test_column_bool': True},
+            'values': {'test_column_char': 'updated'},
+        }
+        res = self.client.patch(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'updated': 2})
+        self.assertEqual(
+            sorted(self.dynamic_model.objects.filter(test_column_char='updated').values_list('test_column_int', flat=True)),
+            [2, 4],
+        )
+
+    def test_update_rows_in_batches(self):
+        """Test updating rows in batches"""
+        payload = {
+            'filter': {'test_column_int__lt': 4},
+            'values': {'test_column_int': 10},
+            'batch_size': 3,
+        }
+        res = self.client.patch(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'updated': 4})
+        self.assertEqual(self.dynamic_model.objects.filter(test_column_int=10).count(), 4)
+
+    def test_update_rows_with_wrong_values(self):
+        """Test updating rows with values of wrong type"""
+        payload = {
+            'filter': {},
+            'values': {'test_column_int': 'wrong'},
+        }
+        res = self.client.patch(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('values', res.data)
+
+    def test_update_rows_without_values(self):
+        """Test updating rows without writable values"""
+        for values in ({}, {'unknown': 1}, {'id': 1}):
+            res = self.client.patch(self.url, {'filter': {}, 'values': values}, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, values)
+            self.assertIn('values', res.data)
+
+    def test_delete_rows(self):
+        """Test deleting rows matching filter"""
+        payload = {
+            'filter': {'test_column_char__in': ['test1', 'test3']},
+        }
+        res = self.client.delete(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'deleted': 2})
+        self.assertEqual(self.dynamic_model.objects.count(), 3)
+
+    def test_delete_rows_in_batches(self):
+        """Test deleting rows in batches"""
+        payload = {
+            'filter': {},
+            'batch_size': 2,
+        }
+        res = self.client.delete(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'deleted': 5})
+        self.assertEqual(self.dynamic_model.objects.count(), 0)
+
+    def test_delete_rows_with_wrong_filter(self):
+        """Test deleting rows with unknown column, unsupported lookup and wrong value"""
+        payload = {
+            'filter': {'wrong_column': 1, 'test_column_bool__gt': True, 'test_column_int': 'wrong'},
+        }
+        res = self.client.delete(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(res.data['filter']), {'wrong_column', 'test_column_bool__gt', 'test_column_int'})
+        self.assertEqual(self.dynamic_model.objects.count(), 5)
+
+    def test_partial_update_table_not_allowed(self):
+        """Test tables can't be updated with PATCH"""
+        res = self.client.patch(
+            reverse_lazy('table_builder:table-detail', kwargs={'pk': self.test_table.pk}),
+            {'name': 'test_table_2'},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class DynamicTableRowsUpsertApiTests(TestCase):
+    """Test upserting DynamicTable rows by API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.test_table = DynamicTable.objects.create(
+            name='test_table_1',
+            versioned=True,
+        )
+        self.test_column_key = DynamicColumn.objects.create(
+            name='test_column_key',
+            field_type=DynamicColumn.FieldTypes.CHAR_FIELD,
+            unique=True,
+            table=self.test_table,
+        )
+        self.test_column_int = DynamicColumn.objects.create(
+            name='test_column_int',
+            field_type=DynamicColumn.FieldTypes.INTEGER_FIELD,
+            table=self.test_table,
+        )
+        self.test_table.create_dynamic_model()
+        self.dynamic_model = self.test_table.get_dynamic_model()
+        self.dynamic_model.objects.create(test_column_key='a', test_column_int=1)
+        self.url = reverse_lazy('table_builder:table-upsert', kwargs={'pk': self.test_table.pk})
+
+    def test_upsert_rows(self):
+        """Test inserting new rows and updating existing ones"""
+        payload = {
+            'rows': [
+                {'test_column_key': 'a', 'test_column_int': 10},
+                {'test_column_key': 'b', 'test_column_int': 2},
+                {'test_column_key': 'b', 'test_column_int': 20},
+            ],
+            'batch_size': 1,
+        }
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'upserted': 2})
+        self.assertEqual(
+            dict(self.dynamic_model.objects.values_list('test_column_key', 'test_column_int')),
+            {'a': 10, 'b': 20},
+        )
+        # Version of the updated row is incremented, the inserted row has the initial one
+        self.assertEqual(
+            dict(self.dynamic_model.objects.values_list('test_column_key', 'row_version')), {'a': 2, 'b': 1},
+        )
+
+    def test_update_rows_with_duplicate_unique_value(self):
+        """Test updating rows to the same value of unique column"""
+        self.dynamic_model.objects.create(test_column_key='b', test_column_int=2)
+        res = self.client.patch(
+            reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk}),
+            {'filter': {}, 'values': {'test_column_key': 'c'}},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data, {'values': ['Values violate unique columns.']})
+        self.assertFalse(self.dynamic_model.objects.filter(test_column_key='c').exists())
+
+    def test_upsert_rows_with_wrong_unique_field(self):
+        """Test upserting rows on conflict of not unique column"""
+        payload = {
+            'rows': [{'test_column_key': 'a', 'test_column_int': 10}],
+            'unique_field': 'test_column_int',
+        }
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('unique_field', res.data)
+
+    def test_add_row_with_duplicate_unique_value(self):
+        """Test adding a row with existing value of unique column"""
+        res = self.client.post(
+            reverse_lazy('table_builder:table-row', kwargs={'pk': self.test_table.pk}),
+            {'test_column_key': 'a', 'test_column_int': 2},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.dynamic_model.objects.count(), 1)
+
+    def test_update_table_unique(self):
+        """Test dropping unique constraint of a column"""
+        payload = {
+            'name': 'test_table_1',
+            'columns': [
+                {
+                    'pk': self.test_column_key.pk,
+                    'name': 'test_column_key',
+                    'field_type': DynamicColumn.FieldTypes.CHAR_FIELD,
+                    'unique': False,
+                },
+                {
+                    'pk': self.test_column_int.pk,
+                    'name': 'test_column_int',
+                    'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD,
+                },
+            ],
+        }
+        res = self.client.put(
+            reverse_lazy('table_builder:table-detail', kwargs={'pk': self.test_table.pk}),
+            payload,
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        dynamic_model = DynamicTable.objects.get(pk=self.test_table.pk).get_dynamic_model()
+        dynamic_model.objects.create(test_column_key='a', test_column_int=2)
+        self.assertEqual(dynamic_model.objects.count(), 2)
+
+
+class DynamicTableRowDetailApiTests(TestCase):
+    """Test single DynamicTable row API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.test_table = DynamicTable.objects.create(
+            name='test_table_1',
+            versioned=True,
+        )
+        DynamicColumn.objects.create(
+            name='test_column_char',
+            field_type=DynamicColumn.FieldTypes.CHAR_FIELD,
+            table=self.test_table,
+        )
+        DynamicColumn.objects.create(
+            name='test_column_int',
+            field_type=DynamicColumn.FieldTypes.INTEGER_FIELD,
+            table=self.test_table,
+        )
+        self.test_table.create_dynamic_model()
+        self.dynamic_model = self.test_table.get_dynamic_model()
+        self.row = self.dynamic_model.objects.create(test_column_char='test', test_column_int=1)
+        self.url = reverse_lazy('table_builder:table-row-detail', kwargs={'pk': self.test_table.pk, 'row_id': self.row.pk})
+
+    def test_get_row(self):
+        """Test getting a single row"""
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            {'id': self.row.pk, 'test_column_char': 'test', 'test_column_int': 1, 'row_version': 1},
+        )
+
+    def test_get_missing_row(self):
+        """Test getting a row which doesn't exist"""
+        res = self.client.get(
+            reverse_lazy('table_builder:table-row-detail', kwargs={'pk': self.test_table.pk, 'row_id': 0})
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_update_row(self):
+        """Test updating a row increments its version"""
+        payload = {'test_column_char': 'updated', 'test_column_int': 2, 'row_version': 1}
+        res = self.client.put(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            {'id': self.row.pk, 'test_column_char': 'updated', 'test_column_int': 2, 'row_version': 2},
+        )
+
+    def test_update_row_conflict(self):
+        """Test updating a row with stale version"""
+        self.client.patch(self.url, {'test_column_int': 2}, format='json')
+        res = self.client.patch(self.url, {'test_column_int': 3, 'row_version': 1}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.dynamic_model.objects.get().test_column_int, 2)
+
+    def test_update_rows_increments_version(self):
+        """Test updating rows matching filter increments their versions"""
+        res = self.client.patch(
+            reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk}),
+            {'filter': {}, 'values': {'test_column_int': 2}},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.dynamic_model.objects.get().row_version, 2)
+        res = self.client.patch(self.url, {'test_column_int': 3, 'row_version': 1}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_update_row_with_missing_field(self):
+        """Test full update requires all columns"""
+        res = self.client.put(self.url, {'test_column_int': 2}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_delete_row(self):
+        """Test deleting a row"""
+        res = self.client.delete(f'{self.url}?row_version=2')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+        res = self.client.delete(f'{self.url}?row_version=1')
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.dynamic_model.objects.count(), 0)
+
+    def test_disable_versioning(self):
+        """Test version column is dropped when table versioning is disabled"""
+        payload = {
+            'name': 'test_table_1',
+            'versioned': False,
+            'columns': [
+                {'pk': column.pk, 'name': column.name, 'field_type': column.field_type}
+                for column in self.test_table.columns.all()
+            ],
+        }
+        res = self.client.put(
+            reverse_lazy('table_builder:table-detail', kwargs={'pk': self.test_table.pk}),
+            payload,
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.put(self.url, {'test_column_char': 'updated', 'test_column_int': 2}, format='json')
+        self.assertEqual(res.data, {'id': self.row.pk, 'test_column_char': 'updated', 'test_column_int': 2})
+
+
+@override_settings(TABLE_BUILDER_CHANGES_SAFETY_LAG=0)
+class DynamicTableChangesApiTests(TestCase):
+    """Test DynamicTable change feed API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.test_table = DynamicTable.objects.create(
+            name='test_table_1',
+            track_changes=True,
+        )
+        DynamicColumn.objects.create(
+            name='test_column_int',
+            field_type=DynamicColumn.FieldTypes.INTEGER_FIELD,
+            unique=True,
+            table=self.test_table,
+        )
+        self.test_table.create_dynamic_model()
+        self.dynamic_model = self.test_table.get_dynamic_model()
+        self.rows = [self.dynamic_model.objects.create(test_column_int=i) for i in range(3)]
+        self.url = reverse_lazy('table_builder:table-changes', kwargs={'pk': self.test_table.pk})
+
+    def test_changes(self):
+        """Test getting all changes and changes since the cursor"""
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in res.data['changes']], [row.pk for row in self.rows])
+        self.assertFalse(res.data['has_more'])
+
+        self.client.patch(
+            reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk}),
+            {'filter': {'id': self.rows[0].pk}, 'values': {'test_column_int': 10}},
+            format='json',
+        )
+        self.client.delete(
+            reverse_lazy('table_builder:table-row-detail', kwargs={'pk': self.test_table.pk, 'row_id': self.rows[1].pk})
+        )
+        res = self.client.get(self.url, {'since': res.data['cursor']})
+
+        self.assertEqual(
+            [(row['id'], row['test_column_int'], row['deleted']) for row in res.data['changes']],
+            [(self.rows[0].pk, 10, False), (self.rows[1].pk, 1, True)],
+        )
+
+        res = self.client.get(self.url, {'since': res.data['cursor']})
+
+        self.assertEqual(res.data['changes'], [])
+
+    def test_changes_limit(self):
+        """Test change feed pagination"""
+        res = self.client.get(self.url, {'limit': 2})
+
+        self.assertEqual([row['id'] for row in res.data['changes']], [row.pk for row in self.rows[:2]])
+        self.assertTrue(res.data['has_more'])
+
+        res = self.client.get(self.url, {'limit': 2, 'since': res.data['cursor']})
+
+        self.assertEqual([row['id'] for row in res.data['changes']], [self.rows[2].pk])
+        self.assertFalse(res.data['has_more'])
+
+    def test_deleted_rows_hidden(self):
+        """Test deleted rows are not returned by rows endpoint"""
+        self.client.delete(
+            reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk}),
+            {'filter': {'test_column_int__gte': 1}},
+            format='json',
+        )
+        res = self.client.get(reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk}))
+
+        self.assertEqual([row['id'] for row in res.data], [self.rows[0].pk])
+        self.assertEqual(self.dynamic_model.all_objects.count(), 3)
+
+    def test_add_row_with_deleted_unique_value(self):
+        """Test unique values of deleted rows are not reused"""
+        self.dynamic_model.objects.filter(pk=self.rows[1].pk).delete()
+        res = self.client.post(
+            reverse_lazy('table_builder:table-row', kwargs={'pk': self.test_table.pk}),
+            {'test_column_int': 1},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('test_column_int', res.data)
+
+    def test_wrong_cursor(self):
+        """Test getting changes with invalid cursor"""
+        res = self.client.get(self.url, {'since': 'wrong'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_disable_change_tracking(self):
+        """Test rows marked as deleted are purged when change tracking is disabled"""
+        self.dynamic_model.objects.filter(pk=self.rows[1].pk).delete()
+        url = reverse_lazy('table_builder:table-detail', kwargs={'pk': self.test_table.pk})
+        res = self.client.get(url)
+
+        res = self.client.put(url, {**res.data, 'track_changes': False}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        res = self.client.get(reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk}))
+        self.assertEqual([row['id'] for row in res.data], [self.rows[0].pk, self.rows[2].pk])
+        self.assertNotIn('deleted', res.data[0])
+
+    def test_changes_not_tracked(self):
+        """Test getting changes of a table without change tracking"""
+        table = DynamicTable.objects.create(
+            name='test_table_2',
+        )
+        res = self.client.get(reverse_lazy('table_builder:table-changes', kwargs={'pk': table.pk}))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DynamicTableRowEventsTests(TestCase):
+    """Test notifications about changed rows"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.test_table = DynamicTable.objects.create(
+            name='test_table_1',
+        )
+        DynamicColumn.objects.create(
+            name='test_column_int',
+            field_type=DynamicColumn.FieldTypes.INTEGER_FIELD,
+            table=self.test_table,
+        )
+        self.test_table.create_dynamic_model()
+
+    def test_rows_changed_notify(self):
+        """Test writing rows sends the signal and NOTIFY"""
+        receiver = mock.Mock()
+        rows_changed.connect(receiver)
+        self.addCleanup(rows_changed.disconnect, receiver)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                reverse_lazy('table_builder:table-row', kwargs={'pk': self.test_table.pk}),
+                {'test_column_int': 1},
+            )
+
+        receiver.assert_called_once_with(signal=rows_changed, sender=DynamicTable, table=self.test_table, operation='insert')
+        self.assertIn('pg_notify', queries[-1]['sql'])
+
+    @override_settings(TABLE_BUILDER_NOTIFY_COALESCE_INTERVAL=0.1)
+    def test_subscription_coalesce(self):
+        """Test notifications of a burst are coalesced into a single event"""
+        async def consume():
+            subscription = notifications.Subscription(self.test_table.pk)
+            self.assertIsNone(await subscription.get(timeout=0.01))
+            subscription.push('insert')
+            task = asyncio.create_task(subscription.get())
+            await asyncio.sleep(0.01)
+            subscription.push('update')
+            subscription.push('insert')
+            return await task
+
+        self.assertEqual(
+            asyncio.run(consume()),
+            {'table': self.test_table.pk, 'operations': ['insert', 'update'], 'notifications': 3},
+        )
+
+    @override_settings(TABLE_BUILDER_NOTIFY_COALESCE_INTERVAL=0)
+    def test_event_stream(self):
+        """Test notification is streamed as an event by the worker listener"""
+        payload = json.dumps({'table': self.test_table.pk, 'operation': 'update'})
+
+        async def consume():
+            stream = notifications.event_stream(self.test_table.pk)
+            try:
+                chunks = [await anext(stream)]
+                await asyncio.wait_for(notifications.listener.ready.wait(), 5)
+                # Notify from a separate connection, as the test transaction is never committed
+                async with await psycopg.AsyncConnection.connect(
+                    notifications.listener._get_conninfo(), autocommit=True,
+                ) as conn:
+                    await conn.execute('SELECT pg_notify(%s, %s)', [notifications.CHANNEL, payload])
+                chunks.append(await asyncio.wait_for(anext(stream), 5))
+                return chunks
+            finally:
+                await stream.aclose()
+
+        chunks = asyncio.run(consume())
+
+        self.assertTrue(chunks[0].startswith('retry:'))
+        self.assertEqual(
+            chunks[1],
+            'event: rows\ndata: {"table": %d, "operations": ["update"], "notifications": 1}\n\n' % self.test_table.pk,
+        )
+        self.assertEqual(notifications.listener._subscriptions, {})
+
+    def test_events_not_found(self):
+        """Test streaming events of a missing table"""
+        res = self.client.get(reverse_lazy('table_builder:table-events', kwargs={'pk': 0}))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class DynamicTablePartitioningTests(TestCase):
+    """Test partitioned DynamicTable"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            'name': 'test_table_1',
+            'partitioning': DynamicTable.Partitioning.RANGE,
+            'partition_key': 'test_column_int',
+            'partition_size': 100,
+            'columns': [
+                {
+                    'name': 'test_column_int',
+                    'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD,
+                },
+            ],
+        }
+
+    def get_partition_names(self, table):
+        return sorted(name for name, _, _ in table.get_partitions())
+
+    def test_create_range_partitioned_table(self):
+        """Test creating a range partitioned table, rows are routed and queries are pruned"""
+        res = self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        table = DynamicTable.objects.get()
+        self.assertEqual(
+            self.get_partition_names(table),
+            ['test_table_1_default', 'test_table_1_p0', 'test_table_1_p100', 'test_table_1_p200', 'test_table_1_p300'],
+        )
+
+        self.client.post(reverse_lazy('table_builder:table-row', kwargs={'pk': table.pk}), {'test_column_int': 150})
+        self.client.post(reverse_lazy('table_builder:table-row', kwargs={'pk': table.pk}), {'test_column_int': 1000})
+        queryset = table.get_dynamic_model().objects.filter(test_column_int__gte=100, test_column_int__lt=200)
+
+        self.assertEqual(list(queryset.values_list('test_column_int', flat=True)), [150])
+        plan = queryset.explain()
+        self.assertIn('test_table_1_p100', plan)
+        self.assertNotIn('test_table_1_p0 ', plan)
+        self.assertNotIn('test_table_1_default', plan)
+
+    def test_create_hash_partitioned_table(self):
+        """Test creating a hash partitioned table"""
+        self.payload.update(partitioning=DynamicTable.Partitioning.HASH, partition_size=4)
+        res = self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        table = DynamicTable.objects.get()
+        self.assertEqual(
+            self.get_partition_names(table),
+            ['test_table_1_h0', 'test_table_1_h1', 'test_table_1_h2', 'test_table_1_h3'],
+        )
+
+    def test_create_partitioned_by_created_at(self):
+        """Test range partitioning by row creation time"""
+        self.payload.update(partition_key=DynamicTable.CREATED_AT_COLUMN, partition_size=1)
+        res = self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        table = DynamicTable.objects.get()
+        self.assertEqual(len(table.get_partitions()), 5)
+
+        res = self.client.post(reverse_lazy('table_builder:table-row', kwargs={'pk': table.pk}), {'test_column_int': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIsNotNone(res.data['created_at'])
+
+    def test_partitioning_validation(self):
+        """Test partitioning by wrong key, with unique columns and changing partitioning"""
+        for payload in (
+            {**self.payload, 'partition_key': 'wrong'},
+            {**self.payload, 'partition_size': None},
+            {**self.payload, 'partitioning': DynamicTable.Partitioning.HASH, 'partition_key': 'created_at'},
+            {**self.payload, 'columns': [{**self.payload['columns'][0], 'unique': True}]},
+        ):
+            res = self.client.post(reverse_lazy('table_builder:table-list'), payload, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+        url = reverse_lazy('table_builder:table-detail', kwargs={'pk': res.data['pk']})
+        key_column = res.data['columns'][0]
+        for payload in (
+            {**res.data, 'partition_size': 10},
+            {**res.data, 'columns': [{**key_column, 'field_type': DynamicColumn.FieldTypes.BIG_INTEGER_FIELD}]},
+            {**res.data, 'columns': [{**key_column, 'name': 'test_column_renamed'}]},
+            {**res.data, 'columns': [{**key_column, 'pk': None}]},
+        ):
+            res_update = self.client.put(url, payload, format='json')
+
+            self.assertEqual(res_update.status_code, status.HTTP_400_BAD_REQUEST, payload)
+        res = self.client.put(
+            url, {**res.data, 'columns': [key_column, {'name': 'test_column_char'}]}, format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+
+    def test_partition_names_collision(self):
+        """Test tables colliding with partitions or indexes of other tables are rejected"""
+        url = reverse_lazy('table_builder:table-list')
+        res = self.client.post(url, self.payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        columns = [{'name': 'test_column_char', 'searchable': True}]
+        self.assertEqual(
+            self.client.post(url, {'name': 'test_table_2', 'columns': columns}, format='json').status_code,
+            status.HTTP_201_CREATED,
+        )
+
+        for payload in (
+            {'name': 'test_table_1_default', 'columns': []},
+            {'name': 'test_table_2_search_vector', 'columns': []},
+        ):
+            res = self.client.post(url, payload, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, payload)
+            self.assertIn('name', res.data)
+        res = self.client.post(url, {**self.payload, 'name': 'test_table_3_p0'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        res = self.client.post(url, {**self.payload, 'name': 'test_table_3'}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(DynamicTable.objects.count(), 3)
+        res = self.client.post(reverse_lazy('table_builder:table-bulk'), {'tables': [
+            {**self.payload, 'name': 'test_table_4'}, {'name': 'test_table_4_p100', 'columns': []},
+        ]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(DynamicTable.objects.count(), 3)
+
+    def test_maintain_partitions(self):
+        """Test pre-creating partitions after the last one with rows and detaching old ones"""
+        res = self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+        table = DynamicTable.objects.get(pk=res.data['pk'])
+        table.get_dynamic_model().objects.create(test_column_int=250)
+
+        call_command('maintain_partitions', ahead=2, retain=1, stdout=io.StringIO())
+
+        self.assertEqual(
+            self.get_partition_names(table),
+            ['test_table_1_default', 'test_table_1_p100', 'test_table_1_p200', 'test_table_1_p300', 'test_table_1_p400'],
+        )
+        self.assertTrue(DynamicTable(name='test_table_1_p0').is_table_exists())
+
+
+class DynamicTableBulkLoadTests(TestCase):
+    """Test unlogged DynamicTable and bulk load mode"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        payload = {
+            'name': 'test_table_1',
+            'unlogged': True,
+            'track_changes': True,
+            'columns': [
+                {
+                    'name': 'test_column_char',
+                    'field_type': DynamicColumn.FieldTypes.CHAR_FIELD,
+                    'unique': True,
+                },
+            ],
+        }
+        res = self.client.post(reverse_lazy('table_builder:table-list'), payload, format='json')
+        self.test_table = DynamicTable.objects.get(pk=res.data['pk'])
+        self.url = reverse_lazy('table_builder:table-bulk-load', kwargs={'pk': self.test_table.pk})
+
+    def get_persistence(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT relpersistence FROM pg_class WHERE oid = to_regclass(%s)", [self.test_table.name])
+            return cursor.fetchone()[0]
+
+    def get_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [self.test_table.name])
+            return {name for name, in cursor.fetchall()}
+
+    def test_unlogged_table(self):
+        """Test creating unlogged table and switching it to logged"""
+        self.assertEqual(self.get_persistence(), 'u')
+
+        res = self.client.get(reverse_lazy('table_builder:table-detail', kwargs={'pk': self.test_table.pk}))
+        res = self.client.put(
+            reverse_lazy('table_builder:table-detail', kwargs={'pk': self.test_table.pk}),
+            {**res.data, 'unlogged': False},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_persistence(), 'p')
+
+    def test_bulk_load(self):
+        """Test indexes are dropped during bulk load and recreated when it is finished"""
+        indexes = self.get_indexes()
+
+        res = self.client.post(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['bulk_load'])
+        # Primary key and unique constraint indexes are kept
+        self.assertEqual(len(self.get_indexes()), 2)
+
+        res = self.client.post(
+            reverse_lazy('table_builder:table-upsert', kwargs={'pk': self.test_table.pk}),
+            {'rows': [{'test_column_char': str(i)} for i in range(10)]},
+            format='json',
+        )
+
+        self.assertEqual(res.data, {'upserted': 10})
+
+        res = self.client.delete(self.url + '?logged=true')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.data['bulk_load'])
+        self.assertFalse(res.data['unlogged'])
+        self.assertEqual(self.get_indexes(), indexes)
+        self.assertEqual(self.get_persistence(), 'p')
+
+    def test_bulk_load_started(self):
+        """Test starting bulk load twice and changing the table during bulk load"""
+        self.client.post(self.url)
+        res = self.client.post(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(reverse_lazy('table_builder:table-detail', kwargs={'pk': self.test_table.pk}))
+        res = self.client.put(
+            reverse_lazy('table_builder:table-detail', kwargs={'pk': self.test_table.pk}),
+            {**res.data, 'versioned': True},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_load_not_started(self):
+        """Test finishing bulk load which is not started"""
+        res = self.client.delete(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DynamicTableCloneApiTests(TestCase):
+    """Test cloning DynamicTable"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.test_table = DynamicTable.objects.create(
+            name='test_table_1',
+            versioned=True,
+        )
+        DynamicColumn.objects.create(
+            name='test_column_char',
+            field_type=DynamicColumn.FieldTypes.CHAR_FIELD,
+            table=self.test_table,
+        )
+        DynamicColumn.objects.create(
+            name='test_column_int',
+            field_type=DynamicColumn.FieldTypes.INTEGER_FIELD,
+            table=self.test_table,
+        )
+        self.test_table.create_dynamic_model()
+        self.dynamic_model = self.test_table.get_dynamic_model()
+        self.rows = [self.dynamic_model.objects.create(test_column_char=str(i), test_column_int=i) for i in range(5)]
+        self.url = reverse_lazy('table_builder:table-clone', kwargs={'pk': self.test_table.pk})
+
+    def test_clone(self):
+        """Test cloning the table with all rows"""
+        res = self.client.post(self.url, {'name': 'test_table_2'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(res.data['versioned'])
+        self.assertEqual([column['name'] for column in res.data['columns']], ['test_column_char', 'test_column_int'])
+        clone = DynamicTable.objects.get(pk=res.data['pk'])
+        clone_model = clone.get_dynamic_model()
+        self.assertEqual(
+            list(clone_model.objects.order_by('pk').values_list('pk', 'test_column_char', 'test_column_int')),
+            list(self.dynamic_model.objects.order_by('pk').values_list('pk', 'test_column_char', 'test_column_int')),
+        )
+        # Identity sequence continues after copied ids
+        self.assertEqual(clone_model.objects.create(test_column_char='a', test_column_int=0).pk, self.rows[-1].pk + 1)
+
+    def test_clone_filter_columns(self):
+        """Test cloning a subset of rows and columns"""
+        res = self.client.post(
+            self.url,
+            {'name': 'test_table_2', 'columns': ['test_column_int'], 'filter': {'test_column_int__gte': 3}},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        clone_model = DynamicTable.objects.get(pk=res.data['pk']).get_dynamic_model()
+        self.assertEqual(list(clone_model.objects.values('id', 'test_column_int', 'row_version').order_by('pk')), [
+            {'id': row.pk, 'test_column_int': row.test_column_int, 'row_version': 1} for row in self.rows[3:]
+        ])
+
+    def test_clone_wrong(self):
+        """Test cloning with existing name and unknown column"""
+        for payload in (
+            {'name': 'test_table_1'},
+            {'name': 'test_table_2', 'columns': ['wrong']},
+        ):
+            res = self.client.post(self.url, payload, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(DynamicTable.objects.count(), 1)
+
+
+class DynamicTableSearchApiTests(TestCase):
+    """Test full-text search of DynamicTable rows"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        payload = {
+            'name': 'test_table_1',
+            'columns': [
+                {
+                    'name': 'test_column_title',
+                    'field_type': DynamicColumn.FieldTypes.CHAR_FIELD,
+                    'searchable': True,
+                },
+                {
+                    'name': 'test_column_body',
+                    'field_type': DynamicColumn.FieldTypes.CHAR_FIELD,
+                    'searchable': True,
+                },
+            ],
+        }
+        res = self.client.post(reverse_lazy('table_builder:table-list'), payload, format='json')
+        self.table_data = res.data
+        self.test_table = DynamicTable.objects.get(pk=res.data['pk'])
+        self.dynamic_model = self.test_table.get_dynamic_model()
+        self.rows = [
+            self.dynamic_model.objects.create(test_column_title=title, test_column_body=body)
+            for title, body in (
+                ('quick fox', 'jumps over the lazy dog'),
+                ('slow turtle', 'the fox is quick'),
+                ('lazy dog', 'sleeps'),
+            )
+        ]
+        self.url = reverse_lazy('table_builder:table-rows', kwargs={'pk': self.test_table.pk})
+
+    def test_search(self):
+        """Test searching rows over searchable columns"""
+        res = self.client.get(self.url, {'search': 'quick fox'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in res.data], [self.rows[0].pk, self.rows[1].pk])
+        self.assertNotIn('search_vector', res.data[0])
+
+        res = self.client.get(self.url, {'search': 'dog -fox'})
+
+        self.assertEqual([row['id'] for row in res.data], [self.rows[2].pk])
+
+    def test_search_index(self):
+        """Test search uses the GIN index of the search vector"""
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = search(self.dynamic_model.objects.all(), 'fox', DynamicTable.SEARCH_VECTOR_COLUMN).explain()
+
+        self.assertIn('test_table_1_search_vector', plan)
+
+    def test_update_searchable_columns(self):
+        """Test search vector follows changes of searchable columns"""
+        columns = self.table_data['columns']
+        res = self.client.put(
+            reverse_lazy('table_builder:table-detail', kwargs={'pk': self.test_table.pk}),
+            {**self.table_data, 'columns': [columns[0], {**columns[1], 'searchable': False}]},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(self.url, {'search': 'quick'})
+        self.assertEqual([row['id'] for row in res.data], [self.rows[0].pk])
+
+        res = self.client.put(
+            reverse_lazy('table_builder:table-detail', kwargs={'pk': self.test_table.pk}),
+            {**self.table_data, 'columns': [{**columns[0], 'searchable': False}, {**columns[1], 'searchable': False}]},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(self.url, {'search': 'quick'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_searchable_not_char(self):
+        """Test only char columns can be searchable"""
+        payload = {
+            'name': 'test_table_2',
+            'columns': [
+                {
+                    'name': 'test_column_int',
+                    'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD,
+                    'searchable': True,
+                },
+            ],
+        }
+        res = self.client.post(reverse_lazy('table_builder:table-list'), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DynamicTableTrigramIndexTests(TestCase):
+    """Test trigram indexes of DynamicTable char columns"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            'name': 'test_table_1',
+            'columns': [
+                {
+                    'name': 'test_column_char',
+                    'field_type': DynamicColumn.FieldTypes.CHAR_FIELD,
+                    'trigram_index': True,
+                },
+            ],
+        }
+        self.trigram_available = is_extension_available(connection, models.TRIGRAM_EXTENSION)
+
+    def test_ilike_filter(self):
+        """Test case-insensitive filters of char columns are built with ILIKE"""
+        table = DynamicTable.objects.create(name='test_table_1')
+        DynamicColumn.objects.create(name='test_column_char', table=table)
+        table.create_dynamic_model()
+        dynamic_model = table.get_dynamic_model()
+        for value in ('Quick Fox', 'quick_turtle', '100%', 'fox'):
+            dynamic_model.objects.create(test_column_char=value)
+
+        for expression, expected in (
+            ({'test_column_char__icontains': 'QUICK'}, ['Quick Fox', 'quick_turtle']),
+            ({'test_column_char__istartswith': 'quick_'}, ['quick_turtle']),
+            ({'test_column_char__iendswith': '0%'}, ['100%']),
+        ):
+            queryset = dynamic_model.objects.filter(build_filter(dynamic_model, expression))
+
+            self.assertIn('ILIKE', str(queryset.query))
+            self.assertEqual(sorted(queryset.values_list('test_column_char', flat=True)), expected)
+
+    def test_trigram_index_not_available(self):
+        """Test trigram index is rejected without pg_trgm extension"""
+        if self.trigram_available:
+            self.skipTest('pg_trgm extension is available')
+        res = self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_trigram_index(self):
+        """Test substring filters use the trigram index"""
+        if not self.trigram_available:
+            self.skipTest('pg_trgm extension is not available')
+        res = self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        dynamic_model = DynamicTable.objects.get(pk=res.data['pk']).get_dynamic_model()
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        for expression in ({'test_column_char__contains': 'fox'}, {'test_column_char__icontains': 'fox'}):
+            plan = dynamic_model.objects.filter(build_filter(dynamic_model, expression)).explain()
+
+            self.assertIn('test_table_1_test_column_char_trgm', plan)
+
+
+class DynamicTableColumnTypesTests(TestCase):
+    """Test column types of DynamicTable"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            'name': 'test_table_1',
+            'columns': [
+                {'name': 'test_column_code', 'field_type': DynamicColumn.FieldTypes.CHAR_FIELD, 'max_length': 8},
+                {'name': 'test_column_small', 'field_type': DynamicColumn.FieldTypes.SMALL_INTEGER_FIELD},
+                {'name': 'test_column_big', 'field_type': DynamicColumn.FieldTypes.BIG_INTEGER_FIELD},
+                {'name': 'test_column_float', 'field_type': DynamicColumn.FieldTypes.FLOAT_FIELD},
+                {
+                    'name': 'test_column_price',
+                    'field_type': DynamicColumn.FieldTypes.DECIMAL_FIELD,
+                    'max_digits': 8,
+                    'decimal_places': 2,
+                },
+                {'name': 'test_column_date', 'field_type': DynamicColumn.FieldTypes.DATE_FIELD},
+                {'name': 'test_column_uuid', 'field_type': DynamicColumn.FieldTypes.UUID_FIELD},
+            ],
+        }
+        self.row = {
+            'test_column_code': 'A-1',
+            'test_column_small': 7,
+            'test_column_big': 2 ** 40,
+            'test_column_float': 0.5,
+            'test_column_price': '12.30',
+            'test_column_date': '2024-01-31',
+            'test_column_uuid': '9f1c7a4e-1d2b-4c3d-8e5f-6a7b8c9d0e1f',
+        }
+
+    def _create_table(self):
+        res = self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return DynamicTable.objects.get(pk=res.data['pk'])
+
+    def test_column_types(self):
+        """Test columns are created with the storage types and options"""
+        table = self._create_table()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT column_name, data_type, character_maximum_length, numeric_precision, numeric_scale "
+                "FROM information_schema.columns WHERE table_name = %s",
+                [table.get_dynamic_model()._meta.db_table],
+            )
+            columns = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        self.assertEqual(columns['test_column_code'], ('character varying', 8, None, None))
+        self.assertEqual(columns['test_column_small'][0], 'smallint')
+        self.assertEqual(columns['test_column_big'][0], 'bigint')
+        self.assertEqual(columns['test_column_float'][0], 'double precision')
+        self.assertEqual(columns['test_column_price'], ('numeric', None, 8, 2))
+        self.assertEqual(columns['test_column_date'][0], 'date')
+        self.assertEqual(columns['test_column_uuid'][0], 'uuid')
+
+    def test_rows_representation(self):
+        """Test row values are equal in dynamic serializer and rows representations"""
+        table = self._create_table()
+        res = self.client.post(reverse_lazy('table_builder:table-row', args=[table.pk]), self.row, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.get(reverse_lazy('table_builder:table-rows', args=[table.pk]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual({name: res.json()[0][name] for name in self.row}, self.row)
+        res = self.client.get(reverse_lazy('table_builder:table-rows', args=[table.pk]), {'format': 'columnar'})
+
+        self.assertEqual(res.json()['data']['test_column_price'], ['12.30'])
+        self.assertEqual(res.json()['data']['test_column_uuid'], [self.row['test_column_uuid']])
+        row_id = table.get_dynamic_model().objects.get().pk
+        res = self.client.put(
+            reverse_lazy('table_builder:table-row-detail', kwargs={'pk': table.pk, 'row_id': row_id}), self.row, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual({name: res.json()[name] for name in self.row}, self.row)
+
+    def test_insert_rows(self):
+        """Test rows are inserted with binary COPY"""
+        table = self._create_table()
+        rows = [self.row, {**self.row, 'test_column_code': 'B-2', 'test_column_uuid': None}]
+        rows[1]['test_column_uuid'] = '0b6e1f2a-3c4d-4e5f-8a9b-0c1d2e3f4a5b'
+        url = reverse_lazy('table_builder:table-rows', args=[table.pk])
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(url, {'rows': rows}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data, {'inserted': 2})
+        self.assertTrue(any(query['sql'].startswith('COPY') for query in queries))
+        dynamic_model = table.get_dynamic_model()
+        row = dynamic_model.objects.get(test_column_code='B-2')
+        self.assertEqual(row.test_column_price, decimal.Decimal('12.30'))
+        self.assertEqual(row.test_column_big, 2 ** 40)
+        self.assertEqual(str(row.test_column_uuid), rows[1]['test_column_uuid'])
+
+    def test_insert_rows_invalid(self):
+        """Test rows violating column options are rejected"""
+        table = self._create_table()
+        url = reverse_lazy('table_builder:table-rows', args=[table.pk])
+
+        for values in ({'test_column_code': 'too long code'}, {'test_column_price': '123456.789'}):
+            res = self.client.post(url, {'rows': [{**self.row, **values}]}, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(table.get_dynamic_model().objects.exists())
+
+    def test_filter_invalid_value_type(self):
+        """Test filter values of unsupported types are rejected"""
+        table = self._create_table()
+        url = reverse_lazy('table_builder:table-rows', args=[table.pk])
+
+        for expression in ({'test_column_date': {'d': 5}}, {'test_column_date__in': [[2024]]}):
+            res = self.client.delete(url, {'filter': expression}, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, expression)
+            self.assertIn('filter', res.data)
+
+    def test_column_options_validation(self):
+        """Test column options are allowed for types with these options only"""
+        for column in (
+            {'name': 'test_column', 'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD, 'max_length': 8},
+            {'name': 'test_column', 'field_type': DynamicColumn.FieldTypes.CHAR_FIELD, 'max_digits': 8},
+            {'name': 'test_column', 'field_type': DynamicColumn.FieldTypes.DECIMAL_FIELD, 'decimal_places': 20},
+            {'name': 'test_column', 'field_type': DynamicColumn.FieldTypes.DECIMAL_FIELD, 'max_digits': 2},
+            {'name': 'test_column', 'field_type': DynamicColumn.FieldTypes.CHAR_FIELD, 'max_length': 0},
+        ):
+            res = self.client.post(
+                reverse_lazy('table_builder:table-list'), {'name': 'test_table_2', 'columns': [column]}, format='json'
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DynamicTableBatchRowsApiTests(TestCase):
+    """Test reading rows of multiple DynamicTables in one request"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse_lazy('table_builder:table-batch-rows')
+        self.tables = []
+        for name in ('test_table_1', 'test_table_2'):
+            table = DynamicTable.objects.create(name=name)
+            DynamicColumn.objects.create(name='test_column_char', table=table)
+            DynamicColumn.objects.create(
+                name='test_column_int', table=table, field_type=DynamicColumn.FieldTypes.INTEGER_FIELD
+            )
+            table.create_dynamic_model()
+            dynamic_model = table.get_dynamic_model()
+            for number in range(5):
+                dynamic_model.objects.create(test_column_char=f'{name}_{number}', test_column_int=number)
+            self.tables.append(table)
+
+    def test_batch_rows(self):
+        """Test rows of the tables are returned in order of the request"""
+        payload = {
+            'tables': [
+                {'table': self.tables[1].pk, 'fields': ['id', 'test_column_char'], 'limit': 2},
+                {'table': self.tables[0].pk, 'filter': {'test_column_int__gte': 3}},
+                {'table': self.tables[0].pk, 'filter': {'test_column_int__in': []}},
+            ],
+        }
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.data['results']
+        self.assertEqual([result['table'] for result in results], [self.tables[1].pk, *[self.tables[0].pk] * 2])
+        self.assertEqual(
+            [row['test_column_char'] for row in results[0]['rows']], ['test_table_2_0', 'test_table_2_1']
+        )
+        self.assertEqual(set(results[0]['rows'][0]), {'id', 'test_column_char'})
+        self.assertEqual([row['test_column_int'] for row in results[1]['rows']], [3, 4])
+        self.assertEqual(results[2]['rows'], [])
+
+    def test_batch_rows_queries(self):
+        """Test tables are loaded with one query when their models are cached"""
+        payload = {'tables': [{'table': table.pk} for table in self.tables]}
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        table_queries = [query for query in queries if 'table_builder_dynamictable' in query['sql']]
+        self.assertEqual(len(table_queries), 1)
+        self.assertEqual([len(result['rows']) for result in res.data['results']], [5, 5])
+
+    def test_batch_rows_models_not_cached(self):
+        """Test models missing in the model cache are built with one columns query"""
+        models._dynamic_models.clear()
+        payload = {'tables': [{'table': table.pk} for table in self.tables]}
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        column_queries = [query for query in queries if 'table_builder_dynamiccolumn' in query['sql']]
+        self.assertEqual(len(column_queries), 1)
+
+    def test_batch_rows_invalid(self):
+        """Test invalid table queries are reported by index"""
+        payload = {
+            'tables': [
+                {'table': self.tables[0].pk},
+                {'table': self.tables[1].pk, 'fields': ['test_column_unknown']},
+                {'table': self.tables[1].pk, 'filter': {'test_column_unknown': 1}},
+            ],
+        }
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(res.data['tables']), {1, 2})
+
+    def test_batch_rows_table_not_found(self):
+        """Test unknown tables are rejected"""
+        res = self.client.post(self.url, {'tables': [{'table': 0}]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class DynamicTableSampleApiTests(TestCase):
+    """Test random samples of DynamicTable rows"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.table = DynamicTable.objects.create(name='test_table_1')
+        DynamicColumn.objects.create(
+            name='test_column_int', table=self.table, field_type=DynamicColumn.FieldTypes.INTEGER_FIELD
+        )
+        self.table.create_dynamic_model()
+        dynamic_model = self.table.get_dynamic_model()
+        dynamic_model.objects.bulk_create([dynamic_model(test_column_int=number) for number in range(5000)])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE test_table_1')
+        self.url = reverse_lazy('table_builder:table-sample', args=[self.table.pk])
+
+    def test_sample(self):
+        """Test sample is limited and repeatable with the seed"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(self.url, {'limit': 50, 'seed': 42})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(res.data), 50)
+        self.assertTrue(res.data)
+        self.assertEqual(set(res.data[0]), {'id', 'test_column_int'})
+        self.assertTrue(any('TABLESAMPLE SYSTEM' in query['sql'] for query in queries))
+        res_repeated = self.client.get(self.url, {'limit': 50, 'seed': 42})
+        self.assertEqual(res_repeated.data, res.data)
+
+    def test_sample_bernoulli(self):
+        """Test rows are sampled with the explicit percent and method"""
+        res = self.client.get(self.url, {'percent': 10, 'method': 'bernoulli', 'seed': 1, 'limit': 10000})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(100 < len(res.data) < 1000)
+
+    def test_sample_percent(self):
+        """Test sampled percent is estimated from statistics of the table"""
+        rows, pages = self.table.estimate_size()
+
+        self.assertEqual(rows, 5000)
+        self.assertEqual(self.table.get_sample_percent(10), 100 * DynamicTable.SAMPLE_MIN_PAGES / pages)
+        self.assertEqual(self.table.get_sample_percent(2500), 100)
+
+    def test_sample_all_rows(self):
+        """Test rows of a full sample are shuffled before the limit"""
+        first_ids = list(self.table.get_dynamic_model().objects.order_by('pk').values_list('pk', flat=True)[:50])
+        res = self.client.get(self.url, {'percent': 100, 'limit': 50})
+
+        self.assertEqual(len(res.data), 50)
+        self.assertNotEqual([row['id'] for row in res.data], first_ids)
+        res = self.client.get(self.url, {'percent': 100, 'limit': 50, 'seed': 42})
+        res_repeated = self.client.get(self.url, {'percent': 100, 'limit': 50, 'seed': 42})
+        self.assertEqual(res_repeated.data, res.data)
+        self.assertNotEqual([row['id'] for row in res.data], first_ids)
+
+    def test_sample_deleted_rows(self):
+        """Test deleted rows of tables with change tracking are not sampled"""
+        table = DynamicTable.objects.create(name='test_table_2', track_changes=True)
+        table.create_dynamic_model()
+        dynamic_model = table.get_dynamic_model()
+        dynamic_model.objects.bulk_create([dynamic_model() for _ in range(10)])
+        dynamic_model.objects.filter(pk__in=dynamic_model.objects.order_by('pk').values('pk')[:4]).delete()
+
+        res = self.client.get(reverse_lazy('table_builder:table-sample', args=[table.pk]), {'percent': 100})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 6)
+        self.assertFalse(any(row['deleted'] for row in res.data))
+
+    def test_sample_invalid(self):
+        """Test invalid sample parameters are rejected"""
+        for params in ({'percent': 101}, {'method': 'unknown'}, {'limit': 0}):
+            res = self.client.get(self.url, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DynamicTableGeneratedColumnsTests(TestCase):
+    """Test stored generated columns of DynamicTable"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.columns = [
+            {'name': 'first_name', 'field_type': DynamicColumn.FieldTypes.CHAR_FIELD},
+            {'name': 'last_name', 'field_type': DynamicColumn.FieldTypes.CHAR_FIELD},
+            {'name': 'price', 'field_type': DynamicColumn.FieldTypes.DECIMAL_FIELD, 'decimal_places': 2},
+            {'name': 'quantity', 'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD},
+            {
+                'name': 'full_name',
+                'field_type': DynamicColumn.FieldTypes.CHAR_FIELD,
+                'expression': "upper(first_name) || ' ' || last_name || ' 100%'",
+            },
+            {
+                'name': 'total',
+                'field_type': DynamicColumn.FieldTypes.DECIMAL_FIELD,
+                'decimal_places': 2,
+                'expression': 'round(price * quantity, 1)',
+            },
+        ]
+        self.row = {'first_name': 'Ada', 'last_name': "O'Neil", 'price': '2.50', 'quantity': 3}
+
+    def _create_table(self):
+        res = self.client.post(
+            reverse_lazy('table_builder:table-list'), {'name': 'test_table_1', 'columns': self.columns}, format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return DynamicTable.objects.get(pk=res.data['pk'])
+
+    def test_compile_expression(self):
+        """Test expressions are compiled to SQL with escaped literals"""
+        sql, expression_type = compile_expression("lower(name) || '%''s'", {'name': DynamicColumn.FieldTypes.CHAR_FIELD})
+
+        self.assertEqual(sql, """(lower("name") || U&'\\0025\\0027s')""")
+        self.assertEqual(expression_type, 'text')
+        sql, expression_type = compile_expression('-(a + 1) / 2', {'a': DynamicColumn.FieldTypes.INTEGER_FIELD})
+
+        self.assertEqual(sql, '((-("a" + 1)) / NULLIF(2, 0))')
+        self.assertEqual(expression_type, 'numeric')
+
+    def test_create_row(self):
+        """Test generated values are computed on insert and returned"""
+        table = self._create_table()
+
+        res = self.client.post(
+            reverse_lazy('table_builder:table-row', args=[table.pk]), {**self.row, 'total': '100'}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['full_name'], "ADA O'Neil 100%")
+        self.assertEqual(res.data['total'], '7.50')
+        res = self.client.get(reverse_lazy('table_builder:table-rows', args=[table.pk]))
+        self.assertEqual(res.data[0]['total'], '7.50')
+
+    def test_write_rows(self):
+        """Test generated values are computed by bulk inserts and updates"""
+        table = self._create_table()
+        url = reverse_lazy('table_builder:table-rows', args=[table.pk])
+
+        res = self.client.post(url, {'rows': [self.row, {**self.row, 'quantity': 4}]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        res = self.client.patch(url, {'filter': {'quantity': 4}, 'values': {'price': '1.25'}}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        dynamic_model = table.get_dynamic_model()
+        self.assertEqual(
+            sorted(dynamic_model.objects.values_list('total', flat=True)), [decimal.Decimal('5'), decimal.Decimal('7.5')]
+        )
+        self.assertEqual(dynamic_model.objects.filter(build_filter(dynamic_model, {'total__gt': 6})).count(), 1)
+
+    def test_write_rows_out_of_range(self):
+        """Test division by zero is null and rows overflowing generated columns are rejected"""
+        self.columns.append({
+            'name': 'unit_price',
+            'field_type': DynamicColumn.FieldTypes.DECIMAL_FIELD,
+            'max_digits': 5,
+            'decimal_places': 2,
+            'expression': 'price / quantity',
+        })
+        table = self._create_table()
+        row_url = reverse_lazy('table_builder:table-row', args=[table.pk])
+        rows_url = reverse_lazy('table_builder:table-rows', args=[table.pk])
+
+        res = self.client.post(row_url, {**self.row, 'quantity': 0}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(res.data['unit_price'])
+        overflow = {**self.row, 'price': '1000', 'quantity': 1}
+        for method, url, payload in (
+            ('post', row_url, overflow),
+            ('post', rows_url, {'rows': [overflow]}),
+            ('patch', rows_url, {'filter': {}, 'values': {'price': '1000', 'quantity': 1}}),
+        ):
+            res = getattr(self.client, method)(url, payload, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, payload)
+        res = self.client.get(reverse_lazy('table_builder:table-detail', args=[table.pk]))
+        columns = res.data['columns']
+        columns[-1]['expression'] = 'price * 1000'
+        res = self.client.put(
+            reverse_lazy('table_builder:table-detail', args=[table.pk]),
+            {'name': 'test_table_1', 'columns': columns},
+            format='json',
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(DynamicColumn.objects.get(name='unit_price').expression, 'price / quantity')
+        self.assertEqual(table.get_dynamic_model().objects.count(), 1)
+
+    def test_update_table(self):
+        """Test generated columns are re-created when they or referenced columns are changed"""
+        table = self._create_table()
+        table.get_dynamic_model().objects.create(first_name='Ada', last_name='Lovelace', price=2, quantity=3)
+        res = self.client.get(reverse_lazy('table_builder:table-detail', args=[table.pk]))
+        columns = res.data['columns']
+        columns[3]['field_type'] = DynamicColumn.FieldTypes.BIG_INTEGER_FIELD
+        columns[5]['expression'] = 'price * quantity + 1'
+
+        res = self.client.put(
+            reverse_lazy('table_builder:table-detail', args=[table.pk]),
+            {'name': 'test_table_1', 'columns': columns},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        row = DynamicTable.objects.get(pk=table.pk).get_dynamic_model().objects.get()
+        self.assertEqual(row.total, decimal.Decimal('7'))
+        self.assertEqual(row.full_name, 'ADA Lovelace 100%')
+
+    def test_expression_validation(self):
+        """Test invalid expressions are rejected"""
+        for column in (
+            {'name': 'test_column', 'expression': 'unknown || first_name'},
+            {'name': 'test_column', 'expression': 'first_name * 2'},
+            {'name': 'test_column', 'expression': 'now()'},
+            {'name': 'test_column', 'expression': "first_name || 'x"},
+            {'name': 'test_column', 'expression': 'full_name || first_name'},
+            {'name': 'test_column', 'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD, 'expression': 'first_name'},
+            {'name': 'test_column', 'field_type': DynamicColumn.FieldTypes.BOOLEAN_FIELD, 'expression': 'quantity'},
+            {'name': 'test_column', 'expression': 'first_name', 'searchable': True},
+            {'name': 'test_column', 'expression': '\u0661 + 1'},
+            {'name': 'test_column', 'expression': '(' * 200 + 'quantity' + ')' * 200},
+            {'name': 'test_column', 'expression': '-' * 1000 + 'quantity'},
+            {'name': 'test_column', 'expression': 'abs(' * 200 + 'quantity' + ')' * 200},
+        ):
+            res = self.client.post(
+                reverse_lazy('table_builder:table-list'),
+                {'name': 'test_table_2', 'columns': [*self.columns, column]},
+                format='json',
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, column)
+
+
+class SavedQueryApiTests(TestCase):
+    """Test saved queries backed by materialized views"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.table = DynamicTable.objects.create(name='test_table_1')
+        DynamicColumn.objects.create(name='category', table=self.table)
+        DynamicColumn.objects.create(
+            name='amount', table=self.table, field_type=DynamicColumn.FieldTypes.INTEGER_FIELD
+        )
+        DynamicColumn.objects.create(
+            name='flag', table=self.table, field_type=DynamicColumn.FieldTypes.BOOLEAN_FIELD
+        )
+        self.table.create_dynamic_model()
+        dynamic_model = self.table.get_dynamic_model()
+        for category, amount in (('a', 1), ('a', 2), ('b', 5), ('c', 10)):
+            dynamic_model.objects.create(category=category, amount=amount, flag=amount > 1)
+        self.payload = {
+            'name': 'test_query_1',
+            'table': self.table.pk,
+            'filter': {'amount__lt': 10},
+            'group_by': ['category'],
+            'aggregates': {'total': {'function': 'sum', 'column': 'amount'}, 'rows': {'function': 'count'}},
+            'refresh_policy': SavedQuery.RefreshPolicy.ON_WRITE,
+        }
+
+    def _create_saved_query(self, **kwargs):
+        res = self.client.post(reverse_lazy('table_builder:saved-query-list'), {**self.payload, **kwargs}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED, res.data)
+        return SavedQuery.objects.get(pk=res.data['pk'])
+
+    def test_aggregate_rows(self):
+        """Test aggregated rows are read from the view"""
+        saved_query = self._create_saved_query()
+        url = reverse_lazy('table_builder:saved-query-rows', args=[saved_query.pk])
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [{'category': 'a', 'total': 3, 'rows': 2}, {'category': 'b', 'total': 5, 'rows': 1}])
+        self.assertIn('X-Refreshed-At', res)
+        res = self.client.get(url, {'filter': json.dumps({'category': 'b'})})
+        self.assertEqual(res.data, [{'category': 'b', 'total': 5, 'rows': 1}])
+
+    def test_aggregate_all_rows(self):
+        """Test aggregates without group by are computed over all rows into a single one"""
+        saved_query = self._create_saved_query(group_by=[])
+
+        res = self.client.get(reverse_lazy('table_builder:saved-query-rows', args=[saved_query.pk]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [{'total': 8, 'rows': 3}])
+
+    def test_aggregate_types(self):
+        """Test aggregates of the view are typed like fields of its model"""
+        saved_query = self._create_saved_query(aggregates={'average': {'function': 'avg', 'column': 'amount'}})
+        url = reverse_lazy('table_builder:saved-query-rows', args=[saved_query.pk])
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [{'category': 'a', 'average': 1.5}, {'category': 'b', 'average': 5.0}])
+        self.assertIsInstance(res.data[0]['average'], float)
+        if pyarrow is not None:
+            res = self.client.get(url, {'format': 'arrow'})
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            table = pyarrow.ipc.open_stream(res.content).read_all()
+            self.assertEqual(table.column('average').to_pylist(), [1.5, 5.0])
+
+    def test_filter_rows(self):
+        """Test not aggregated rows are paginated by id"""
+        saved_query = self._create_saved_query(group_by=[], aggregates={}, fields=['amount'])
+
+        res = self.client.get(reverse_lazy('table_builder:saved-query-rows', args=[saved_query.pk]), {
+            'limit': 2, 'offset': 1,
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['amount'] for row in res.data], [2, 5])
+        self.assertEqual(set(res.data[0]), {'id', 'amount'})
+
+    def test_refresh_on_write(self):
+        """Test views of on write saved queries are refreshed after written rows are committed"""
+        saved_query = self._create_saved_query()
+        url = reverse_lazy('table_builder:saved-query-rows', args=[saved_query.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                reverse_lazy('table_builder:table-row', args=[self.table.pk]),
+                {'category': 'b', 'amount': 1, 'flag': False},
+                format='json',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.get(url).data[1], {'category': 'b', 'total': 6, 'rows': 2})
+        res = self.client.get(reverse_lazy('table_builder:saved-query-detail', args=[saved_query.pk]))
+        self.assertFalse(res.data['stale'])
+
+    def test_refresh_manual(self):
+        """Test manual saved queries are stale until refreshed"""
+        saved_query = self._create_saved_query(refresh_policy=SavedQuery.RefreshPolicy.MANUAL)
+        detail_url = reverse_lazy('table_builder:saved-query-detail', args=[saved_query.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse_lazy('table_builder:table-row', args=[self.table.pk]),
+                {'category': 'b', 'amount': 1, 'flag': False},
+                format='json',
+            )
+
+        self.assertTrue(self.client.get(detail_url).data['stale'])
+        res = self.client.post(reverse_lazy('table_builder:saved-query-refresh', args=[saved_query.pk]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.data['stale'])
+        rows = self.client.get(reverse_lazy('table_builder:saved-query-rows', args=[saved_query.pk])).data
+        self.assertEqual(rows[1]['total'], 6)
+
+    def test_refresh_command(self):
+        """Test the command refreshes due saved queries only"""
+        scheduled = self._create_saved_query(
+            name='test_query_2', refresh_policy=SavedQuery.RefreshPolicy.SCHEDULED, refresh_interval=60
+        )
+        manual = self._create_saved_query(name='test_query_3', refresh_policy=SavedQuery.RefreshPolicy.MANUAL)
+        SavedQuery.objects.filter(pk=scheduled.pk).update(refreshed_at=scheduled.refreshed_at - timedelta(hours=1))
+        out = io.StringIO()
+
+        call_command('refresh_saved_queries', stdout=out)
+
+        self.assertEqual(out.getvalue(), 'test_query_2: refreshed\n')
+        self.assertEqual(SavedQuery.objects.get(pk=manual.pk).refreshed_at, manual.refreshed_at)
+
+    def test_update_table(self):
+        """Test views are re-created over changed columns, used columns cannot be removed"""
+        saved_query = self._create_saved_query()
+        url = reverse_lazy('table_builder:table-detail', args=[self.table.pk])
+        columns = self.client.get(url).data['columns']
+        columns[1]['field_type'] = DynamicColumn.FieldTypes.BIG_INTEGER_FIELD
+
+        res = self.client.put(url, {'name': 'test_table_1', 'columns': columns}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(reverse_lazy('table_builder:saved-query-rows', args=[saved_query.pk]))
+        self.assertEqual(res.data[0]['total'], 3)
+        res = self.client.put(url, {'name': 'test_table_1', 'columns': columns[:1]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_delete_table(self):
+        """Test views are dropped with the table"""
+        self._create_saved_query()
+
+        res = self.client.delete(reverse_lazy('table_builder:table-detail', args=[self.table.pk]))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SavedQuery.objects.exists())
+
+    def test_query_validation(self):
+        """Test invalid queries are rejected and the query cannot be changed"""
+        for payload in (
+            {'group_by': ['unknown']},
+            {'aggregates': {'total': {'function': 'median', 'column': 'amount'}}},
+            {'aggregates': {'total': {'function': 'sum', 'column': 'category'}}},
+            {'aggregates': {'category': {'function': 'count'}}},
+            {'aggregates': {'latest': {'function': 'max', 'column': 'flag'}}},
+            {'filter': {'unknown': 1}},
+            {'name': 'test_table_1'},
+            {'refresh_policy': SavedQuery.RefreshPolicy.SCHEDULED},
+        ):
+            res = self.client.post(
+                reverse_lazy('table_builder:saved-query-list'), {**self.payload, **payload}, format='json'
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, payload)
+        saved_query = self._create_saved_query()
+        url = reverse_lazy('table_builder:saved-query-detail', args=[saved_query.pk])
+        res = self.client.patch(url, {'filter': {}}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.patch(url, {'refresh_policy': SavedQuery.RefreshPolicy.MANUAL}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        # Tables can't take names of saved queries, their views would collide
+        res = self.client.post(
+            reverse_lazy('table_builder:table-list'), {'name': 'test_query_1', 'columns': []}, format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.post(
+            reverse_lazy('table_builder:table-bulk'), {'tables': [{'name': 'test_query_1', 'columns': []}]}, format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(DynamicTable.objects.filter(name='test_query_1').exists())
+
+
+class DynamicTableBulkCreateTests(TestCase):
+    """Test creating many DynamicTables at once"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse_lazy('table_builder:table-bulk')
+        self.tables = [
+            {
+                'name': f'test_table_{number}',
+                'columns': [
+                    {'name': 'test_column_char', 'field_type': DynamicColumn.FieldTypes.CHAR_FIELD, 'unique': True},
+                    {'name': 'test_column_int', 'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD},
+                ],
+            }
+            for number in range(3)
+        ]
+        self.tables.append({
+            'name': 'test_table_partitioned',
+            'partitioning': DynamicTable.Partitioning.HASH,
+            'partition_key': 'test_column_int',
+            'partition_size': 2,
+            'columns': [{'name': 'test_column_int', 'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD}],
+        })
+
+    def test_bulk_create(self):
+        """Test tables are created with a constant number of metadata queries"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(self.url, {'tables': self.tables}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([table['name'] for table in res.data['tables']], [table['name'] for table in self.tables])
+        inserts = [query for query in queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        for table in DynamicTable.objects.all():
+            dynamic_model = table.get_dynamic_model()
+            dynamic_model.objects.create(test_column_int=1)
+            self.assertEqual(dynamic_model.objects.count(), 1)
+        self.assertEqual(len(DynamicTable.objects.get(name='test_table_partitioned').get_partitions()), 2)
+
+    def test_bulk_create_all_or_nothing(self):
+        """Test nothing is created when any definition is invalid"""
+        invalid_tables = [
+            [*self.tables, {'name': 'test_table_0', 'columns': []}],
+            [*self.tables, {'name': 'Invalid', 'columns': []}],
+            [*self.tables, {'name': 'test_table_duplicated', 'columns': [{'name': 'test_column'}, {'name': 'test_column'}]}],
+        ]
+        DynamicTable.objects.create(name='test_table_existing').create_dynamic_model()
+        invalid_tables.append([*self.tables, {'name': 'test_table_existing', 'columns': []}])
+
+        for tables in invalid_tables:
+            res = self.client.post(self.url, {'tables': tables}, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(DynamicTable.existing_tables([table['name'] for table in self.tables]), set())
+        self.assertEqual(DynamicTable.objects.count(), 1)
+
+    def test_create_tables_command(self):
+        """Test the command creates tables from a JSON file"""
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as file:
+            json.dump(self.tables, file)
+            file.flush()
+            out = io.StringIO()
+
+            call_command('create_tables', file.name, stdout=out)
+
+        self.assertEqual(out.getvalue(), 'Created 4 tables\n')
+        self.assertEqual(len(DynamicTable.existing_tables([table['name'] for table in self.tables])), 4)
+
+
+class DynamicTableSchemaTests(TestCase):
+    """Test DynamicTables in Postgres schemas"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            'name': 'test_table_1',
+            'schema': 'test_schema',
+            'columns': [
+                {'name': 'test_column_char', 'field_type': DynamicColumn.FieldTypes.CHAR_FIELD, 'unique': True},
+                {'name': 'test_column_int', 'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD},
+            ],
+        }
+
+    @staticmethod
+    def _get_schema(name):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT relnamespace::regnamespace::text FROM pg_class WHERE relname = %s", [name])
+            return [schema for schema, in cursor.fetchall()]
+
+    def test_create_table_in_schema(self):
+        """Test the table is created, written and altered in its schema"""
+        res = self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED, res.data)
+        self.assertEqual(res.data['schema'], 'test_schema')
+        self.assertEqual(self._get_schema('test_table_1'), ['test_schema'])
+        table = DynamicTable.objects.get(pk=res.data['pk'])
+        res = self.client.post(
+            reverse_lazy('table_builder:table-row', args=[table.pk]),
+            {'test_column_char': 'a', 'test_column_int': 1},
+            format='json',
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        # Unique constraint and its pattern index are looked up in the schema of the table
+        self.payload['columns'][0].update(pk=table.columns.get(name='test_column_char').pk, unique=False)
+        self.payload['columns'][1]['pk'] = table.columns.get(name='test_column_int').pk
+        res = self.client.put(
+            reverse_lazy('table_builder:table-detail', kwargs={'pk': table.pk}), self.payload, format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_indexes WHERE schemaname = 'test_schema'")
+            self.assertEqual(cursor.fetchone()[0], 1)
+        res = self.client.get(reverse_lazy('table_builder:table-rows', args=[table.pk]))
+        self.assertEqual([row['test_column_char'] for row in res.data], ['a'])
+
+    def test_schema_validation(self):
+        """Test system schemas can't be used and schema of a table can't be changed by the API"""
+        res = self.client.post(
+            reverse_lazy('table_builder:table-list'), {**self.payload, 'schema': 'pg_catalog'}, format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('schema', res.data)
+        res = self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+
+        res = self.client.put(
+            reverse_lazy('table_builder:table-detail', kwargs={'pk': res.data['pk']}),
+            {**self.payload, 'schema': 'test_schema_2'},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('schema', res.data)
+
+    @override_settings(TABLE_BUILDER_SCHEMA_SHARDS=4)
+    def test_shard_schema(self):
+        """Test tables without schema are spread across shard schemas"""
+        del self.payload['schema']
+        res = self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED, res.data)
+        self.assertEqual(res.data['schema'], DynamicTable.get_shard_schema('test_table_1'))
+        self.assertRegex(res.data['schema'], r'^tables_[0-3]$')
+        self.assertEqual(self._get_schema('test_table_1'), [res.data['schema']])
+
+    def test_move_tables_command(self):
+        """Test tables are moved with their partitions and views"""
+        self.client.post(reverse_lazy('table_builder:table-list'), self.payload, format='json')
+        self.client.post(reverse_lazy('table_builder:table-list'), {
+            'name': 'test_table_partitioned',
+            'partitioning': DynamicTable.Partitioning.HASH,
+            'partition_key': 'test_column_int',
+            'partition_size': 2,
+            'columns': [{'name': 'test_column_int', 'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD}],
+        }, format='json')
+        table = DynamicTable.objects.get(name='test_table_1')
+        table.get_dynamic_model().objects.create(test_column_char='a', test_column_int=1)
+        res = self.client.post(reverse_lazy('table_builder:saved-query-list'), {
+            'name': 'test_query_1', 'table': table.pk, 'fields': ['test_column_int'],
+        }, format='json')
+        saved_query = SavedQuery.objects.get(pk=res.data['pk'])
+        out = io.StringIO()
+
+        call_command('move_tables', '--schema', 'test_archive', stdout=out)
+
+        self.assertEqual(out.getvalue(), (
+            'test_table_1: moved to test_archive\ntest_table_partitioned: moved to test_archive\n'
+        ))
+        for name in ('test_table_1', 'test_table_partitioned', 'test_table_partitioned_h0', 'test_query_1'):
+            self.assertEqual(self._get_schema(name), ['test_archive'])
+        table.refresh_from_db()
+        self.assertEqual(table.get_dynamic_model().objects.get().test_column_char, 'a')
+        saved_query.refresh_from_db()
+        saved_query.refresh_view()
+        res = self.client.get(reverse_lazy('table_builder:saved-query-rows', args=[saved_query.pk]))
+        self.assertEqual([row['test_column_int'] for row in res.data], [1])
+
+        call_command('move_tables', '--schema', '', '--table', 'test_table_partitioned', stdout=out)
+
+        self.assertEqual(self._get_schema('test_table_partitioned_h1'), ['public'])
+        self.assertEqual(DynamicTable.objects.get(name='test_table_partitioned').schema, '')
+
+
+class RowsValidatorTests(TestCase):
+    """Test compiled validator of DynamicTable rows"""
+
+    def setUp(self):
+        self.table = DynamicTable.objects.create(name='test_table_1')
+        DynamicColumn.objects.create(name='test_column_char', table=self.table, max_length=5, unique=True)
+        for name, field_type in (
+            ('test_column_int', DynamicColumn.FieldTypes.INTEGER_FIELD),
+            ('test_column_small', DynamicColumn.FieldTypes.SMALL_INTEGER_FIELD),
+            ('test_column_bool', DynamicColumn.FieldTypes.BOOLEAN_FIELD),
+            ('test_column_date', DynamicColumn.FieldTypes.DATE_FIELD),
+        ):
+            DynamicColumn.objects.create(name=name, table=self.table, field_type=field_type)
+        self.table.create_dynamic_model()
+
+    def test_validate_like_serializer(self):
+        """Test validated rows and errors are equal to the dynamic serializer ones"""
+        dynamic_model = self.table.get_dynamic_model()
+        row = {
+            'test_column_char': ' ab ', 'test_column_int': '12', 'test_column_small': 3,
+            'test_column_bool': 'true', 'test_column_date': '2024-01-31', 'id': 1, 'unknown': 1,
+        }
+        invalid_values = [
+            {'test_column_char': 'too long'}, {'test_column_char': '  '}, {'test_column_char': 'a\x00'},
+            {'test_column_char': None}, {'test_column_char': 12}, {'test_column_int': True},
+            {'test_column_int': 1.0}, {'test_column_int': 1.5}, {'test_column_int': ' 1'},
+            {'test_column_int': 2 ** 31}, {'test_column_small': '-40000'}, {'test_column_bool': 2},
+            {'test_column_bool': 'no'}, {'test_column_bool': []}, {'test_column_date': '2024-02-30'},
+        ]
+        rows = [row, *({**row, **values} for values in invalid_values), {}, 'row']
+        serializer = serializer_factory(dynamic_model, validate_unique=False)(data=rows, many=True)
+        serializer.is_valid()
+
+        validated, errors = get_rows_validator(dynamic_model).validate(rows)
+
+        self.assertEqual(errors, serializer.errors)
+        row_serializer = serializer_factory(dynamic_model, validate_unique=False)()
+        for source, values, serializer_errors in zip(rows, validated, serializer.errors):
+            if not serializer_errors:
+                self.assertEqual(values, dict(row_serializer.run_validation(source)))
+        self.assertEqual(get_rows_validator(dynamic_model).validate([row]), ([validated[0]], None))
+        self.assertEqual(validated[0]['test_column_char'], 'ab')
+
+    def test_validator_cached_with_model(self):
+        """Test validator is compiled once per dynamic model"""
+        validator = get_rows_validator(self.table.get_dynamic_model())
+        self.assertIs(get_rows_validator(self.table.get_dynamic_model()), validator)
+        DynamicColumn.objects.create(name='test_column_new', table=self.table)
+        self.table.save()
+
+        self.assertIsNot(get_rows_validator(self.table.get_dynamic_model()), validator)
+
+
+@override_settings(TABLE_BUILDER_SLOW_QUERY_THRESHOLD=0, TABLE_BUILDER_SLOW_QUERY_SAMPLE_RATE=1)
+class SlowQueryCaptureTests(TestCase):
+    """Test capture of slow DynamicTable query plans"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test',
+            'test',
+            is_staff=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.table = DynamicTable.objects.create(name='test_table_1')
+        self.column = DynamicColumn.objects.create(name='test_column_char', table=self.table)
+        self.table.create_dynamic_model()
+        self.table.get_dynamic_model().objects.create(test_column_char='a')
+
+    def test_capture_rows_plan(self):
+        """Test rows queries are explained with ANALYZE and BUFFERS"""
+        res = self.client.get(reverse_lazy('table_builder:table-rows', args=[self.table.pk]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        query_plan = QueryPlan.objects.get(operation=QueryPlan.Operation.ROWS)
+        self.assertEqual(query_plan.table, self.table)
+        self.assertEqual(query_plan.columns, ['test_column_char'])
+        self.assertIn('"test_table_1"', query_plan.sql)
+        self.assertEqual(query_plan.plan[0]['Plan']['Actual Rows'], 1)
+        self.assertIn('Shared Hit Blocks', query_plan.plan[0]['Plan'])
+
+    def test_capture_update_statements(self):
+        """Test DDL of table updates is captured without plans"""
+        res = self.client.put(reverse_lazy('table_builder:table-detail', kwargs={'pk': self.table.pk}), {
+            'name': 'test_table_1',
+            'columns': [
+                {'pk': self.column.pk, 'name': 'test_column_char', 'field_type': DynamicColumn.FieldTypes.CHAR_FIELD},
+                {'name': 'test_column_int', 'field_type': DynamicColumn.FieldTypes.INTEGER_FIELD, 'expression': '1'},
+            ],
+        }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        query_plan = QueryPlan.objects.get(operation=QueryPlan.Operation.UPDATE, sql__startswith='ALTER TABLE')
+        self.assertIsNone(query_plan.plan)
+        self.assertEqual(query_plan.columns, ['test_column_char', 'test_column_int'])
+
+    @override_settings(TABLE_BUILDER_SLOW_QUERY_PLANS=2)
+    def test_plans_are_bounded(self):
+        """Test only the newest plans are kept"""
+        for _ in range(3):
+            self.client.get(reverse_lazy('table_builder:table-rows', args=[self.table.pk]))
+
+        self.assertEqual(QueryPlan.objects.count(), 2)
+
+    @override_settings(TABLE_BUILDER_SLOW_QUERY_THRESHOLD=None)
+    def test_capture_disabled(self):
+        """Test plans are not captured by default"""
+        self.client.get(reverse_lazy('table_builder:table-rows', args=[self.table.pk]))
+
+        self.assertFalse(QueryPlan.objects.exists())
+
+    def test_query_plans_api(self):
+        """Test plans are listed slowest first to admins only"""
+        for duration in (0.5, 2.0, 1.0):
+            QueryPlan.objects.create(
+                table=self.table, operation=QueryPlan.Operation.ROWS, sql='SELECT 1', duration=duration
+            )
+        url = reverse_lazy('table_builder:query-plan-list')
+
+        res = self.client.get(url, {'table': self.table.pk, 'limit': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([plan['duration'] for plan in res.data], [2.0, 1.0])
+        res = self.client.get(url, {'operation': QueryPlan.Operation.UPDATE})
+        self.assertEqual(res.data, [])
+        self.user.is_staff = False
+        self.user.save()
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,98 @@
+from django.db import models
+
+from table_builder import fields
+
+
+COMPARISON_LOOKUPS = {'exact', 'gt', 'gte', 'lt', 'lte', 'in', 'range', 'isnull'}
+TEXT_LOOKUPS = {
+    'exact', 'iexact', 'contains', 'icontains', 'startswith', 'istartswith', 'endswith', 'iendswith', 'in', 'isnull',
+}
+# Types of values in generated column expressions, see `table_builder.expressions`
+NUMERIC = 'numeric'
+TEXT = 'text'
+
+
+class ColumnType:
+    """
+    Type of dynamic table columns.
+    :param field_class: - model field class of the column.
+    :param copy_type: - postgres type name used to encode values for binary COPY.
+    :param lookups: - lookups allowed in row filter expressions.
+    :param options: - default options of the model field, overridden by options of the column.
+    :param to_representation: - conversion of not null database values to JSON values, None keeps values as is.
+    :param expression_type: - type of column values in generated column expressions, None when they can't be used.
+    :param generated_field_class: - model field class of generated columns, None when they are not supported.
+    """
+
+    def __init__(self, field_class, copy_type, lookups, options=None, to_representation=None, expression_type=None,
+                 generated_field_class=None):
+        self.field_class = field_class
+        self.copy_type = copy_type
+        self.lookups = lookups
+        self.options = options or {}
+        self.to_representation = to_representation
+        self.expression_type = expression_type
+        self.generated_field_class = generated_field_class
+
+    def get_field(self, expression=None, **options):
+        """
+        Get model field of the column, stored generated column when the compiled SQL `expression` is given.
+        """
+        if expression is not None:
+            return self.generated_field_class(expression=expression, **{**self.options, **options})
+        return self.field_class(**{**self.options, **options})
+
+
+# Column types by `DynamicColumn.field_type`
+COLUMN_TYPES = {}
+# Column types by internal type of model field, including primary key and system fields
+_column_types_by_internal_type = {}
+
+
+def register_column_type(field_type, column_type):
+    """
+    Register column type, `field_type` is None for types of primary key and system fields only.
+    """
+    if field_type is not None:
+        COLUMN_TYPES[field_type] = column_type
+    _column_types_by_internal_type.setdefault(column_type.get_field().get_internal_type(), column_type)
+
+
+def get_column_type(field):
+    """
+    Get column type of dynamic model field.
+    """
+    return _column_types_by_internal_type[field.get_internal_type()]
+
+
+register_column_type('Char', ColumnType(
+    models.CharField, 'varchar', TEXT_LOOKUPS, options={'max_length': 255}, expression_type=TEXT,
+    generated_field_class=fields.GeneratedCharField,
+))
+register_column_type('SmallInteger', ColumnType(
+    models.SmallIntegerField, 'int2', COMPARISON_LOOKUPS, expression_type=NUMERIC,
+    generated_field_class=fields.GeneratedSmallIntegerField,
+))
+register_column_type('Integer', ColumnType(
+    models.IntegerField, 'int4', COMPARISON_LOOKUPS, expression_type=NUMERIC,
+    generated_field_class=fields.GeneratedIntegerField,
+))
+register_column_type('BigInteger', ColumnType(
+    models.BigIntegerField, 'int8', COMPARISON_LOOKUPS, expression_type=NUMERIC,
+    generated_field_class=fields.GeneratedBigIntegerField,
+))
+register_column_type('Float', ColumnType(
+    models.FloatField, 'float8', COMPARISON_LOOKUPS, expression_type=NUMERIC,
+    generated_field_class=fields.GeneratedFloatField,
+))
+# Decimals are represented as strings like DRF does, so precision is not lost
+register_column_type('Decimal', ColumnType(
+    models.DecimalField, 'numeric', COMPARISON_LOOKUPS, options={'max_digits': 19, 'decimal_places': 4},
+    to_representation=str, expression_type=NUMERIC, generated_field_class=fields.GeneratedDecimalField,
+))
+register_column_type('Boolean', ColumnType(models.BooleanField, 'bool', {'exact', 'isnull'}))
+register_column_type('Date', ColumnType(models.DateField, 'date', COMPARISON_LOOKUPS))
+register_column_type('DateTime', ColumnType(models.DateTimeField, 'timestamptz', COMPARISON_LOOKUPS))
+register_column_type('UUID', ColumnType(models.UUIDField, 'uuid', {'exact', 'in', 'isnull'}, to_representation=str))
+register_column_type(None, ColumnType(models.AutoField, 'int4', COMPARISON_LOOKUPS, options={'primary_key': True}))
+register_column_type(None, ColumnType(models.BigAutoField, 'int8', COMPARISON_LOOKUPS, options={'primary_key': True}))
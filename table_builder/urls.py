@@ -6,8 +6,12 @@ from table_builder import views
 
 router = routers.DefaultRouter()
 router.register(r'table', views.DynamicTableViewSet, basename='table')
+router.register(r'saved-query', views.SavedQueryViewSet, basename='saved-query')
+router.register(r'query-plan', views.QueryPlanViewSet, basename='query-plan')
 
 app_name = 'table_builder'
 urlpatterns = [
     path('', include(router.urls)),
+    path('table/<int:pk>/events/', views.row_events_view, name='table-events'),
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
 ]
@@ -24,13 +24,26 @@ def validate_table_name(value):
             )
 
 
+def validate_schema_name(value):
+    """
+    Custom validator to ensure that the field value is a valid schema name, system schemas can't be used.
+    """
+    if not re.match(r'^[a-z][a-z0-9_]*$', value):
+        raise ValidationError(
+            'Schema name can only contain letters, numbers, and underscores, and must start with a letter.'
+        )
+    if value.startswith('pg_') or value == 'information_schema':
+        raise ValidationError('Schema name cannot be a system schema.')
+
+
 def validate_column_name(value):
     """
     Custom validator to ensure that the field value is a valid column name.
     """
     # Define the regex pattern for valid column names
     pattern = r'^[a-z][a-z0-9_]*$'
-    restricted_names = ['id']
+    # Names of the primary key and system columns
+    restricted_names = ['id', 'row_version', 'modified_at', 'deleted', 'created_at', 'search_vector']
 
     # Check if the value matches the regex pattern
     if not re.match(pattern, value):
@@ -1,29 +1,98 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import Q
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
 from drf_spectacular.utils import extend_schema
 
-from rest_framework import status, viewsets
+from rest_framework import exceptions, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed, NotFound
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
-from table_builder.models import DynamicTable
-from table_builder.serializers import DummySerializer, DynamicTableSerializer, serializer_factory
+from table_builder import metrics
+from table_builder.conf import get_setting
+from table_builder.filters import build_filter, search
+from table_builder.models import DynamicTable, QueryPlan, SavedQuery
+from table_builder.notifications import event_stream
+from table_builder.queries import copy_insert, sample_rows, update_row_returning, upsert_rows, values_many
+from table_builder.renderers import ArrowStreamRenderer, ColumnarRenderer, PrometheusTextRenderer, pyarrow
+from table_builder.serializers import (
+    BatchRowsSerializer,
+    BulkLoadFinishSerializer,
+    ChangesCursorField,
+    ChangesQuerySerializer,
+    DummySerializer,
+    DynamicTableBulkSerializer,
+    DynamicTableSerializer,
+    QueryPlanQuerySerializer,
+    QueryPlanSerializer,
+    RowVersionSerializer,
+    RowsDeleteSerializer,
+    RowsInsertSerializer,
+    RowsQuerySerializer,
+    RowsSampleQuerySerializer,
+    RowsUpdateSerializer,
+    RowsUpsertSerializer,
+    SavedQueryRowsQuerySerializer,
+    SavedQuerySerializer,
+    TableCloneSerializer,
+    get_rows_validator,
+    rows_columnar_representation,
+    rows_representation,
+    serializer_factory,
+)
+from table_builder.signals import rows_changed
+from table_builder.slow_queries import capture_slow_queries
+
+ROWS_RENDERER_CLASSES = [
+    *api_settings.DEFAULT_RENDERER_CLASSES,
+    ColumnarRenderer,
+    *([ArrowStreamRenderer] if pyarrow is not None else []),
+]
 
 
 class DynamicTableViewSet(viewsets.ModelViewSet):
     queryset = DynamicTable.objects.all()
     serializer_class = DynamicTableSerializer
-    http_method_names = ["get", "post", "put", "delete", "head", "options", "trace"]
+    http_method_names = ["get", "post", "put", "patch", "delete", "head", "options", "trace"]
+
+    def partial_update(self, request, *args, **kwargs):
+        # PATCH is allowed for rows only, tables are updated with PUT
+        raise MethodNotAllowed(request.method)
 
     def perform_create(self, serializer):
-        obj = serializer.save()
-        obj.create_dynamic_model()
+        # Metadata is rolled back when the table can't be created
+        try:
+            with transaction.atomic():
+                obj = serializer.save()
+                obj.create_dynamic_model()
+        except ValidationError as exc:
+            raise exceptions.ValidationError({'name': exc.messages})
 
     def perform_update(self, serializer):
-        previous_state = dict(
-            # TODO: This is not the best way to do this, but hard resetting the model is not an option for now
-            DynamicTable.objects.get(pk=self.get_object().pk).columns.values_list('name', 'field_type')
-        )
-        obj = serializer.save()
-        obj.update_dynamic_model(previous_state)
+        # TODO: This is not the best way to do this, but hard resetting the model is not an option for now
+        previous = DynamicTable.objects.get(pk=self.get_object().pk)
+        previous_state = previous.get_columns_state()
+        previous_search_columns = previous.get_search_columns()
+        previous_trigram_columns = previous.get_trigram_columns()
+        try:
+            with transaction.atomic():
+                obj = serializer.save()
+                with capture_slow_queries(obj, QueryPlan.Operation.UPDATE):
+                    obj.update_dynamic_model(previous_state, previous_search_columns, previous_trigram_columns)
+                # The table is switched with the saved flag, so they can't disagree if either fails
+                if obj.unlogged != previous.unlogged:
+                    obj.set_logged(not obj.unlogged)
+        except DataError as exc:
+            # E.g. values of generated columns computed for existing rows overflow the column type
+            raise exceptions.ValidationError({'columns': [_get_error_message(exc)]})
 
     def perform_destroy(self, instance):
         instance.delete_dynamic_model()
@@ -36,25 +105,635 @@ class DynamicTableViewSet(viewsets.ModelViewSet):
         Uses DummySerializer as a placeholder for the dynamic serializer
         Serializer is created dynamically based on the table's columns
         """
-        dynamic_model = self.get_object().get_dynamic_model()
+        table = self.get_object()
+        dynamic_model = table.get_dynamic_model()
         serializer = serializer_factory(dynamic_model)(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            # Unique value was inserted by a concurrent request after the validation
+            return Response(
+                {'non_field_errors': ['Row with these values already exists.']}, status=status.HTTP_400_BAD_REQUEST
+            )
+        except DataError as exc:
+            return Response({'non_field_errors': [_get_error_message(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        metrics.ROWS_INSERTED.inc(table=table.name)
+        rows_changed.send(sender=DynamicTable, table=table, operation='insert')
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    @extend_schema(request=RowsUpsertSerializer)
+    @action(detail=True, methods=['post'], serializer_class=RowsUpsertSerializer, url_name='upsert')
+    def upsert(self, request, pk=None):
+        """
+        Insert rows or update them on conflict of the unique column
+        Rows are written with one `INSERT ... ON CONFLICT DO UPDATE` statement per batch, in a single transaction
+        """
+        serializer = RowsUpsertSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        table = self.get_object()
+        dynamic_model = table.get_dynamic_model()
+        fields = [
+            field for field in dynamic_model._meta.concrete_fields
+            if not field.primary_key and not getattr(field, 'generated', False)
+        ]
+        unique_fields = [field.name for field in fields if field.unique]
+        unique_field = serializer.validated_data.get('unique_field')
+        if unique_field is None and len(unique_fields) == 1:
+            unique_field = unique_fields[0]
+        if unique_field not in unique_fields:
+            return Response(
+                {'unique_field': [f'Choose one of unique columns: {", ".join(unique_fields) or "none declared"}.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        rows, errors = get_rows_validator(dynamic_model).validate(serializer.validated_data['rows'])
+        if errors:
+            return Response({'rows': errors}, status=status.HTTP_400_BAD_REQUEST)
+        # The same row can't be affected twice by one statement, the last occurrence of a key wins
+        rows = {row[unique_field]: row for row in rows}
+        # Versions of updated rows are incremented instead of being reset to the default of inserted rows
+        update_fields = [
+            field.name for field in fields if field.name not in (unique_field, DynamicTable.ROW_VERSION_COLUMN)
+        ]
+        increments = [DynamicTable.ROW_VERSION_COLUMN] if table.versioned else []
+        try:
+            with transaction.atomic():
+                upsert_rows(
+                    dynamic_model, [dynamic_model(**row) for row in rows.values()], unique_field, update_fields,
+                    increments=increments, batch_size=serializer.validated_data['batch_size'],
+                )
+        except DataError as exc:
+            return Response({'rows': [_get_error_message(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        metrics.ROWS_INSERTED.inc(len(rows), table=table.name)
+        rows_changed.send(sender=DynamicTable, table=table, operation='upsert')
+        return Response({'upserted': len(rows)})
+
+    @extend_schema(request=TableCloneSerializer, responses={201: DynamicTableSerializer})
+    @action(detail=True, methods=['post'], serializer_class=TableCloneSerializer, url_name='clone')
+    def clone(self, request, pk=None):
+        """
+        Create a copy of the table with its rows, optionally filtered and limited to a subset of columns
+        Rows are copied inside the database with `INSERT ... SELECT`, the copy has the same table options
+        """
+        serializer = TableCloneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        table = self.get_object()
+        dynamic_model = table.get_dynamic_model()
+        columns = {column.name: column for column in table.columns.all()}
+        names = serializer.validated_data.get('columns', list(columns))
+        unknown = [name for name in names if name not in columns]
+        if unknown:
+            return Response(
+                {'columns': [f'Column {name} does not exist.' for name in unknown]}, status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = dynamic_model.objects.filter(build_filter(dynamic_model, serializer.validated_data['filter']))
+        table_serializer = DynamicTableSerializer(data={
+            'name': serializer.validated_data['name'],
+            'versioned': table.versioned,
+            'track_changes': table.track_changes,
+            'partitioning': table.partitioning,
+            'partition_key': table.partition_key,
+            'partition_size': table.partition_size,
+            'unlogged': table.unlogged,
+            'columns': [
+                {
+                    'name': name,
+                    'field_type': columns[name].field_type,
+                    'max_length': columns[name].max_length,
+                    'max_digits': columns[name].max_digits,
+                    'decimal_places': columns[name].decimal_places,
+                    'expression': columns[name].expression,
+                    'unique': columns[name].unique,
+                    'searchable': columns[name].searchable,
+                    'trigram_index': columns[name].trigram_index,
+                }
+                for name in names
+            ],
+        })
+        table_serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            clone = table_serializer.save()
+            clone.create_dynamic_model()
+            clone.copy_rows(queryset)
+        return Response(DynamicTableSerializer(clone).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'], serializer_class=DummySerializer, url_path='bulk-load', url_name='bulk-load')
+    def bulk_load(self, request, pk=None):
+        """
+        Start bulk load of the table
+        Secondary indexes are dropped until the bulk load is finished, so they are built once instead of per row
+        """
+        table = self.get_object()
+        if table.partitioning:
+            return Response(
+                {'detail': 'Bulk load is not supported by partitioned tables.'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            table.start_bulk_load()
+        except ValidationError as exc:
+            return Response({'detail': exc.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(DynamicTableSerializer(table).data)
+
+    @extend_schema(parameters=[BulkLoadFinishSerializer])
+    @bulk_load.mapping.delete
+    def finish_bulk_load(self, request, pk=None):
+        """
+        Finish bulk load of the table
+        Dropped indexes are recreated, table statistics are updated with ANALYZE
+        Pass `logged=true` to switch unlogged table to LOGGED
+        """
+        query_serializer = BulkLoadFinishSerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        table = self.get_object()
+        try:
+            table.finish_bulk_load(logged=query_serializer.validated_data['logged'])
+        except ValidationError as exc:
+            return Response({'detail': exc.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(DynamicTableSerializer(table).data)
+
     @extend_schema(
+        parameters=[RowsQuerySerializer],
         responses={
             200: DummySerializer(many=True),
-        }
+        },
+    )
+    @action(
+        detail=True, methods=['get'], serializer_class=DummySerializer, renderer_classes=ROWS_RENDERER_CLASSES,
+        url_name='rows',
     )
-    @action(detail=True, methods=['get'], serializer_class=DummySerializer, url_name='rows')
     def rows(self, request, pk=None):
         """
         Get all rows in the table
         Uses DummySerializer as a placeholder for the dynamic serializer
-        Serializer is created dynamically based on the table's columns
+        Rows are represented as plain dicts based on the table's columns
+        Use `?format=columnar` (or `?format=arrow` when pyarrow is installed) to get columnar representation
+        Use `?search=` to get rows matching full-text search over searchable columns, ordered by rank
+        """
+        query_serializer = RowsQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        table = self.get_object()
+        dynamic_model = table.get_dynamic_model()
+        queryset = dynamic_model.objects.all()
+        if 'search' in query_serializer.validated_data:
+            if not table.get_search_columns():
+                return Response({'search': ['Table has no searchable columns.']}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = search(queryset, query_serializer.validated_data['search'], DynamicTable.SEARCH_VECTOR_COLUMN)
+        with capture_slow_queries(table, QueryPlan.Operation.ROWS):
+            if request.accepted_renderer.format in (ColumnarRenderer.format, ArrowStreamRenderer.format):
+                data = rows_columnar_representation(queryset)
+                count = len(data['data'][data['columns'][0]])
+            else:
+                data = rows_representation(queryset)
+                count = len(data)
+        metrics.ROWS_REQUESTS.inc(table=table.name)
+        metrics.ROWS_SERVED.inc(count, table=table.name)
+        response = Response(data)
+        response.add_post_render_callback(lambda rendered: metrics.ROWS_RESPONSE_BYTES.observe(len(rendered.content)))
+        return response
+
+    @extend_schema(parameters=[RowsSampleQuerySerializer], responses={200: DummySerializer(many=True)})
+    @action(detail=True, methods=['get'], serializer_class=DummySerializer, url_name='sample')
+    def sample(self, request, pk=None):
+        """
+        Get random sample of rows with `TABLESAMPLE`
+        By default the sampled percent is estimated from the table size, so reading cost is proportional to `limit`
+        Pass `seed` to get the same sample while the table is not changed
+        """
+        query_serializer = RowsSampleQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+        table = self.get_object()
+        dynamic_model = table.get_dynamic_model()
+        percent = params.get('percent')
+        if percent is None:
+            percent = table.get_sample_percent(params['limit'])
+        # Deleted rows of tables with change tracking are kept in the table, but they are not sampled
+        conditions = {DynamicTable.DELETED_COLUMN: False} if table.track_changes else None
+        rows = sample_rows(
+            dynamic_model, percent, params['method'], params.get('seed'), params['limit'], conditions=conditions,
+        )
+        metrics.ROWS_REQUESTS.inc(table=table.name)
+        metrics.ROWS_SERVED.inc(len(rows), table=table.name)
+        return Response(rows_representation(dynamic_model.objects.all(), rows))
+
+    @extend_schema(request=DynamicTableBulkSerializer, responses={201: DynamicTableBulkSerializer})
+    @action(detail=False, methods=['post'], serializer_class=DynamicTableBulkSerializer, url_name='bulk')
+    def bulk(self, request):
+        """
+        Create many tables at once, all or nothing
+        All definitions are validated first, then metadata is inserted with bulk inserts
+        and tables are created in one transaction
+        """
+        serializer = DynamicTableBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(request=BatchRowsSerializer, responses={200: DummySerializer(many=True)})
+    @action(detail=False, methods=['post'], serializer_class=BatchRowsSerializer, url_path='batch-rows',
+            url_name='batch-rows')
+    def batch_rows(self, request):
+        """
+        Get rows of multiple tables in one request
+        Tables are loaded with one query, rows queries of all tables are sent to the database in one round trip
+        Results are returned in order of the requested tables
+        """
+        serializer = BatchRowsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queries = serializer.validated_data['tables']
+        tables = self.get_queryset().in_bulk({query['table'] for query in queries})
+        missing = sorted({query['table'] for query in queries} - set(tables))
+        if missing:
+            raise NotFound(f'Tables {", ".join(map(str, missing))} do not exist.')
+        dynamic_models = DynamicTable.get_dynamic_models(tables.values())
+        querysets = []
+        errors = {}
+        for index, query in enumerate(queries):
+            dynamic_model = dynamic_models[query['table']]
+            attnames = [field.attname for field in dynamic_model._meta.concrete_fields]
+            fields = query.get('fields', attnames)
+            unknown = [name for name in fields if name not in attnames]
+            if unknown:
+                errors[index] = {'fields': [f'Column {name} does not exist.' for name in unknown]}
+                continue
+            try:
+                queryset = dynamic_model.objects.filter(build_filter(dynamic_model, query['filter']))
+            except exceptions.ValidationError as exc:
+                errors[index] = exc.detail
+                continue
+            queryset = queryset.order_by('pk').values(*fields)
+            if 'limit' in query:
+                queryset = queryset[:query['limit']]
+            querysets.append(queryset)
+        if errors:
+            return Response({'tables': errors}, status=status.HTTP_400_BAD_REQUEST)
+        results = []
+        for query, queryset, rows in zip(queries, querysets, values_many(querysets)):
+            table = tables[query['table']]
+            metrics.ROWS_REQUESTS.inc(table=table.name)
+            metrics.ROWS_SERVED.inc(len(rows), table=table.name)
+            results.append({'table': table.pk, 'rows': rows_representation(queryset, rows)})
+        return Response({'results': results})
+
+    @extend_schema(request=RowsInsertSerializer)
+    @rows.mapping.post
+    def insert_rows(self, request, pk=None):
+        """
+        Insert rows with a single binary `COPY ... FROM STDIN` statement
+        Rows are validated by the compiled rows validator, unique columns are checked by the database
+        """
+        serializer = RowsInsertSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        table = self.get_object()
+        dynamic_model = table.get_dynamic_model()
+        rows, errors = get_rows_validator(dynamic_model).validate(serializer.validated_data['rows'])
+        if errors:
+            return Response({'rows': errors}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            with transaction.atomic():
+                inserted = copy_insert(dynamic_model, [dynamic_model(**row) for row in rows])
+        except IntegrityError:
+            return Response({'rows': ['Rows violate unique columns.']}, status=status.HTTP_400_BAD_REQUEST)
+        except DataError as exc:
+            return Response({'rows': [_get_error_message(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        metrics.ROWS_INSERTED.inc(inserted, table=table.name)
+        rows_changed.send(sender=DynamicTable, table=table, operation='insert')
+        return Response({'inserted': inserted}, status=status.HTTP_201_CREATED)
+
+    @extend_schema(request=RowsUpdateSerializer)
+    @rows.mapping.patch
+    def update_rows(self, request, pk=None):
+        """
+        Update rows matching the filter expression with a single UPDATE statement
+        With `batch_size` rows are updated and committed in chunks, chunks before one violating unique columns are kept
+        """
+        serializer = RowsUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        table = self.get_object()
+        dynamic_model = table.get_dynamic_model()
+        queryset = dynamic_model.objects.filter(build_filter(dynamic_model, serializer.validated_data['filter']))
+        # Unique values are checked by the database, as they are set to all matching rows at once
+        values_serializer = serializer_factory(dynamic_model, validate_unique=False)(
+            data=serializer.validated_data['values'], partial=True,
+        )
+        if not values_serializer.is_valid():
+            return Response({'values': values_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        values = values_serializer.validated_data
+        if not values:
+            # Unknown and read-only columns are dropped by the serializer
+            return Response({'values': ['No writable columns to update.']}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            updated = _batched(
+                queryset, serializer.validated_data.get('batch_size'), lambda rows: rows.update(**values)
+            )
+        except IntegrityError:
+            return Response({'values': ['Values violate unique columns.']}, status=status.HTTP_400_BAD_REQUEST)
+        except DataError as exc:
+            return Response({'values': [_get_error_message(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        if updated:
+            rows_changed.send(sender=DynamicTable, table=table, operation='update')
+        return Response({'updated': updated})
+
+    @extend_schema(request=RowsDeleteSerializer)
+    @rows.mapping.delete
+    def delete_rows(self, request, pk=None):
+        """
+        Delete rows matching the filter expression with a single DELETE statement
+        With `batch_size` rows are deleted and committed in chunks
+        """
+        serializer = RowsDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        table = self.get_object()
+        dynamic_model = table.get_dynamic_model()
+        queryset = dynamic_model.objects.filter(build_filter(dynamic_model, serializer.validated_data['filter']))
+        deleted = _batched(queryset, serializer.validated_data.get('batch_size'), lambda rows: rows.delete()[0])
+        if deleted:
+            rows_changed.send(sender=DynamicTable, table=table, operation='delete')
+        return Response({'deleted': deleted})
+
+    @action(
+        detail=True, methods=['get'], serializer_class=DummySerializer, url_path=r'rows/(?P<row_id>[0-9]+)',
+        url_name='row-detail',
+    )
+    def row_detail(self, request, pk=None, row_id=None):
+        """
+        Get a single row of the table
         """
         dynamic_model = self.get_object().get_dynamic_model()
-        serializer = serializer_factory(dynamic_model)(dynamic_model.objects.all(), many=True)
-        return Response(serializer.data)
+        rows = rows_representation(dynamic_model.objects.filter(pk=row_id))
+        if not rows:
+            raise NotFound()
+        return Response(rows[0])
+
+    @row_detail.mapping.put
+    def update_row(self, request, pk=None, row_id=None):
+        """
+        Update a single row of the table with `UPDATE ... RETURNING`, without reading the row first
+        Rows of versioned tables are updated only if `row_version` matches, otherwise 409 is returned
+        """
+        return self._update_row(request, row_id, partial=False)
+
+    @row_detail.mapping.patch
+    def partial_update_row(self, request, pk=None, row_id=None):
+        """
+        Partially update a single row of the table, see `update_row`
+        """
+        return self._update_row(request, row_id, partial=True)
+
+    @row_detail.mapping.delete
+    def destroy_row(self, request, pk=None, row_id=None):
+        """
+        Delete a single row of the table
+        Rows of versioned tables are deleted only if `row_version` matches, otherwise 409 is returned
+        """
+        table = self.get_object()
+        dynamic_model = table.get_dynamic_model()
+        version = self._get_row_version(request, table)
+        conditions = {} if version is None else {DynamicTable.ROW_VERSION_COLUMN: version}
+        deleted, _ = dynamic_model.objects.filter(pk=row_id, **conditions).delete()
+        if not deleted:
+            return self._row_not_changed(dynamic_model, row_id, version)
+        rows_changed.send(sender=DynamicTable, table=table, operation='delete')
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(parameters=[ChangesQuerySerializer])
+    @action(detail=True, methods=['get'], serializer_class=DummySerializer, url_name='changes')
+    def changes(self, request, pk=None):
+        """
+        Get rows inserted, updated or deleted since the cursor, ordered by modification time
+        Available for tables with change tracking, deleted rows have `deleted` set to true
+        Pass the returned `cursor` as `since` to get following changes
+        Rows are ordered by write time, changes committed later than `CHANGES_SAFETY_LAG` after the write are missed
+        """
+        query_serializer = ChangesQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        table = self.get_object()
+        if not table.track_changes:
+            return Response(
+                {'detail': 'Change tracking is disabled for this table.'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        dynamic_model = table.get_dynamic_model()
+        modified_at = DynamicTable.MODIFIED_AT_COLUMN
+        # Skip the most recent changes, rows of transactions which are not committed yet may appear before them
+        queryset = dynamic_model.all_objects.filter(**{
+            f'{modified_at}__lte': timezone.now() - timedelta(seconds=get_setting('CHANGES_SAFETY_LAG')),
+        })
+        since = query_serializer.validated_data.get('since')
+        if since is not None:
+            since_modified_at, since_pk = since
+            queryset = queryset.filter(
+                Q(**{f'{modified_at}__gt': since_modified_at})
+                | Q(**{modified_at: since_modified_at, 'pk__gt': since_pk})
+            )
+        limit = query_serializer.validated_data['limit']
+        rows = rows_representation(queryset.order_by(modified_at, 'pk')[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            since = (rows[-1][modified_at], rows[-1]['id'])
+        return Response({
+            'changes': rows,
+            'cursor': ChangesCursorField().to_representation(since) if since else None,
+            'has_more': has_more,
+        })
+
+    def _update_row(self, request, row_id, partial):
+        table = self.get_object()
+        dynamic_model = table.get_dynamic_model()
+        version = self._get_row_version(request, table)
+        # Unique values are checked by the database, as the row is not read before the update
+        serializer = serializer_factory(dynamic_model, validate_unique=False)(data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        values = dict(serializer.validated_data)
+        conditions = {}
+        increments = []
+        if table.versioned:
+            increments.append(DynamicTable.ROW_VERSION_COLUMN)
+            if version is not None:
+                conditions[DynamicTable.ROW_VERSION_COLUMN] = version
+        if table.track_changes:
+            values[DynamicTable.MODIFIED_AT_COLUMN] = timezone.now()
+            conditions[DynamicTable.DELETED_COLUMN] = False
+        try:
+            with transaction.atomic():
+                row = update_row_returning(dynamic_model, row_id, values, conditions=conditions, increments=increments)
+        except IntegrityError:
+            return Response(
+                {'non_field_errors': ['Row with these values already exists.']}, status=status.HTTP_400_BAD_REQUEST
+            )
+        except DataError as exc:
+            return Response({'non_field_errors': [_get_error_message(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        if row is None:
+            return self._row_not_changed(dynamic_model, row_id, version)
+        rows_changed.send(sender=DynamicTable, table=table, operation='update')
+        return Response(rows_representation(dynamic_model.objects.all(), [row])[0])
+
+    @staticmethod
+    def _get_row_version(request, table):
+        """
+        Get expected row version from the request body or query parameters.
+        """
+        if not table.versioned:
+            return None
+        data = request.data if isinstance(request.data, dict) else {}
+        version = data.get('row_version', request.query_params.get('row_version'))
+        serializer = RowVersionSerializer(data={} if version is None else {'row_version': version})
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data.get('row_version')
+
+    @staticmethod
+    def _row_not_changed(dynamic_model, row_id, version):
+        """
+        Build response for a row which was not changed: 409 on version conflict, 404 otherwise.
+        The row is looked up only on this failure path.
+        """
+        if version is not None and dynamic_model.objects.filter(pk=row_id).exists():
+            return Response({'detail': 'Row was changed by another request.'}, status=status.HTTP_409_CONFLICT)
+        raise NotFound()
+
+
+class SavedQueryViewSet(viewsets.ModelViewSet):
+    """
+    Saved queries over dynamic tables, stored as materialized views
+    Only refresh options can be updated, the query is fixed after creation
+    """
+    queryset = SavedQuery.objects.all()
+    serializer_class = SavedQuerySerializer
+    http_method_names = ["get", "post", "patch", "delete", "head", "options", "trace"]
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            obj = serializer.save()
+            obj.create_view()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete_view()
+            instance.delete()
+
+    @extend_schema(parameters=[SavedQueryRowsQuerySerializer], responses={200: DummySerializer(many=True)})
+    @action(
+        detail=True, methods=['get'], serializer_class=DummySerializer, renderer_classes=ROWS_RENDERER_CLASSES,
+        url_name='rows',
+    )
+    def rows(self, request, pk=None):
+        """
+        Get rows of the saved query from its materialized view, ordered by the unique key
+        Use `?filter=` with JSON filter expression, `?limit=` and `?offset=` to get a page of rows
+        Use `?format=columnar` (or `?format=arrow` when pyarrow is installed) to get columnar representation
+        """
+        query_serializer = SavedQueryRowsQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+        saved_query = self.get_object()
+        view_model = saved_query.get_view_model()
+        queryset = view_model.objects.filter(build_filter(view_model, params.get('filter', {})))
+        queryset = queryset.order_by(*saved_query.get_key_columns())
+        if 'limit' in params:
+            queryset = queryset[params['offset']:params['offset'] + params['limit']]
+        else:
+            queryset = queryset[params['offset']:]
+        if request.accepted_renderer.format in (ColumnarRenderer.format, ArrowStreamRenderer.format):
+            data = rows_columnar_representation(queryset)
+            count = len(data['data'][data['columns'][0]])
+        else:
+            data = rows_representation(queryset)
+            count = len(data)
+        metrics.ROWS_REQUESTS.inc(table=saved_query.name)
+        metrics.ROWS_SERVED.inc(count, table=saved_query.name)
+        response = Response(data)
+        if saved_query.refreshed_at is not None:
+            response['X-Refreshed-At'] = saved_query.refreshed_at.isoformat()
+        return response
+
+    @action(detail=True, methods=['post'], serializer_class=DummySerializer, url_name='refresh')
+    def refresh(self, request, pk=None):
+        """
+        Refresh the materialized view of the saved query
+        """
+        saved_query = self.get_object()
+        saved_query.refresh_view()
+        return Response(SavedQuerySerializer(saved_query).data)
+
+
+class QueryPlanViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Plans of slow dynamic table queries, slowest first
+    Plans are captured when `TABLE_BUILDER_SLOW_QUERY_THRESHOLD` is set, see `table_builder.slow_queries`
+    """
+    queryset = QueryPlan.objects.order_by('-duration')
+    serializer_class = QueryPlanSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(parameters=[QueryPlanQuerySerializer])
+    def list(self, request, *args, **kwargs):  # noqa: A003
+        query_serializer = QueryPlanQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+        queryset = self.get_queryset()
+        for name in ('table', 'operation'):
+            if name in params:
+                queryset = queryset.filter(**{name: params[name]})
+        return Response(self.get_serializer(queryset[:params['limit']], many=True).data)
+
+
+def _get_error_message(exc):
+    """
+    Get the primary message of the database error, e.g. `numeric field overflow`, without the statement details.
+    """
+    diag = getattr(exc.__cause__, 'diag', None)
+    return getattr(diag, 'message_primary', None) or str(exc)
+
+
+def _batched(queryset, batch_size, operation):
+    """
+    Apply operation to the queryset, returns number of affected rows.
+    With `batch_size` operation is applied to chunks of rows ordered by pk, each chunk in its own transaction,
+    so locks are held for a chunk only.
+    """
+    if not batch_size:
+        with transaction.atomic():
+            return operation(queryset)
+    affected = 0
+    last_pk = None
+    while True:
+        with transaction.atomic():
+            chunk = queryset.order_by('pk')
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            pks = list(chunk.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return affected
+            affected += operation(queryset.filter(pk__in=pks))
+            last_pk = pks[-1]
+
+
+async def row_events_view(request, pk):
+    """
+    Stream notifications about changed rows of the table as Server-Sent Events.
+    Requires an ASGI server, each stream holds a worker thread under WSGI.
+    """
+    if not await DynamicTable.objects.filter(pk=pk).aexists():
+        raise Http404()
+    return StreamingHttpResponse(
+        event_stream(pk),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+class MetricsView(APIView):
+    """
+    Expose table builder metrics in the Prometheus text format.
+    Access is checked by permission classes of `TABLE_BUILDER_METRICS_PERMISSION_CLASSES` setting.
+    """
+    renderer_classes = [PrometheusTextRenderer]
+
+    def get_permissions(self):
+        return [import_string(path)() for path in get_setting('METRICS_PERMISSION_CLASSES')]
+
+    @extend_schema(exclude=True)
+    def get(self, request):
+        return Response(metrics.REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')